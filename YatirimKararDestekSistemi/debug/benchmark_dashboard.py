@@ -0,0 +1,118 @@
+import sys
+import os
+import time
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+# --- PATH AYARLARI ---
+# Dosya 'debug' klasöründe olduğu için proje köküne (src'nin yanına) çıkıyoruz.
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+# ---------------------
+
+from src.data.database import Base
+from src.data.models import User, Security, PriceHistory, PortfolioHolding
+from src.services.portfolio_analytics import PortfolioAnalyticsService
+from src.services.latest_prices import LatestPriceService
+
+HISTORY_DAYS = 500
+
+
+class QueryCounter:
+    """Motor üzerinde çalışan SQL ifadelerini sayar."""
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+
+def seed(session, n_positions: int, start_id: int):
+    """start_id'den başlayarak n_positions kadar hisse, fiyat geçmişi ve pozisyon ekler."""
+    rng = np.random.default_rng(start_id)
+    dates = [d.date() for d in pd.bdate_range(end=pd.Timestamp("2025-01-31"), periods=HISTORY_DAYS)]
+    securities, prices, holdings = [], [], []
+    for sec_id in range(start_id, start_id + n_positions):
+        securities.append({"id": sec_id, "symbol": f"S{sec_id:05d}", "name": f"S{sec_id:05d}"})
+        closes = np.round(50 * np.exp(np.cumsum(rng.normal(0, 0.02, HISTORY_DAYS))), 4)
+        prices.extend({"security_id": sec_id, "date": d, "close_price": c}
+                      for d, c in zip(dates, closes.tolist()))
+        holdings.append({"user_id": 1, "security_id": sec_id,
+                         "quantity": int(rng.integers(1, 1000)), "avg_cost": round(float(closes[0]), 4)})
+    session.execute(insert(Security.__table__), securities)
+    session.execute(insert(PriceHistory.__table__), prices)
+    session.execute(insert(PortfolioHolding.__table__), holdings)
+    # Fiyat yazımında olduğu gibi son fiyat tablosu da aynı transaction'da güncellenir
+    LatestPriceService(session).refresh([s["id"] for s in securities])
+    session.commit()
+
+
+def legacy_dashboard(session, user_id):
+    """Eski (N+1) yöntem: pozisyon başına ayrı son fiyat sorgusu + lazy symbol yüklemesi."""
+    positions = []
+    for h in session.query(PortfolioHolding).filter(PortfolioHolding.user_id == user_id).all():
+        row = session.query(PriceHistory).filter(
+            PriceHistory.security_id == h.security_id
+        ).order_by(PriceHistory.date.desc()).first()
+        price = float(row.close_price) if row else float(h.avg_cost)
+        positions.append({"symbol": h.security.symbol, "market_value": float(h.quantity) * price})
+    return positions
+
+
+def measure(session, counter, func, repeat):
+    session.expire_all()
+    counter.count = 0
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+        session.expire_all()
+    return (time.perf_counter() - t0) / repeat * 1000, counter.count // repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Portföy dashboard benchmark (N+1 vs tek sorgu)")
+    parser.add_argument("--positions", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix="dashboard_bench_")
+    db_path = os.path.join(tmp_dir, "bench.db")
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(User(id=1, username="bench_user"))
+    session.commit()
+
+    counter = QueryCounter(engine)
+    service = PortfolioAnalyticsService(session)
+
+    print(f"\n--- Dashboard benchmark ({HISTORY_DAYS} gün geçmiş/hisse, SQLite) ---")
+    print(f"{'Pozisyon':>9} | {'Eski (ms)':>10} | {'Eski sorgu':>10} | {'Yeni (ms)':>10} | {'Yeni sorgu':>10} | {'Hızlanma':>8}")
+    print("-" * 72)
+
+    loaded = 0
+    for n in sorted(args.positions):
+        if n > loaded:
+            seed(session, n - loaded, loaded + 1)
+            loaded = n
+        old_ms, old_q, old = measure(session, counter, lambda: legacy_dashboard(session, 1), args.repeat)
+        new_ms, new_q, new = measure(session, counter, lambda: service.generate_dashboard(1), args.repeat)
+
+        # Doğruluk: iki yöntem aynı toplam değeri vermeli
+        old_total = sum(p["market_value"] for p in old)
+        assert abs(old_total - new["summary"]["total_value"]) < 1e-6 * max(1.0, old_total), "Toplamlar farklı!"
+        print(f"{n:>9} | {old_ms:>10.1f} | {old_q:>10} | {new_ms:>10.1f} | {new_q:>10} | {old_ms / new_ms:>7.1f}x")
+
+    session.close()
+    engine.dispose()
+    os.remove(db_path)
+    os.rmdir(tmp_dir)
+
+if __name__ == "__main__":
+    main()
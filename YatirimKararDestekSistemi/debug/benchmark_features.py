@@ -0,0 +1,53 @@
+import sys
+import os
+import time
+import argparse
+import numpy as np
+
+# --- PATH AYARLARI ---
+# Dosya 'debug' klasöründe olduğu için proje köküne (src'nin yanına) çıkıyoruz.
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+# ---------------------
+
+from indicator_parity import reference_features, load_symbol
+from src.ai_core.feature_engineering import FeatureEngineer
+from src.services.market_providers import ReplayProvider
+
+
+def best_of(func, repeat: int) -> float:
+    """En iyi süre (ms). İlk çağrı ısınma içindir (import/JIT/önbellek)."""
+    func()
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - t0)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hisse başına özellik üretim süresi: 'ta' vs NumPy çekirdeği")
+    parser.add_argument("--symbol", default="ASELS")
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 5, 10, 15])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    full = load_symbol(ReplayProvider(end_date="2025-01-31"), args.symbol)
+    fe64 = FeatureEngineer(use_lags=True)
+    fe32 = FeatureEngineer(use_lags=True, dtype=np.float32)
+
+    print(f"\n--- Özellik üretimi ({args.symbol}, sentetik veri, en iyi {args.repeat} deneme) ---")
+    print(f"{'Yıl':>4} | {'Satır':>6} | {'ta (ms)':>9} | {'NumPy (ms)':>10} | {'float32 (ms)':>12} | {'Hızlanma':>8}")
+    print("-" * 66)
+    for years in args.years:
+        df = full.tail(years * 252).reset_index(drop=True)
+        ta_ms = best_of(lambda: reference_features(df), args.repeat)
+        np_ms = best_of(lambda: fe64.create_features(df), args.repeat)
+        f32_ms = best_of(lambda: fe32.create_features(df), args.repeat)
+        print(f"{years:>4} | {len(df):>6} | {ta_ms:>9.2f} | {np_ms:>10.2f} | {f32_ms:>12.2f} | {ta_ms / np_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import sys
+import os
+import time
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, select, insert, text
+
+# --- PATH AYARLARI ---
+# Dosya 'debug' klasöründe olduğu için proje köküne (src'nin yanına) çıkıyoruz.
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+# ---------------------
+
+from src.data.models import PriceHistory
+
+# Tablo büyürken hisse başına geçmiş sabit kalır (~10 yıl), hisse sayısı artar.
+DAYS_PER_SECURITY = 2500
+TABLE = PriceHistory.__table__
+
+
+def fill_table(engine, start_security: int, end_security: int, dates, chunk: int = 100_000):
+    """[start_security, end_security) aralığındaki hisseler için sentetik fiyat satırları ekler."""
+    rng = np.random.default_rng(start_security)
+    date_list = [d.date() for d in dates]
+    buffer = []
+    with engine.begin() as conn:
+        for sec_id in range(start_security, end_security):
+            closes = np.round(100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(date_list)))), 4)
+            buffer.extend(
+                {"security_id": sec_id, "date": d, "open_price": c, "high_price": c,
+                 "low_price": c, "close_price": c, "volume": 1000}
+                for d, c in zip(date_list, closes.tolist())
+            )
+            if len(buffer) >= chunk:
+                conn.execute(insert(TABLE), buffer)
+                buffer = []
+        if buffer:
+            conn.execute(insert(TABLE), buffer)
+
+
+def time_query(engine, stmt_factory, security_ids, repeat: int) -> float:
+    """Rastgele hisseler için sorguyu çalıştırır, ortalama süreyi milisaniye olarak döner."""
+    with engine.connect() as conn:
+        t0 = time.perf_counter()
+        for sec_id in security_ids[:repeat]:
+            conn.execute(stmt_factory(sec_id)).all()
+        return (time.perf_counter() - t0) / repeat * 1000
+
+
+def latest_price_stmt(sec_id):
+    # PortfolioAnalyticsService / Optimizer'daki "son fiyat" sorgusu
+    return (select(TABLE.c.date, TABLE.c.close_price)
+            .where(TABLE.c.security_id == sec_id)
+            .order_by(TABLE.c.date.desc()).limit(1))
+
+
+def range_stmt_factory(start_date):
+    # Optimizer / görselleştirmedeki "son N gün kapanış" sorgusu
+    def factory(sec_id):
+        return (select(TABLE.c.date, TABLE.c.close_price)
+                .where(TABLE.c.security_id == sec_id, TABLE.c.date >= start_date)
+                .order_by(TABLE.c.date.desc()))
+    return factory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="price_history index benchmark (son fiyat ve tarih aralığı sorguları)")
+    parser.add_argument("--url", default=None, help="Veritabanı URL'i (varsayılan: geçici SQLite dosyası)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[250_000, 1_000_000, 5_000_000],
+                        help="Ölçüm yapılacak tablo boyutları (satır). Örn: 1000000 10000000 30000000")
+    parser.add_argument("--repeat", type=int, default=200, help="Her ölçümdeki sorgu sayısı")
+    parser.add_argument("--no-index", action="store_true", help="Karşılaştırma için index'leri kaldırır")
+    args = parser.parse_args()
+
+    tmp_dir = None
+    if args.url is None:
+        tmp_dir = tempfile.mkdtemp(prefix="price_bench_")
+        args.url = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+    engine = create_engine(args.url)
+
+    with engine.begin() as conn:
+        TABLE.drop(bind=conn, checkfirst=True)
+        TABLE.create(bind=conn)
+        if args.no_index:
+            for index in TABLE.indexes:
+                index.drop(bind=conn)
+
+    dates = pd.bdate_range(end=pd.Timestamp("2025-01-31"), periods=DAYS_PER_SECURITY)
+    range_start = dates[-250].date()
+    range_stmt = range_stmt_factory(range_start)
+
+    mode = "INDEX YOK" if args.no_index else "UNIQUE + KAPSAYAN INDEX"
+    print(f"\n--- price_history benchmark ({mode}) | {engine.url.get_backend_name()} ---")
+    print(f"{'Satır':>12} | {'Hisse':>7} | {'Son Fiyat (ms)':>15} | {'250 Gün (ms)':>13} | {'Yükleme (sn)':>12}")
+    print("-" * 72)
+
+    loaded = 0
+    rng = np.random.default_rng(0)
+    for size in sorted(args.sizes):
+        target = max(1, size // DAYS_PER_SECURITY)
+        t0 = time.perf_counter()
+        if target > loaded:
+            fill_table(engine, loaded + 1, target + 1, dates)
+            loaded = target
+            if engine.dialect.name == "sqlite":
+                with engine.begin() as conn:
+                    conn.execute(text("ANALYZE"))
+        load_time = time.perf_counter() - t0
+
+        sample = rng.integers(1, loaded + 1, size=args.repeat).tolist()
+        latest_ms = time_query(engine, latest_price_stmt, sample, args.repeat)
+        range_ms = time_query(engine, range_stmt, sample, args.repeat)
+        print(f"{loaded * DAYS_PER_SECURITY:>12,} | {loaded:>7} | {latest_ms:>15.3f} | {range_ms:>13.3f} | {load_time:>12.1f}")
+
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            plan = conn.execute(text("EXPLAIN QUERY PLAN " + str(
+                latest_price_stmt(1).compile(engine, compile_kwargs={"literal_binds": True})))).all()
+        print("\nSon fiyat sorgu planı:", " | ".join(str(row[-1]) for row in plan))
+
+    if tmp_dir:
+        engine.dispose()
+        os.remove(os.path.join(tmp_dir, "bench.db"))
+        os.rmdir(tmp_dir)
+
+if __name__ == "__main__":
+    main()
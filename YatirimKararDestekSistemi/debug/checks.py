@@ -0,0 +1,52 @@
+# checks.py
+# debug/ kontrol scriptlerinin ortak yardımcıları: ✅/❌ satırları, sonuç listesi ve "X/Y kontrol başarılı" özeti.
+
+import sys
+import numpy as np
+import pandas as pd
+
+
+class Checks:
+    """
+    Kontrol sonuçlarını toplar.
+    check(): Satırı yazdırır ve sonucu kaydeder. add(): Kendi satırını yazdıran kontrolün (Ör. check_rows) sonucunu kaydeder.
+    finish(): Özeti yazdırır ve başarısız kontrol varsa 1 koduyla çıkar.
+    """
+    def __init__(self, label: str = "kontrol"):
+        self.label = label
+        self.results = []
+
+    def check(self, name: str, ok, detail: str = "") -> bool:
+        ok = bool(ok)
+        print(f"   {'✅' if ok else '❌'} {name}{' ' + detail if detail else ''}")
+        self.results.append(ok)
+        return ok
+
+    def add(self, ok) -> bool:
+        ok = bool(ok)
+        self.results.append(ok)
+        return ok
+
+    def finish(self) -> None:
+        failed = self.results.count(False)
+        print(f"\n{'✅' if not failed else '❌'} {len(self.results) - failed}/{len(self.results)} {self.label} başarılı.")
+        sys.exit(1 if failed else 0)
+
+
+def check_rows(name, expected: pd.DataFrame, actual: pd.DataFrame, rtol: float) -> bool:
+    """Akan/depolanan hesaplamanın satırları toplu hesaplamayla aynı mı (sütunlar, index, değerler)?"""
+    if list(expected.columns) != list(actual.columns) or not expected.index.equals(actual.index):
+        print(f"   ❌ {name}: sütun/index uyuşmuyor")
+        return False
+    numeric = [c for c in expected.columns if c != 'Date']
+    ok = np.allclose(actual[numeric].to_numpy(np.float64), expected[numeric].to_numpy(np.float64),
+                     rtol=rtol, atol=1e-8, equal_nan=True)
+    if 'Date' in expected.columns:
+        ok &= bool((pd.to_datetime(actual['Date']) == pd.to_datetime(expected['Date'])).all())
+    if not ok:
+        diff = np.nanmax(np.abs(actual[numeric].to_numpy(np.float64) - expected[numeric].to_numpy(np.float64)), axis=0)
+        worst = numeric[int(np.nanargmax(diff))]
+        print(f"   ❌ {name}: en büyük fark {worst} = {np.nanmax(diff):.3e}")
+        return False
+    print(f"   ✅ {name} ({len(actual)} satır)")
+    return True
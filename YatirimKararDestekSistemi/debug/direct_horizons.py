@@ -0,0 +1,149 @@
+import sys
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import warnings
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+# --- PATH AYARLARI ---
+# Dosya 'debug' klasöründe olduğu için proje köküne (src'nin yanına) çıkıyoruz.
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+# ---------------------
+
+from checks import Checks
+from src.ai_core.ai_models.machine_learning import XGBoostModel, DirectHorizonModel
+from src.ai_core.ai_models.ensemble import EnsembleModel
+from src.ai_core.ai_models.statistical import TrendModel
+from src.ai_core.data_processor import DataProcessor
+from src.ai_core.engine import AIEngine
+from src.ai_core.feature_engineering import FeatureEngineer
+from src.ai_core.streaming_features import FeatureState
+from src.services.market_providers import ReplayProvider
+
+warnings.simplefilter('ignore')
+
+HORIZONS = [1, 5, 20]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Doğrudan çok ufuklu model: ortak matris, toplu tahmin, doğruluk")
+    parser.add_argument("--symbol", default="ASELS")
+    parser.add_argument("--origins", type=int, default=4, help="Geriye dönük değerlendirme noktası sayısı")
+    args = parser.parse_args()
+    checks = Checks()
+
+    df = ReplayProvider(end_date="2025-01-31").history(args.symbol).rename_axis('Date').reset_index()
+    df_ml = FeatureEngineer().create_features(df)
+    print(f"\n{args.symbol}: {len(df_ml)} satır özellik")
+
+    print("\n--- Ortak özellik matrisi ---")
+    model = DirectHorizonModel(params={"horizons": HORIZONS})
+    started = time.perf_counter()
+    model.train(df_ml)
+    shared_s = time.perf_counter() - started
+
+    # Referans: Aynı kutu sınırlarıyla (ref=...) sadece hedefi olan satırlardan kurulmuş ayrı matrisler
+    data = df_ml.set_index('Date')
+    X = data.drop(columns=['Close']).to_numpy(dtype=np.float32)
+    close = data['Close'].to_numpy()
+    reference = xgb.QuantileDMatrix(X, feature_names=model.feature_names)
+    same = True
+    for h in HORIZONS:
+        dtrain = xgb.QuantileDMatrix(X[:-h], label=close[h:], ref=reference, feature_names=model.feature_names)
+        booster = xgb.train(model._native_params(), dtrain, num_boost_round=100)
+        same &= np.allclose(booster.inplace_predict(X[-50:]), model.boosters[h].inplace_predict(X[-50:]), rtol=1e-6)
+    checks.check("sıfır ağırlıklı satırlar = hedefsiz satırları atmak (ufuk başına ayrı matris)", same)
+
+    started = time.perf_counter()
+    for h in HORIZONS:
+        XGBoostModel().model.fit(X[:-h], close[h:])
+    separate_s = time.perf_counter() - started
+    print(f"      eğitim: ortak matris {shared_s:.2f} sn | ufuk başına ayrı XGBRegressor {separate_s:.2f} sn")
+
+    print("\n--- Toplu tahmin ---")
+    horizons = model.predict_horizons(df_ml)
+    checks.check("predict_horizons: tüm ufuklar tek çağrıda", list(horizons.index) == HORIZONS
+                 and horizons['predicted_price'].notna().all())
+    checks.check("predict(steps=h) = predict_horizons satırı",
+                 all(np.isclose(model.predict(df_ml, steps=h)['predicted_price'].iloc[0],
+                                horizons.loc[h, 'predicted_price']) for h in HORIZONS))
+    checks.check("hedef tarihleri: son bardan h iş günü sonrası",
+                 list(horizons['Date']) == [df_ml['Date'].iloc[-1] + pd.offsets.BDay(h) for h in HORIZONS])
+    multi = DirectHorizonModel(params={"horizons": HORIZONS, "strategy": "multi_output"})
+    multi.train(df_ml)
+    checks.check("multi_output: tek model, aynı arayüz", len(multi.boosters) == 1
+                 and multi.predict_horizons(df_ml)['predicted_price'].notna().all())
+
+    folder = tempfile.mkdtemp(prefix="direct_")
+    path = os.path.join(folder, "direct.pkl")
+    model.save(path)
+    loaded = DirectHorizonModel()
+    loaded.load(path)
+    checks.check("kaydet/yükle sonrası aynı tahmin", loaded.predict_horizons(df_ml).equals(horizons))
+
+    trend = TrendModel()
+    trend.train(df)
+    ensemble = EnsembleModel()
+    signals = ensemble.predict_horizons(model, df_ml.iloc[[-1]], df['Close'].iloc[-1], volatility=1.0, trend=trend)
+    print(signals.round(4).to_string())
+    expected = ensemble.combine_predictions({"xgboost": horizons['predicted_price'].to_numpy(),
+                                             "prophet": trend.predict(horizons[['Date']])['yhat'].to_numpy()})
+    checks.check("EnsembleModel.predict_horizons: ağırlıklı birleşim + ufuk başına sinyal",
+                 np.allclose(signals['predicted_price'], expected) and signals['signal'].notna().all())
+
+    print("\n--- Geriye dönük doğruluk (MAPE %) ---")
+    errors = {name: {h: [] for h in HORIZONS} for name in ("direct", "multi_output", "recursive", "naive")}
+    for i in range(args.origins):
+        end = len(df_ml) - max(HORIZONS) - 40 * i
+        train = df_ml.iloc[:end]
+        origin = train['Date'].iloc[-1]
+        raw = df[df['Date'] <= origin]
+        actual = df_ml.set_index('Date')['Close'].iloc[end - 1:end - 1 + max(HORIZONS) + 1].to_numpy()
+        direct = DirectHorizonModel(params={"horizons": HORIZONS})
+        direct.train(train)
+        multi = DirectHorizonModel(params={"horizons": HORIZONS, "strategy": "multi_output"})
+        multi.train(train)
+        recursive = XGBoostModel()
+        recursive.train(train, target_col='Close')
+        path = recursive.forecast(FeatureState.from_history(raw), max(HORIZONS))['predicted_price'].to_numpy()
+        predictions = {
+            "direct": direct.predict_horizons(train)['predicted_price'].to_numpy(),
+            "multi_output": multi.predict_horizons(train)['predicted_price'].to_numpy(),
+            # Özyinelemeli modelin hedefi aynı günün kapanışı: Yolun h. adımı t+h'dir
+            "recursive": path[[h - 1 for h in HORIZONS]],
+            "naive": np.full(len(HORIZONS), actual[0]),
+        }
+        for name, values in predictions.items():
+            for k, h in enumerate(HORIZONS):
+                errors[name][h].append(abs(values[k] / actual[h] - 1) * 100)
+    for name, by_h in errors.items():
+        print(f"      {name:<13} " + " ".join(f"t+{h}: {np.mean(v):6.2f}%" for h, v in by_h.items()))
+
+    print("\n--- AIEngine(horizons=(1, 5, 20)) ---")
+    processor = DataProcessor(raw_data_dir=os.path.join(folder, "raw"), store_dir=os.path.join(folder, "store"),
+                              provider=ReplayProvider(end_date="2025-01-31"))
+    engine = AIEngine(models_dir=os.path.join(folder, "models"), processor=processor, trend_model="trend",
+                      horizons=HORIZONS)
+    prediction = engine.predict_next_day(args.symbol)
+    checks.check("predict_next_day çok günlük sinyalleri içeriyor", list(prediction["horizons"].index) == HORIZONS)
+    bundle = engine.registry.load(args.symbol)
+    checks.check("kayıttan DirectHorizonModel yükleniyor", bundle.direct is not None
+                 and bundle.meta.get("horizons") == HORIZONS)
+    other = AIEngine(models_dir=os.path.join(folder, "models"), processor=processor, trend_model="trend",
+                     horizons=[1, 10])
+    df_raw = processor.load_data(args.symbol, refresh=False)
+    checks.check("ufuklar değişince kayıt bayat",
+                 other.registry.staleness(bundle.meta, df_raw, bundle.feature_columns) == "Tahmin ufukları değişmiş")
+
+    shutil.rmtree(folder)
+    checks.finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import sys
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+# --- PATH AYARLARI ---
+# Dosya 'debug' klasöründe olduğu için proje köküne (src'nin yanına) çıkıyoruz.
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+# ---------------------
+
+from src.ai_core.feature_engineering import FeatureEngineer
+from src.ai_core.feature_store import FeatureStore, COMPACT_PARTS
+from src.services.market_providers import ReplayProvider
+from checks import Checks, check_rows
+
+DEFAULT_SYMBOLS = ["ASELS", "THYAO", "GARAN"]
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - t0)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Özellik deposu: create_features ile tutarlılık, ekleme, geçersizleştirme ve hız")
+    parser.add_argument("--symbols", nargs="+", default=DEFAULT_SYMBOLS)
+    parser.add_argument("--bars", type=int, default=30, help="Gün gün eklenecek yeni bar sayısı")
+    parser.add_argument("--rtol", type=float, default=1e-9)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    provider = ReplayProvider(end_date="2025-01-31")
+    root = tempfile.mkdtemp(prefix="feature_store_")
+    checks = Checks()
+
+    for symbol in args.symbols:
+        print(f"\n--- {symbol} ---")
+        df = provider.history(symbol).rename_axis('Date').reset_index()
+        batch = FeatureEngineer(use_lags=True).create_features(df)
+        split = len(df) - args.bars
+        store = FeatureStore(root)
+
+        # 1. İlk hesaplama ve diskten okuma (isabet)
+        store.get(symbol, df.iloc[:split])
+        hit = store.get(symbol, df.iloc[:split])
+        checks.add(check_rows("isabet (diskten)", batch.loc[hit.index], hit, 0.0))
+
+        # 2. Gün gün ekleme: Sadece yeni barlar hesaplanır
+        for end in range(split + 1, len(df) + 1):
+            appended = store.get(symbol, df.iloc[:end])
+        checks.add(check_rows(f"ekleme (+{args.bars} bar)", batch, appended, args.rtol))
+        meta = store.read_meta(symbol)
+        ok = meta["parts"] == args.bars % COMPACT_PARTS and meta["rows"] == len(batch)
+        checks.check(f"meta: {meta['rows']} satır, {meta['parts']} parça, son tarih {meta['raw_last_date']}", ok)
+
+        # 3. Sütun seçimi: Sadece istenen sütunlar okunur
+        cols = ['rsi', 'macd', 'Close']
+        subset = store.get(symbol, df, columns=cols)
+        checks.add(check_rows("sütun seçimi", batch[cols], subset, args.rtol))
+
+        # 4. Yeni depo nesnesi (yeniden başlatma) aynı tabloyu hesaplamadan okur
+        reopened = FeatureStore(root).get(symbol, df)
+        checks.add(check_rows("yeniden açılış", batch, reopened, args.rtol))
+
+        # 5. Geçmiş değişirse (Ör. bölünme düzeltmesi) baştan hesaplanır
+        adjusted = df.copy()
+        adjusted.loc[:100, ['Open', 'High', 'Low', 'Close']] *= 0.5
+        rebuilt = store.get(symbol, adjusted)
+        checks.add(check_rows("geçmiş değişti -> yeniden", FeatureEngineer().create_features(adjusted), rebuilt, 0.0))
+
+        # 6. Özellik ayarları değişirse (use_lags/dtype) ayrı anahtar -> yeniden hesap
+        store32 = FeatureStore(root, engineer=FeatureEngineer(use_lags=True, dtype=np.float32))
+        f32 = store32.get(symbol, df)
+        ok = f32['rsi'].dtype == np.float32 and store32.read_meta(symbol)["config_hash"] != store.engineer.config_hash()
+        checks.check("ayar değişti -> float32 tablo yeniden hesaplandı", ok)
+
+    # 7. Tarih index'li tablo (ValidationModule.prepare_data)
+    print("\n--- Tarih index'li veri ---")
+    df = provider.history(args.symbols[0]).rename_axis('Date')
+    batch = FeatureEngineer(use_lags=True).create_features(df)
+    store = FeatureStore(os.path.join(root, "indexed"))
+    store.get("IDX", df.iloc[:-5])
+    checks.add(check_rows("tarih index'li ekleme (+5 bar)", batch, store.get("IDX", df), args.rtol))
+
+    # Hız: Her çağrıda yeniden hesaplama vs depodan okuma
+    print("\n--- Hız ---")
+    df = provider.history(args.symbols[0]).rename_axis('Date').reset_index()
+    fe = FeatureEngineer(use_lags=True)
+    store = FeatureStore(os.path.join(root, "speed"))
+    store.get("HIZ", df)
+    compute_ms = best_of(lambda: fe.create_features(df), args.repeat)
+    hit_ms = best_of(lambda: store.get("HIZ", df), args.repeat)
+    cols_ms = best_of(lambda: store.get("HIZ", df, columns=['rsi', 'Close']), args.repeat)
+    print(f"   create_features ({len(df)} satır): {compute_ms:.1f} ms")
+    print(f"   depo (tüm sütunlar)       : {hit_ms:.1f} ms")
+    print(f"   depo (2 sütun)            : {cols_ms:.1f} ms")
+
+    shutil.rmtree(root)
+    checks.finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import sys
+import os
+import time
+import argparse
+import tempfile
+import warnings
+import numpy as np
+import pandas as pd
+from arch import arch_model
+from arch.univariate import Normal
+
+# --- PATH AYARLARI ---
+# Dosya 'debug' klasöründe olduğu için proje köküne (src'nin yanına) çıkıyoruz.
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+# ---------------------
+
+from checks import Checks
+from src.ai_core.volatility import (
+    GarchState, fit_garch, garch_filter, egarch_filter, universe_volatility, VOL_PARAMETERS
+)
+from src.ai_core.ai_models.statistical import GarchModel
+
+warnings.simplefilter('ignore')
+
+# Simülasyon parametreleri (mu, omega, alpha, [gamma], beta): Gerçekçi kalıcı volatilite
+TRUE_PARAMS = {
+    "GARCH": [0.05, 0.08, 0.10, 0.85],
+    "EGARCH": [0.05, 0.02, 0.15, -0.05, 0.97],
+}
+
+
+def simulate(vol: str, n: int, seed: int) -> pd.Series:
+    """GARCH/EGARCH sürecinden yüzde getiri serisi (tarih index'li)."""
+    o = 1 if vol == "EGARCH" else 0
+    model = arch_model(None, vol="EGARCH" if vol == "EGARCH" else "Garch", p=1, o=o, q=1)
+    model.distribution = Normal(seed=np.random.default_rng(seed))
+    sim = model.simulate(TRUE_PARAMS[vol], n)["data"]
+    return pd.Series(sim.to_numpy(), index=pd.bdate_range("2010-01-04", periods=n))
+
+
+def fixed_result(returns: pd.Series, vol: str, params: dict):
+    """arch'ın kendi filtresi: Verilen parametrelerle koşullu varyans (referans)."""
+    o = 1 if vol == "EGARCH" else 0
+    model = arch_model(returns, vol="EGARCH" if vol == "EGARCH" else "Garch", p=1, o=o, q=1)
+    return model.fix([params[n] for n in ["mu"] + VOL_PARAMETERS[vol]])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GARCH volatilite motoru: arch ile tutarlılık, O(1) güncelleme, sıcak başlangıç")
+    parser.add_argument("--n", type=int, default=2500, help="Seri uzunluğu (gün)")
+    parser.add_argument("--universe", type=int, default=200, help="Vektörel filtre için hisse sayısı")
+    parser.add_argument("--rtol", type=float, default=1e-9)
+    args = parser.parse_args()
+    checks = Checks()
+
+    for vol in ("GARCH", "EGARCH"):
+        print(f"\n--- {vol}(1,1) ---")
+        returns = simulate(vol, args.n, seed=1)
+        _, res = fit_garch(returns, vol=vol)
+        params = res.params.to_dict()
+
+        # 1. Filtre = arch koşullu varyansı
+        resids = returns.to_numpy() - params["mu"]
+        vol_params = [params[n] for n in VOL_PARAMETERS[vol]]
+        sigma2 = garch_filter(resids, *vol_params) if vol == "GARCH" else egarch_filter(resids, *vol_params)
+        expected = np.asarray(res.conditional_volatility) ** 2
+        checks.check("filtre = arch conditional_volatility", np.allclose(sigma2, expected, rtol=args.rtol))
+
+        # 2. Tahmin = arch forecast (EGARCH'ta arch sadece 1 adımı analitik verir)
+        horizon = 5 if vol == "GARCH" else 1
+        state = GarchState.from_result(res, vol)
+        expected = res.forecast(horizon=horizon).variance.values[-1]
+        checks.check(f"forecast({horizon}) = arch forecast",
+                     np.allclose(state.forecast(horizon), expected, rtol=args.rtol))
+
+        # 3. O(1) güncelleme: İlk kısımda kurulan durum + bar bar yeni getiriler = tüm seri üzerinde filtre
+        split = args.n - 50
+        head = fixed_result(returns.iloc[:split], vol, params)
+        state = GarchState.from_result(head, vol)
+        streamed = [state.update(r) for r in returns.iloc[split:]]
+        full = np.asarray(fixed_result(returns, vol, params).conditional_volatility[split:]) ** 2
+        checks.check("update() x 50 bar = tüm seri filtresi", np.allclose(streamed, full, rtol=args.rtol))
+        t0 = time.perf_counter()
+        for r in returns.iloc[split:]:
+            state.update(r)
+        update_us = (time.perf_counter() - t0) / 50 * 1e6
+        print(f"      update(): {update_us:.1f} µs/bar")
+
+        # 4. Sıcak başlangıç: Birkaç gün uzayan geçmişte önceki parametrelerden başla
+        _, old = fit_garch(returns.iloc[:-5], vol=vol)
+        t0 = time.perf_counter()
+        _, cold = fit_garch(returns, vol=vol)
+        cold_ms = (time.perf_counter() - t0) * 1000
+        t0 = time.perf_counter()
+        _, warm = fit_garch(returns, vol=vol, starting_values=old.params.to_dict())
+        warm_ms = (time.perf_counter() - t0) * 1000
+        same = np.allclose(warm.params, cold.params, rtol=1e-3, atol=1e-4) or warm.loglikelihood >= cold.loglikelihood - 1e-6
+        checks.check("sıcak başlangıç aynı optimuma iniyor", same,
+                     f"(soğuk {cold.optimization_result.nit} iter / {cold_ms:.0f} ms, "
+                     f"sıcak {warm.optimization_result.nit} iter / {warm_ms:.0f} ms)")
+
+        # 5. Evren: Vektörel filtre = hisse başına arch (farklı başlangıç tarihleri dahil)
+        k = args.universe
+        panel = pd.DataFrame({f"S{j:03d}": simulate(vol, args.n, seed=100 + j) for j in range(k)})
+        for j in range(0, k, 10):
+            panel.iloc[:200 + j, j] = np.nan
+        table = {}
+        for j, symbol in enumerate(panel.columns[:10]):
+            _, fitted = fit_garch(panel[symbol].dropna(), vol=vol)
+            table[symbol] = fitted.params
+        param_df = pd.DataFrame(table).T.reindex(panel.columns)
+        param_df = param_df.fillna(param_df.iloc[:10].mean())
+        t0 = time.perf_counter()
+        sigma = universe_volatility(panel, param_df, vol=vol)
+        vec_ms = (time.perf_counter() - t0) * 1000
+        t0 = time.perf_counter()
+        expected = []
+        for symbol in panel.columns:
+            fixed = fixed_result(panel[symbol].dropna(), vol, param_df.loc[symbol].to_dict())
+            expected.append(np.sqrt(fixed.forecast(horizon=1).variance.values[-1, 0]))
+        loop_ms = (time.perf_counter() - t0) * 1000
+        checks.check(f"universe_volatility ({k} hisse) = hisse başına arch", np.allclose(sigma, expected, rtol=1e-8),
+                     f"(vektörel {vec_ms:.0f} ms, arch döngüsü {loop_ms:.0f} ms)")
+
+    # 6. GarchModel: Kaydet/yükle + predict(data) eğitimden sonraki barları işler
+    print("\n--- GarchModel ---")
+    returns = simulate("GARCH", args.n, seed=7)
+    close = 100 * np.cumprod(1 + returns / 100)
+    df = pd.DataFrame({"Date": close.index, "Close": close.to_numpy()})
+    model = GarchModel()
+    model.train(df.iloc[:-5])
+    rolled = model.predict(df, steps=3)['predicted_volatility'].to_numpy()
+    for _, row in df.iloc[-5:].iterrows():
+        model.update(row['Close'], row['Date'])
+    checks.check("predict(data) = update() x 5 + predict()",
+                 np.allclose(rolled, model.predict(steps=3)['predicted_volatility']))
+    path = os.path.join(tempfile.mkdtemp(prefix="garch_"), "garch.pkl")
+    model.save(path)
+    loaded = GarchModel()
+    loaded.load(path)
+    checks.check("kaydet/yükle sonrası aynı tahmin", np.allclose(loaded.predict(steps=3), model.predict(steps=3)))
+    warm = GarchModel(params={"starting_values": model.parameters})
+    warm.train(df)
+    checks.check("GarchModel starting_values ile eğitim",
+                 warm.res.optimization_result.nit <= model.res.optimization_result.nit,
+                 f"({model.res.optimization_result.nit} -> {warm.res.optimization_result.nit} iter)")
+    os.remove(path)
+
+    # 7. (1,1) dışı dereceler: p/q arch'a geçer; O(1) durum yok, tahmin arch forecast'tan
+    higher = GarchModel(params={"p": 2, "q": 1})
+    higher.train(df)
+    expected = np.sqrt(higher.res.forecast(horizon=3).variance.values[-1, :])
+    checks.check("GarchModel(p=2, q=1): arch'a geçiyor, tahmin = arch forecast", "alpha[2]" in higher.res.params
+                 and higher.state is None and np.allclose(higher.predict(steps=3)['predicted_volatility'], expected))
+    try:
+        GarchState.from_result(higher.res)
+        rejected = False
+    except ValueError:
+        rejected = True
+    checks.check("GarchState (1,1) dışı dereceyi reddediyor", rejected)
+
+    checks.finish()
+
+
+if __name__ == "__main__":
+    main()
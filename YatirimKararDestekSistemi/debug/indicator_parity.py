@@ -0,0 +1,153 @@
+import sys
+import os
+import argparse
+import numpy as np
+import pandas as pd
+
+# --- PATH AYARLARI ---
+# Dosya 'debug' klasöründe olduğu için proje köküne (src'nin yanına) çıkıyoruz.
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+# ---------------------
+
+from ta.momentum import RSIIndicator
+from ta.trend import MACD, SMAIndicator, EMAIndicator, CCIIndicator
+from ta.volatility import BollingerBands, AverageTrueRange
+from ta.volume import OnBalanceVolumeIndicator, VolumeWeightedAveragePrice
+from checks import Checks
+from src.ai_core.feature_engineering import FeatureEngineer
+from src.services.market_providers import ReplayProvider
+
+DEFAULT_SYMBOLS = ["ASELS", "THYAO", "GARAN", "AKBNK", "EREGL", "BIMAS", "KCHOL", "SISE"]
+
+
+def reference_features(df: pd.DataFrame, use_lags: bool = True) -> pd.DataFrame:
+    """Eski 'ta' tabanlı FeatureEngineer.create_features (karşılaştırma referansı)."""
+    data = df.copy()
+    data['sma_20'] = SMAIndicator(close=data['Close'], window=20).sma_indicator()
+    data['sma_50'] = SMAIndicator(close=data['Close'], window=50).sma_indicator()
+    data['ema_12'] = EMAIndicator(close=data['Close'], window=12).ema_indicator()
+    data['ema_26'] = EMAIndicator(close=data['Close'], window=26).ema_indicator()
+    macd = MACD(close=data['Close'])
+    data['macd'] = macd.macd()
+    data['macd_signal'] = macd.macd_signal()
+    data['macd_diff'] = macd.macd_diff()
+    data['rsi'] = RSIIndicator(close=data['Close'], window=14).rsi()
+    data['cci'] = CCIIndicator(high=data['High'], low=data['Low'], close=data['Close']).cci()
+    bb = BollingerBands(close=data['Close'], window=20, window_dev=2)
+    data['bb_high'] = bb.bollinger_hband()
+    data['bb_low'] = bb.bollinger_lband()
+    data['bb_width'] = (data['bb_high'] - data['bb_low']) / data['Close']
+    data['atr'] = AverageTrueRange(high=data['High'], low=data['Low'], close=data['Close']).average_true_range()
+    data['obv'] = OnBalanceVolumeIndicator(close=data['Close'], volume=data['Volume']).on_balance_volume()
+    data['vwap'] = VolumeWeightedAveragePrice(high=data['High'], low=data['Low'], close=data['Close'],
+                                              volume=data['Volume']).volume_weighted_average_price()
+    if use_lags:
+        data['lag_close_1'] = data['Close'].shift(1)
+        data['lag_close_2'] = data['Close'].shift(2)
+        data['lag_close_5'] = data['Close'].shift(5)
+        data['lag_vol_1'] = data['Volume'].shift(1)
+        data['lag_rsi_1'] = data['rsi'].shift(1)
+        data['pct_change'] = data['Close'].pct_change()
+        data['log_return'] = np.log(data['Close'] / data['Close'].shift(1))
+    data.dropna(inplace=True)
+    return data
+
+
+def load_symbol(provider: ReplayProvider, symbol: str) -> pd.DataFrame:
+    return provider.history(symbol).rename_axis('Date').reset_index()
+
+
+def edge_cases(base: pd.DataFrame) -> dict:
+    """Sabit fiyat aralığı, tam sayı hacim, sıfır hacim, kısa seri, Date sütunu olmayan veri."""
+    flat = base.copy()
+    flat.loc[300:360, ['Open', 'High', 'Low', 'Close']] = 42.0  # Bollinger std=0, CCI mad=0, RSI emadn=0
+    int_volume = base.copy()
+    int_volume['Volume'] = int_volume['Volume'].astype('int64')
+    zero_volume = base.copy()
+    zero_volume.loc[500:520, 'Volume'] = 0.0                   # VWAP 0/0
+    with_gaps = base.copy()
+    with_gaps['Adj Close'] = with_gaps['Close']
+    with_gaps.loc[[700, 701], 'Adj Close'] = np.nan             # Ham veride NaN: satır atılmalı
+    return {
+        "sabit_fiyat": flat,
+        "int_hacim": int_volume,
+        "sifir_hacim": zero_volume,
+        "nan_satir": with_gaps,
+        "kisa_60": base.head(60).copy(),
+        "kisa_30": base.head(30).copy(),
+        "tarih_indexli": base.set_index('Date'),
+    }
+
+
+def compare(name: str, expected: pd.DataFrame, actual: pd.DataFrame, rtol: float, atol: float,
+            check_dtype: bool = True, scale_atol: bool = False) -> bool:
+    """scale_atol: atol sütunun en büyük mutlak değerine göre ölçeklenir (float32 karşılaştırması için)."""
+    problems = []
+    if list(expected.columns) != list(actual.columns):
+        problems.append(f"sütunlar farklı: {list(expected.columns)} != {list(actual.columns)}")
+    elif not expected.index.equals(actual.index):
+        problems.append(f"index farklı ({len(expected)} != {len(actual)} satır)")
+    else:
+        for col in expected.columns:
+            exp, act = expected[col], actual[col]
+            if check_dtype and exp.dtype != act.dtype:
+                problems.append(f"{col}: dtype {exp.dtype} != {act.dtype}")
+            if exp.dtype.kind in "fiu":
+                exp_values = exp.to_numpy(np.float64)
+                col_atol = atol * np.nanmax(np.abs(exp_values)) if scale_atol and len(exp_values) else atol
+                ok = np.allclose(act.to_numpy(np.float64), exp_values, rtol=rtol, atol=col_atol, equal_nan=True)
+                if not ok:
+                    diff = np.nanmax(np.abs(act.to_numpy(np.float64) - exp.to_numpy(np.float64)))
+                    problems.append(f"{col}: en büyük fark {diff:.3e}")
+            elif not exp.equals(act):
+                problems.append(f"{col}: değerler farklı")
+
+    if problems:
+        print(f"   ❌ {name}: " + "; ".join(problems))
+        return False
+    print(f"   ✅ {name} ({len(actual)} satır, {len(actual.columns)} sütun)")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NumPy indikatör çekirdeği ile 'ta' kütüphanesi karşılaştırması")
+    parser.add_argument("--symbols", nargs="+", default=DEFAULT_SYMBOLS)
+    parser.add_argument("--rtol", type=float, default=1e-9)
+    parser.add_argument("--atol", type=float, default=1e-8)
+    args = parser.parse_args()
+
+    provider = ReplayProvider(end_date="2025-01-31")
+    checks = Checks(label="karşılaştırma")
+
+    for use_lags in (True, False):
+        fe = FeatureEngineer(use_lags=use_lags)
+        print(f"\n--- Sentetik hisseler (use_lags={use_lags}) ---")
+        for symbol in args.symbols:
+            df = load_symbol(provider, symbol)
+            checks.add(compare(symbol, reference_features(df, use_lags), fe.create_features(df),
+                               args.rtol, args.atol))
+
+    print("\n--- Uç durumlar ---")
+    fe = FeatureEngineer(use_lags=True)
+    for name, df in edge_cases(load_symbol(provider, args.symbols[0])).items():
+        original = df.copy()
+        checks.add(compare(name, reference_features(df), fe.create_features(df), args.rtol, args.atol))
+        if not df.equals(original):
+            print(f"   ❌ {name}: girdi DataFrame değiştirildi!")
+            checks.add(False)
+
+    # float32: Tip farkı beklenir, değerler float32 hassasiyetinde aynı olmalı
+    print("\n--- float32 modu ---")
+    fe32 = FeatureEngineer(use_lags=True, dtype=np.float32)
+    for symbol in args.symbols[:3]:
+        df = load_symbol(provider, symbol)
+        checks.add(compare(f"{symbol} (float32)", reference_features(df), fe32.create_features(df),
+                           rtol=1e-4, atol=1e-5, check_dtype=False, scale_atol=True))
+
+    checks.finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import sys
+import os
+
+# --- PATH AYARLARI ---
+# Dosya 'debug' klasöründe olduğu için proje köküne (src'nin yanına) çıkıyoruz.
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+# ---------------------
+
+from src.data.database import engine
+from src.data.migrations import migrate_price_history_indexes, backfill_latest_prices
+
+def main():
+    """
+    Mevcut veritabanını VERİ SİLMEDEN yeni şemaya getirir (reset_db.py'nin aksine).
+    - price_history: UNIQUE (security_id, date) + kapanış fiyatı kapsayan index
+    - latest_prices: hisse başına son kapanış tablosu (price_history'den doldurulur)
+    """
+    print(f"Veritabanı: {engine.url.database}")
+    print("1. price_history index'leri kontrol ediliyor...")
+    report = migrate_price_history_indexes(engine)
+    for name in report["created"]:
+        print(f"   -> Oluşturuldu: {name}")
+    for name in report["existing"]:
+        print(f"   -> Zaten var: {name}")
+
+    print("2. latest_prices tablosu dolduruluyor...")
+    backfill_latest_prices(engine)
+
+if __name__ == "__main__":
+    main()
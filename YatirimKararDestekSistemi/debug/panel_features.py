@@ -0,0 +1,102 @@
+import sys
+import os
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+# --- PATH AYARLARI ---
+# Dosya 'debug' klasöründe olduğu için proje köküne (src'nin yanına) çıkıyoruz.
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+# ---------------------
+
+from src.ai_core.feature_engineering import FeatureEngineer
+from src.ai_core.panel_features import PanelFeatureEngineer, PricePanel, CROSS_SECTIONAL_COLUMNS
+from src.services.market_providers import ReplayProvider
+from checks import Checks, check_rows
+
+DEFAULT_SYMBOLS = ["ASELS", "THYAO", "GARAN", "AKBNK", "EREGL", "BIMAS", "KCHOL", "SISE"]
+SECTORS = {"ASELS": "SAVUNMA", "THYAO": "ULASIM", "GARAN": "BANKA", "AKBNK": "BANKA",
+           "EREGL": "METAL", "BIMAS": "PERAKENDE", "KCHOL": "HOLDING", "SISE": "HOLDING"}
+
+
+def load_frames(provider, symbols):
+    frames = {s: provider.history(s).rename_axis('Date').reset_index() for s in symbols}
+    # Farklı halka arz tarihi ve arada işlem görmeyen günler (düzensiz panel)
+    first, second = symbols[0], symbols[1]
+    frames[first] = frames[first].iloc[400:].reset_index(drop=True)
+    frames[second] = frames[second].drop(index=range(1000, 1010)).reset_index(drop=True)
+    return frames
+
+
+def check_cross_sectional(panel_df: pd.DataFrame, sectors: dict, checks: Checks) -> None:
+    """Kesitsel özellikler pandas groupby/rank ile aynı mı?"""
+    ok = panel_df['ret_rank'].between(0, 1, inclusive='right').all()
+    # Sıra, aynı gün getiri sırasıyla aynı olmalı (tablo NaN satırları atıldıktan sonra da)
+    by_day = panel_df.groupby('Date')
+    agree = by_day.apply(lambda g: (g['pct_change'].rank(pct=False).to_numpy()
+                                    == g['ret_rank'].rank(pct=False).to_numpy()).all(), include_groups=False)
+    ok &= bool(agree.all())
+    checks.check("ret_rank: günlük getiri sırasıyla tutarlı", ok)
+
+    sector = panel_df['Symbol'].map(sectors)
+    group_sum = panel_df.groupby([panel_df['Date'], sector])['rsi_sector_rel'].transform('sum')
+    checks.check("rsi_sector_rel: sektör içi toplam 0", np.allclose(group_sum, 0.0, atol=1e-6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Panel (tarih x hisse) özellik hesaplaması: tutarlılık ve hız")
+    parser.add_argument("--symbols", nargs="+", default=DEFAULT_SYMBOLS)
+    parser.add_argument("--universe", type=int, default=200, help="Hız testi için sentetik hisse sayısı")
+    parser.add_argument("--rtol", type=float, default=1e-9)
+    args = parser.parse_args()
+
+    provider = ReplayProvider(end_date="2025-01-31")
+    frames = load_frames(provider, args.symbols)
+    checks = Checks()
+
+    print("\n--- Panel vs hisse başına create_features ---")
+    engineer = PanelFeatureEngineer(use_lags=True)
+    per_symbol = engineer.symbol_frames(frames, sectors=SECTORS)
+    for symbol, df in frames.items():
+        expected = FeatureEngineer(use_lags=True).create_features(df)
+        actual = per_symbol[symbol][list(expected.columns)]
+        checks.add(check_rows(symbol, expected, actual, args.rtol))
+
+    print("\n--- Kesitsel özellikler ---")
+    panel_df = engineer.create_features(frames, sectors=SECTORS)
+    ok = set(CROSS_SECTIONAL_COLUMNS) <= set(panel_df.columns) and not panel_df.isna().any().any()
+    checks.check(f"uzun tablo: {len(panel_df)} satır, {panel_df['Symbol'].nunique()} hisse, NaN yok", ok)
+    check_cross_sectional(panel_df, SECTORS, checks)
+
+    print(f"\n--- Hız ({args.universe} hisse) ---")
+    universe = {f"SYN{i:03d}": provider.history(f"SYN{i:03d}").rename_axis('Date').reset_index()
+                for i in range(args.universe)}
+    fe = FeatureEngineer(use_lags=True)
+    t0 = time.perf_counter()
+    for df in universe.values():
+        fe.create_features(df)
+    loop_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    panel = PricePanel.from_frames(universe)
+    stack_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    PanelFeatureEngineer(use_lags=True, cross_sectional=False).compute(panel)
+    panel_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    PanelFeatureEngineer(use_lags=True).compute(panel)
+    panel_xs_s = time.perf_counter() - t0
+    print(f"   {panel}")
+    print(f"   hisse başına create_features : {loop_s * 1000:.0f} ms")
+    print(f"   panel kurulumu (stack)       : {stack_s * 1000:.0f} ms")
+    print(f"   panel indikatörleri          : {panel_s * 1000:.0f} ms ({loop_s / panel_s:.1f}x)")
+    print(f"   panel + kesitsel özellikler  : {panel_xs_s * 1000:.0f} ms")
+
+    checks.finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import sys
+import os
+import time
+import pickle
+import argparse
+import tempfile
+import shutil
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+# --- PATH AYARLARI ---
+# Dosya 'debug' klasöründe olduğu için proje köküne (src'nin yanına) çıkıyoruz.
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+# ---------------------
+
+from checks import Checks
+from src.ai_core.storage import ParquetPriceStore
+from src.ai_core.price_cube import PriceCube, build_price_cube
+from src.ai_core.panel_features import PanelFeatureEngineer, PricePanel
+from src.services.market_providers import ReplayProvider
+from src.services.optimization import PortfolioOptimizer
+from src.data.database import Base
+from src.data.models import Security, PriceHistory
+
+
+def window_mean(cube: PriceCube, start: str, end: str) -> float:
+    """İşçi süreçte çalışır: Küp pickle ile sadece yol olarak gelir, veri diskten eşlenir."""
+    return float(np.nanmean(cube.field('Close', start, end)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bellek eşlemli fiyat küpü: tutarlılık, kopyasız dilimleme ve hız")
+    parser.add_argument("--universe", type=int, default=100, help="Sentetik hisse sayısı")
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="price_cube_")
+    store = ParquetPriceStore(os.path.join(root, "store"))
+    provider = ReplayProvider(end_date="2025-01-31")
+    symbols = [f"SYN{i:03d}" for i in range(args.universe)]
+    for i, symbol in enumerate(symbols):
+        df = provider.history(symbol).rename_axis('Date').reset_index()
+        if i % 10 == 0:
+            df = df.iloc[300 + i:]                  # Farklı halka arz tarihleri
+        store.write(symbol, df)
+    checks = Checks()
+
+    print("\n--- Kurulum ---")
+    t0 = time.perf_counter()
+    cube = build_price_cube(store, symbols, os.path.join(root, "universe.npy"))
+    build_s = time.perf_counter() - t0
+    print(f"   {cube} ({build_s:.2f} sn)")
+
+    print("\n--- Tutarlılık ---")
+    ok = True
+    for symbol in symbols[::7]:
+        expected = store.read(symbol, columns=['Date'] + cube.fields)
+        ok &= expected.equals(cube.history(symbol))
+    checks.check("history(): depodaki geçmişle birebir aynı", ok)
+
+    closes = cube.frame('Close', '2024-01-01', '2024-12-31', symbols=symbols[10:20])
+    expected = pd.DataFrame({s: store.read(s).set_index('Date')['Close'] for s in symbols[10:20]})
+    expected = expected.loc['2024-01-01':'2024-12-31']
+    checks.check("frame(): tarih aralığı ve hisse seçimi", np.array_equal(closes.to_numpy(), expected.to_numpy(),
+                                                                          equal_nan=True))
+
+    panel = cube.to_panel(symbols=symbols[:20])
+    frames = {s: store.read(s) for s in symbols[:20]}
+    a = PanelFeatureEngineer().compute(panel)['rsi']
+    b = PanelFeatureEngineer().compute(PricePanel.from_frames(frames))['rsi']
+    checks.check("to_panel(): panel özellikleriyle aynı", np.array_equal(a, b, equal_nan=True))
+    partial = build_price_cube(store, symbols[:3], os.path.join(root, "close_only.npy"), fields=['Close'])
+    try:
+        partial.to_panel()
+        clear = False
+    except ValueError as e:
+        clear = "Open" in str(e)
+    checks.check("alan alt kümesiyle kurulan küp: to_panel() eksik alanları söylüyor", clear)
+
+    print("\n--- Portföy optimizasyonu: küp tazeliği ---")
+    db = sessionmaker(bind=create_engine("sqlite://"))()
+    Base.metadata.create_all(db.get_bind())
+    held = symbols[1:3]
+    for i, symbol in enumerate(held, start=1):
+        db.add(Security(id=i, symbol=symbol))
+        bars = store.read(symbol)
+        db.execute(insert(PriceHistory), [{"security_id": i, "date": d.date(), "close_price": c}
+                                          for d, c in zip(bars['Date'], bars['Close'])])
+    db.commit()
+    optimizer = PortfolioOptimizer(db, cube=cube)
+    from_cube = optimizer._get_historical_data(held, days=365)
+    checks.check("küp güncel: küpteki fiyatlar kullanılıyor", from_cube.index[-1] == cube.dates[-1]
+                  and np.allclose(from_cube.to_numpy(), cube.frame('Close', symbols=held).tail(365).to_numpy()))
+    newer = (cube.dates[-1] + pd.offsets.BDay(1)).date()
+    db.execute(insert(PriceHistory), [{"security_id": i, "date": newer, "close_price": 100.0}
+                                      for i in range(1, len(held) + 1)])
+    db.commit()
+    from_db = optimizer._get_historical_data(held, days=365)
+    checks.check("veritabanında daha yeni fiyat: veritabanına dönülüyor", from_db.index[-1].date() == newer)
+    db.close()
+
+    print("\n--- Kopyasız dilimleme ---")
+    view = cube.window('2020-01-01', '2020-12-31', symbols=symbols[5:50])
+    checks.check("tarih aralığı + ardışık hisseler -> görünüm (view)", np.shares_memory(view, cube.data))
+    checks.check("tek alan matrisi -> görünüm",
+                 np.shares_memory(cube.field('Close', symbols=symbols[3:9]), cube.data))
+    scattered = cube.window(symbols=[symbols[0], symbols[9]])
+    checks.check("ardışık olmayan hisseler -> kopya", not np.shares_memory(scattered, cube.data))
+    checks.check("pickle sadece yolu taşır", len(pickle.dumps(cube)) < 1024)
+
+    print("\n--- Süreçler arası paylaşım ---")
+    ranges = [("2016-01-01", "2018-12-31"), ("2019-01-01", "2021-12-31"), ("2022-01-01", "2025-01-31")]
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        remote = list(pool.map(window_mean, [cube] * len(ranges), *zip(*ranges)))
+    local = [window_mean(cube, *r) for r in ranges]
+    checks.check(f"{args.workers} işçi aynı küpü eşledi, sonuçlar aynı", remote == local)
+
+    print("\n--- Hız ---")
+    t0 = time.perf_counter()
+    wide = pd.DataFrame({s: store.read(s).set_index('Date')['Close'] for s in symbols})
+    store_ms = (time.perf_counter() - t0) * 1000
+    t0 = time.perf_counter()
+    reopened = PriceCube(cube.path)
+    wide_cube = reopened.frame('Close')
+    cube_ms = (time.perf_counter() - t0) * 1000
+    checks.check("depo ve küp aynı kapanış matrisini veriyor",
+                  np.array_equal(wide.sort_index().to_numpy(), wide_cube.to_numpy(), equal_nan=True))
+    print(f"   {len(symbols)} hissenin kapanış matrisi: depodan {store_ms:.0f} ms, küpten {cube_ms:.1f} ms")
+
+    shutil.rmtree(root)
+    checks.finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import sys
+import os
+import argparse
+
+# --- PATH AYARLARI ---
+# Dosya 'debug' klasöründe olduğu için proje köküne (src'nin yanına) çıkıyoruz.
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+# ---------------------
+
+from src.ai_core.data_processor import DataProcessor
+
+def main():
+    parser = argparse.ArgumentParser(description="Fiyat deposu (Parquet/Feather) bakım aracı")
+    parser.add_argument("--backend", default="parquet", choices=["parquet", "feather"])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_migrate = sub.add_parser("migrate", help="dataSets/raw altındaki CSV'leri depoya taşır")
+    p_migrate.add_argument("--overwrite", action="store_true", help="Depoda olan sembolleri de yeniden yazar")
+
+    p_export = sub.add_parser("export", help="Depodaki sembolü Türkçe başlıklı CSV olarak dışa aktarır")
+    p_export.add_argument("symbol")
+    p_export.add_argument("--out", default=None)
+
+    p_compact = sub.add_parser("compact", help="Eklenen günlük parçaları ana dosyaya birleştirir")
+    p_compact.add_argument("symbol", nargs="?", default=None, help="Boş bırakılırsa tüm depo")
+
+    args = parser.parse_args()
+    processor = DataProcessor(store=args.backend)
+
+    if args.command == "migrate":
+        report = processor.migrate_from_csv(overwrite=args.overwrite)
+        for symbol, err in report["failed"].items():
+            print(f"   ❌ {symbol}: {err}")
+    elif args.command == "export":
+        path = processor.export_csv(args.symbol.upper(), args.out)
+        print(f"✅ Dışa aktarıldı: {path}")
+    elif args.command == "compact":
+        report = processor.compact(args.symbol.upper() if args.symbol else None)
+        merged = {s: n for s, n in report.items() if n}
+        print(f"✅ {len(merged)} sembol sıkıştırıldı ({sum(merged.values())} parça birleştirildi).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import sys
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import logging
+import warnings
+import joblib
+import numpy as np
+import pandas as pd
+
+# --- PATH AYARLARI ---
+# Dosya 'debug' klasöründe olduğu için proje köküne (src'nin yanına) çıkıyoruz.
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+# ---------------------
+
+from checks import Checks
+from src.ai_core.ai_models.statistical import ProphetModel
+from src.services.market_providers import ReplayProvider
+
+warnings.simplefilter('ignore')
+logging.getLogger("cmdstanpy").disabled = True
+
+
+def legacy_predict(model: ProphetModel, steps: int) -> pd.DataFrame:
+    """Eski yol: Tüm geçmiş + ufuk için tahmin, sonra tail(steps)."""
+    future = model.model.make_future_dataframe(periods=steps)
+    return model.model.predict(future)[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].tail(steps)
+
+
+def best_of(func, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prophet tahmini: Sadece gelecek tarihler + eğitim dönemi önbelleği")
+    parser.add_argument("--symbol", default="ASELS")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    checks = Checks()
+
+    df = ReplayProvider(end_date="2025-01-31").history(args.symbol).rename_axis('Date').reset_index()
+    model = ProphetModel()
+    started = time.perf_counter()
+    model.train(df, target_col='Close')
+    print(f"\n{args.symbol}: {len(df)} gün, eğitim {time.perf_counter() - started:.2f} sn")
+
+    print("\n--- Tutarlılık (eski yol: tüm geçmiş + tail) ---")
+    for steps in (1, 30):
+        old, new = legacy_predict(model, steps), model.predict(steps=steps)
+        checks.check(f"steps={steps}: aynı tarihler ve yhat",
+                     np.array_equal(old['ds'].to_numpy(), new['ds'].to_numpy())
+                     and np.allclose(old['yhat'], new['yhat'], rtol=1e-12))
+    # Aralıklar örneklemeyle üretilir; aynı tohumla bile örneklenen satır sayısı farklı olduğundan yakınlık aranır
+    old, new = legacy_predict(model, 30), model.predict(steps=30)
+    width_ratio = np.mean((new['yhat_upper'] - new['yhat_lower']).to_numpy()
+                          / (old['yhat_upper'] - old['yhat_lower']).to_numpy())
+    checks.check("tahmin aralığı genişliği eski yolla uyumlu", 0.8 < width_ratio < 1.25, f"(oran {width_ratio:.2f})")
+    none = model.predict(steps=5, uncertainty_samples=0)
+    checks.check("uncertainty_samples=0: aralık yok (yhat_lower = yhat_upper = yhat)",
+                 none['yhat_lower'].equals(none['yhat']) and none['yhat_upper'].equals(none['yhat']))
+    checks.check("çağrı bazında örnek sayısı modelin ayarını değiştirmiyor", model.model.uncertainty_samples == 1000)
+    full = model.model.predict(model.model.history[['ds']].copy())
+    checks.check("fitted(): eğitim dönemi tahmini ve bileşenleri", np.allclose(model.fitted()['yhat'], full['yhat'])
+                 and np.allclose(model.fitted()['weekly'], full['weekly']))
+
+    print("\n--- Hız (1 adım) ---")
+    legacy_ms = best_of(lambda: legacy_predict(model, 1), args.repeat)
+    new_ms = best_of(lambda: model.predict(steps=1), args.repeat)
+    fast_ms = best_of(lambda: model.predict(steps=1, uncertainty_samples=0), args.repeat)
+    print(f"      eski (geçmiş + ufuk): {legacy_ms:.0f} ms | sadece ufuk: {new_ms:.0f} ms | "
+          f"sadece ufuk, örneklemesiz: {fast_ms:.0f} ms")
+    checks.check("sadece ufuk tahmini en az 5 kat hızlı", legacy_ms / new_ms >= 5, f"({legacy_ms / new_ms:.0f}x)")
+    ms_30 = best_of(lambda: model.predict(steps=30), args.repeat)
+    print(f"      sadece ufuk, 30 adım: {ms_30:.0f} ms")
+
+    print("\n--- Kaydet/yükle ---")
+    folder = tempfile.mkdtemp(prefix="prophet_")
+    path = os.path.join(folder, "prophet.pkl")
+    model.save(path)
+    loaded = ProphetModel()
+    loaded.load(path)
+    checks.check("önbellek kayıtla birlikte geliyor", loaded.in_sample is not None
+                 and loaded.fitted().equals(model.fitted()))
+    joblib.dump(model.model, path)                       # Eski format: Sadece Prophet nesnesi
+    old_format = ProphetModel()
+    old_format.load(path)
+    checks.check("eski format yükleniyor, önbellek ilk ihtiyaçta kuruluyor",
+                 np.allclose(old_format.predict(steps=3, uncertainty_samples=0)['yhat'], model.predict(steps=3)['yhat'])
+                 and np.allclose(old_format.fitted()['yhat'], model.fitted()['yhat']))
+
+    shutil.rmtree(folder)
+    checks.finish()
+
+
+if __name__ == "__main__":
+    main()
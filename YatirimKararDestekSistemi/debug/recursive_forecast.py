@@ -0,0 +1,118 @@
+import sys
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import warnings
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.arima.model import ARIMA
+
+# --- PATH AYARLARI ---
+# Dosya 'debug' klasöründe olduğu için proje köküne (src'nin yanına) çıkıyoruz.
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+# ---------------------
+
+from checks import Checks
+from src.ai_core.ai_models.machine_learning import XGBoostModel
+from src.ai_core.data_processor import DataProcessor
+from src.ai_core.engine import AIEngine
+from src.ai_core.feature_engineering import FeatureEngineer
+from src.ai_core.streaming_features import FeatureState
+from src.services.market_providers import ReplayProvider
+
+warnings.simplefilter('ignore')
+
+
+def naive_path(model: XGBoostModel, fe: FeatureEngineer, df: pd.DataFrame, steps: int) -> np.ndarray:
+    """Referans: Her adımda sentetik barı ham veriye ekleyip TÜM geçmişin özelliklerini yeniden hesaplar."""
+    df = df.copy()
+    last = df.iloc[-1]
+    high_ratio, low_ratio = last['High'] / last['Close'], last['Low'] / last['Close']
+    volume = float(df['Volume'].tail(14).mean())
+    path = []
+    for _ in range(steps):
+        features = fe.create_features(df)
+        close = float(model.predict(features)['predicted_price'].iloc[0])
+        path.append(close)
+        open_ = float(df['Close'].iloc[-1])
+        date = df['Date'].iloc[-1] + pd.offsets.BDay(1)
+        bar = {'Date': date, 'Open': open_, 'High': max(open_, close, close * high_ratio),
+               'Low': min(open_, close, close * low_ratio), 'Close': close, 'Volume': volume}
+        df = pd.concat([df, pd.DataFrame([bar])], ignore_index=True)
+    return np.array(path)
+
+
+def timed(func, repeat: int = 3) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="XGBoost özyinelemeli çok adımlı tahmin: tutarlılık ve maliyet")
+    parser.add_argument("--symbol", default="ASELS")
+    parser.add_argument("--naive-steps", type=int, default=7, help="Tam yeniden hesaplamalı referansın adım sayısı")
+    args = parser.parse_args()
+    checks = Checks()
+
+    df = ReplayProvider(end_date="2025-01-31").history(args.symbol).rename_axis('Date').reset_index()
+    fe = FeatureEngineer()
+    df_ml = fe.create_features(df)
+    model = XGBoostModel()
+    model.train(df_ml, target_col='Close')
+    state = FeatureState.from_history(df)
+    print(f"\n{args.symbol}: {len(df)} gün, son bar {df['Date'].iloc[-1].date()}")
+
+    print("\n--- Tutarlılık ---")
+    path = model.forecast(state, 30)
+    t1 = model.predict(df_ml)['predicted_price'].iloc[0]
+    checks.check("1. adım = mevcut T+1 tahmini", np.isclose(path['predicted_price'].iloc[0], t1, rtol=1e-6))
+    expected = naive_path(model, fe, df, args.naive_steps)
+    checks.check(f"{args.naive_steps} adım = her adımda tüm özellikleri yeniden hesaplayan döngü",
+                 np.allclose(path['predicted_price'].iloc[:args.naive_steps], expected, rtol=1e-6))
+    checks.check("verilen durum değişmiyor", state.count == len(df) and state.last_date == df['Date'].iloc[-1])
+    checks.check("predict(df, steps=30) = forecast(durum, 30)", model.predict(df, steps=30).equals(path))
+    checks.check("index: son bardan sonraki iş günleri", path.index[0] > df['Date'].iloc[-1]
+                 and (path.index.dayofweek < 5).all() and len(path) == 30)
+
+    print("\n--- Maliyet ---")
+    ms = {steps: timed(lambda: model.forecast(state, steps)) for steps in (7, 30, 120)}
+    naive_ms = timed(lambda: naive_path(model, fe, df, args.naive_steps), repeat=1)
+    print(f"      özyinelemeli: 7 adım {ms[7]:.1f} ms | 30 adım {ms[30]:.1f} ms | 120 adım {ms[120]:.1f} ms")
+    print(f"      tam yeniden hesaplama: {args.naive_steps} adım {naive_ms:.0f} ms")
+    per_step = [ms[s] / s for s in ms]
+    checks.check("maliyet ufukla doğrusal (adım başına süre sabit)", max(per_step) / min(per_step) < 2.5,
+                 f"({min(per_step):.2f}-{max(per_step):.2f} ms/adım)")
+    speedup = naive_ms / ms[7] * 7 / args.naive_steps
+    checks.check("tam yeniden hesaplamadan en az 10 kat hızlı", speedup >= 10, f"({speedup:.0f}x)")
+
+    print("\n--- AIEngine.forecast_path (7 / 30 gün) ---")
+    folder = tempfile.mkdtemp(prefix="forecast_")
+    processor = DataProcessor(raw_data_dir=os.path.join(folder, "raw"), store_dir=os.path.join(folder, "store"),
+                              provider=ReplayProvider(end_date="2025-01-31"))
+    engine = AIEngine(models_dir=os.path.join(folder, "models"), processor=processor, trend_model="trend")
+    paths = {steps: engine.forecast_path(args.symbol, steps=steps) for steps in (7, 30)}
+    checks.check("7 ve 30 günlük yollar", [len(p) for p in paths.values()] == [7, 30]
+                 and not any(p.isna().any().any() for p in paths.values()))
+    latest = engine.fe.latest_features(args.symbol, processor.load_data(args.symbol))
+    next_day = engine.get_models(args.symbol).xgb.predict(latest)['predicted_price'].iloc[0]
+    checks.check("yolun ilk adımı = predict_next_day (XGBoost)", np.isclose(paths[7]['xgboost'].iloc[0], next_day))
+    # Yedi_otuzGün_tahmin.py'deki ARIMA(5,1,2) ile yan yana (karşılaştırma amaçlı)
+    history = processor.load_data(args.symbol, refresh=False)['Close'].reset_index(drop=True)
+    table = paths[7].copy()
+    table['ARIMA'] = ARIMA(history, order=(5, 1, 2)).fit().forecast(steps=7).to_numpy()
+    print(table.round(4).to_string())
+
+    shutil.rmtree(folder)
+    checks.finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,7 @@ sys.path.append(project_root)
 
 from src.data.database import engine, Base, SessionLocal
 # Tüm modelleri (yeni eklenenler dahil) import ediyoruz ki metadata eksiksiz olsun
-from src.data.models import User, Security, PriceHistory, AiPrediction, PortfolioHolding, Transaction, Budget, FinancialGoal
+from src.data.models import User, Security, PriceHistory, LatestPrice, AiPrediction, PortfolioHolding, Transaction, Budget, FinancialGoal
 
 def reset_database():
     print("UYARI: Bu işlem veritabanındaki TÜM VERİLERİ SİLECEK ve tabloları yeniden oluşturacak.")
@@ -36,7 +36,7 @@ def reset_database():
             print("   -> Tablolar tek tek siliniyor...")
             tables_to_drop = [
                 "financial_goals", "budgets", "transactions", "portfolio_holdings", 
-                "price_history", "ai_predictions", "securities", "users", "sim_trades", "sim_sessions"
+                "latest_prices", "price_history", "ai_predictions", "securities", "users", "sim_trades", "sim_sessions"
             ]
             
             for table in tables_to_drop:
@@ -0,0 +1,154 @@
+import sys
+import os
+import time
+import argparse
+import tempfile
+import threading
+from unittest import mock
+import numpy as np
+import pandas as pd
+
+# --- PATH AYARLARI ---
+# Dosya 'debug' klasöründe olduğu için proje köküne (src'nin yanına) çıkıyoruz.
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+# ---------------------
+
+from checks import Checks, check_rows
+from src.ai_core.feature_engineering import FeatureEngineer
+from src.ai_core.streaming_features import FeatureState
+from src.services.market_providers import ReplayProvider
+
+DEFAULT_SYMBOLS = ["ASELS", "THYAO", "GARAN", "EREGL"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Akan (streaming) özellik hesaplaması: toplu hesaplamayla tutarlılık ve hız")
+    parser.add_argument("--symbols", nargs="+", default=DEFAULT_SYMBOLS)
+    parser.add_argument("--bars", type=int, default=300, help="Geçmişin sonundan bar bar işlenecek gün sayısı")
+    parser.add_argument("--rtol", type=float, default=1e-9)
+    args = parser.parse_args()
+
+    provider = ReplayProvider(end_date="2025-01-31")
+    checks = Checks()
+    tmp_dir = tempfile.mkdtemp(prefix="feature_state_")
+    checkpoint_path = os.path.join(tmp_dir, "states.json")
+
+    print(f"\n--- Bar bar güncelleme vs create_features (son {args.bars} bar) ---")
+    for symbol in args.symbols:
+        df = provider.history(symbol).rename_axis('Date').reset_index()
+        batch = FeatureEngineer(use_lags=True).create_features(df)
+        split = len(df) - args.bars
+
+        fe = FeatureEngineer(use_lags=True)
+        fe.init_state(symbol, df.iloc[:split])
+        rows = []
+        for i in range(split, len(df)):
+            # Yarıda kontrol noktası: Yeni bir FeatureEngineer kaldığı yerden devam etmeli
+            if i == split + args.bars // 2:
+                fe.checkpoint(checkpoint_path, [symbol])
+                fe = FeatureEngineer(use_lags=True)
+                fe.restore(checkpoint_path)
+            bar = df.iloc[i]
+            preview = fe.update(symbol, bar, commit=False)
+            row = fe.update(symbol, bar)
+            checks.add(check_rows(f"{symbol} önizleme (commit=False) bar {i}", row, preview, 0) if not
+                       preview.equals(row) else True)
+            rows.append(row)
+        streamed = pd.concat(rows)
+        expected = batch.loc[batch.index.intersection(streamed.index)]
+        checks.add(check_rows(f"{symbol} update()", expected, streamed.loc[expected.index], args.rtol))
+
+        # latest_features: Yeni gelen birkaç bar sadece durum üzerinden işlenmeli
+        fe = FeatureEngineer(use_lags=True)
+        fe.latest_features(symbol, df.iloc[:-5])
+        checks.add(check_rows(f"{symbol} latest_features (+5 bar)", batch.iloc[[-1]],
+                              fe.latest_features(symbol, df), args.rtol))
+
+    # Kısa geçmiş: Isınma süresinde de toplu hesaplamayla aynı satırlar üretilmeli
+    df = provider.history(args.symbols[0]).rename_axis('Date').reset_index().head(120)
+    fe = FeatureEngineer(use_lags=True)
+    fe.init_state("ISINMA", df.iloc[:1])
+    streamed = pd.concat([fe.update("ISINMA", df.iloc[i]) for i in range(1, len(df))])
+    batch = FeatureEngineer(use_lags=True).create_features(df)
+    checks.add(check_rows("ısınma (1 bardan başlayarak)", batch, streamed.loc[batch.index], args.rtol))
+
+    # Kilitler: Bir hissenin durumu geçmişten yeniden kurulurken başka bir hissenin güncellemesi beklememeli
+    print("\n--- Hisse kilitleri ---")
+    fe = FeatureEngineer(use_lags=True)
+    other = provider.history(args.symbols[1]).rename_axis('Date').reset_index()
+    fe.latest_features(args.symbols[1], other.iloc[:-1])
+    entered, release = threading.Event(), threading.Event()
+    from_history = FeatureState.from_history
+
+    def slow_history(df, use_lags=True):
+        if threading.current_thread().name == "rebuild":
+            entered.set()
+            release.wait(10)
+        return from_history(df, use_lags=use_lags)
+
+    with mock.patch.object(FeatureState, "from_history", staticmethod(slow_history)):
+        rebuild = threading.Thread(target=fe.latest_features, args=(args.symbols[0], df), name="rebuild")
+        rebuild.start()
+        entered.wait(10)
+        incremental = threading.Thread(target=fe.latest_features, args=(args.symbols[1], other))
+        incremental.start()
+        incremental.join(5)
+        free = not incremental.is_alive()
+        release.set()
+        rebuild.join()
+        incremental.join()
+    checks.check("yeniden kurulum sürerken diğer hisse güncellendi", free)
+
+    # Aynısı artımlı ilerletme için: Bir hissenin yeni barları işlenirken ortak kilit tutulmamalı
+    fe.latest_features(args.symbols[0], df.iloc[:-3])
+    entered.clear(), release.clear()
+    state_update = FeatureState.update
+
+    def slow_update(self, bar, commit=True):
+        if threading.current_thread().name == "advance":
+            entered.set()
+            release.wait(10)
+        return state_update(self, bar, commit=commit)
+
+    fe.latest_features(args.symbols[1], other.iloc[:-1])
+    with mock.patch.object(FeatureState, "update", slow_update):
+        advance = threading.Thread(target=fe.latest_features, args=(args.symbols[0], df), name="advance")
+        advance.start()
+        entered.wait(10)
+        incremental = threading.Thread(target=fe.latest_features, args=(args.symbols[1], other))
+        incremental.start()
+        incremental.join(5)
+        free = not incremental.is_alive()
+        release.set()
+        advance.join()
+        incremental.join()
+    checks.check("yeni barlar işlenirken diğer hisse güncellendi", free)
+
+    # Hız: Tek bar güncellemesi vs tüm geçmişin yeniden hesaplanması
+    df = provider.history(args.symbols[0]).rename_axis('Date').reset_index()
+    bars = df.iloc[-200:].to_dict("records")
+    timings = {}
+    for as_frame in (True, False):
+        fe = FeatureEngineer(use_lags=True)
+        fe.init_state("HIZ", df.iloc[:-200])
+        t0 = time.perf_counter()
+        for bar in bars:
+            fe.update("HIZ", bar, as_frame=as_frame)
+        timings[as_frame] = (time.perf_counter() - t0) / len(bars) * 1e6
+    t0 = time.perf_counter()
+    for _ in range(10):
+        FeatureEngineer(use_lags=True).create_features(df)
+    full_us = (time.perf_counter() - t0) / 10 * 1e6
+    print(f"\n   create_features ({len(df)} satır): {full_us:.0f} µs")
+    print(f"   update() -> DataFrame: {timings[True]:.0f} µs/bar ({full_us / timings[True]:.0f}x)")
+    print(f"   update() -> dict     : {timings[False]:.0f} µs/bar ({full_us / timings[False]:.0f}x)")
+
+    os.remove(checkpoint_path)
+    os.rmdir(tmp_dir)
+    checks.finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# test_downloader.py
+# BulkDownloader'ı ağ bağlantısı olmadan, sahte (fake) bir sağlayıcı ile dener.
+
+import sys
+import os
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+
+# --- PATH AYARLARI ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+# ---------------------
+
+from src.ai_core.data_processor import DataProcessor
+from src.services.bulk_downloader import BulkDownloader
+from src.services.market_providers import MarketDataProvider, ReplayProvider
+
+class FakeFetcher(MarketDataProvider):
+    """Rastgele ama tekrarlanabilir OHLCV üretir; bazı sembollerde hata/boş veri simüle eder."""
+    def __init__(self, fail_once=("ERR1",), missing=("YOK",)):
+        self.fail_once = set(fail_once)
+        self.missing = set(missing)
+        self.calls = 0
+
+    def history(self, symbol, start=None, end=None, period=None):
+        return self.bulk_history([symbol]).get(symbol, pd.DataFrame())
+
+    def bulk_history(self, symbols, start=None, end=None, period=None):
+        self.calls += 1
+        if self.fail_once & set(symbols):
+            self.fail_once -= set(symbols)
+            raise ConnectionError("Geçici bağlantı hatası")
+        dates = pd.bdate_range(end="2025-01-31", periods=30, name="Date")
+        out = {}
+        for s in symbols:
+            if s in self.missing:
+                continue
+            rng = np.random.default_rng(abs(hash(s)) % 2**32)
+            close = 100 + rng.standard_normal(len(dates)).cumsum()
+            out[s] = pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1,
+                                   "Close": close, "Volume": 1000.0}, index=dates)
+        return out
+
+def main():
+    symbols = [f"S{i:03d}" for i in range(50)] + ["ERR1", "YOK"]
+    manifest = os.path.join(tempfile.mkdtemp(), "manifest.json")
+
+    fetcher = FakeFetcher()
+    dl = BulkDownloader(provider=fetcher, max_workers=4, batch_size=10, rate_per_sec=50,
+                        burst=5, backoff_base=0.01, checkpoint_path=manifest)
+    result = dl.download(symbols, period="1mo")
+
+    assert len(result["completed"]) == 51, result["failed"]
+    assert list(result["failed"]) == ["YOK"]
+    assert len(result["data"]["S000"]) == 30
+    print("Test 1 (paralel + tekrar deneme): OK")
+
+    # Aynı manifest ile yeniden başlat: tamamlananlar atlanmalı
+    fetcher2 = FakeFetcher(fail_once=())
+    dl2 = BulkDownloader(provider=fetcher2, batch_size=10, rate_per_sec=50, checkpoint_path=manifest)
+    result2 = dl2.download(symbols, period="1mo")
+    assert len(result2["skipped"]) == 51 and fetcher2.calls == 1
+    print("Test 2 (checkpoint ile devam): OK")
+
+    # Replay sağlayıcı: yapay gecikmeli, deterministik sentetik veri
+    replay = ReplayProvider(latency=0.01, end_date="2025-01-31")
+    dl3 = BulkDownloader(provider=replay, max_workers=8, batch_size=5, rate_per_sec=100, burst=8)
+    result3 = dl3.download(symbols[:20], period="2y")
+    first = result3["data"]["S000"]["Close"]
+    again = ReplayProvider(end_date="2025-01-31").history("S000", period="2y")["Close"]
+    assert len(result3["completed"]) == 20 and first.equals(again)
+    print("Test 3 (replay sağlayıcı): OK")
+
+    # Zaman aşımı: symbol_timeout ile grubun süresi grup boyutuyla ölçeklenir, gruplama korunur;
+    # sadece yavaş sembolün grubu düşer. Vazgeçilen isteğin anahtarı, geç gelen sonucu işlenince bırakılır.
+    class SlowFetcher(FakeFetcher):
+        def bulk_history(self, symbols, start=None, end=None, period=None):
+            if "YAVAS" in symbols:
+                time.sleep(0.5)
+            return super().bulk_history(symbols, start, end, period)
+
+    dl4 = BulkDownloader(provider=SlowFetcher(fail_once=(), missing=()), max_workers=4, batch_size=4,
+                         rate_per_sec=100, burst=8)
+    result4 = dl4.download(symbols[:7] + ["YAVAS"], period="1mo", symbol_timeout=0.05)
+    assert sorted(result4["failed"]) == ["S004", "S005", "S006", "YAVAS"], result4["failed"]
+    assert set(result4["failed"].values()) == {"Zaman aşımı (0.2 sn)"} and len(result4["completed"]) == 4
+    time.sleep(0.5)
+    assert not dl4._timed_out
+    print("Test 4 (grup boyutuyla ölçeklenen zaman aşımı): OK")
+
+    # Zaman aşımı geri çağrılar sürerken dolarsa: Kalan semboller yazılmaz, hiçbiri hem tamamlandı hem hatalı olmaz
+    written = []
+    def slow_save(symbol, frame):
+        time.sleep(0.1)
+        written.append(symbol)
+    dl6 = BulkDownloader(provider=FakeFetcher(fail_once=(), missing=()), batch_size=5, rate_per_sec=100, burst=8)
+    result6 = dl6.download(symbols[:5], period="1mo", timeout=0.25, on_result=slow_save)
+    count = len(written)
+    time.sleep(0.5)
+    assert len(written) == count < 5 and len(result6["failed"]) == 5 and not result6["completed"], result6
+    assert not dl6._timed_out
+    print("Test 5 (geri çağrı sırasında zaman aşımı): OK")
+
+    # refresh_universe: Küçük harfli semboller mevcut geçmişe eklenir (üzerine yazılmaz);
+    # son tarihten sonra bar yoksa (hafta sonu) sembol güncel sayılır, hatalı değil
+    folder = tempfile.mkdtemp()
+    def processor(end_date):
+        return DataProcessor(raw_data_dir=os.path.join(folder, "raw"), store_dir=os.path.join(folder, "store"),
+                             provider=ReplayProvider(end_date=end_date))
+    processor("2025-01-24").refresh_universe(["ASELS", "THYAO"])
+    before = len(processor("2025-01-24").load_data("ASELS", refresh=False))
+    report = processor("2025-01-31").refresh_universe(["asels", "thyao"])
+    after = processor("2025-01-31").load_data("ASELS", refresh=False)
+    assert not report["failed"] and len(after) == before + 5, (report, before, len(after))
+    report = processor("2025-01-31").refresh_universe(["ASELS", "thyao"])
+    assert sorted(report["completed"]) == ["ASELS", "THYAO"] and not report["failed"], report
+    print("Test 6 (refresh_universe: büyük/küçük harf, yeni bar yok): OK")
+
+if __name__ == "__main__":
+    main()
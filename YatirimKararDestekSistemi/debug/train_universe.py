@@ -0,0 +1,37 @@
+import sys
+import os
+import argparse
+
+# --- PATH AYARLARI ---
+# Dosya 'debug' klasöründe olduğu için proje köküne (src'nin yanına) çıkıyoruz.
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+# ---------------------
+
+from src.ai_core.engine import AIEngine
+from src.ai_core.data_processor import DataProcessor
+
+DEFAULT_SYMBOLS = ["ASELS", "THYAO", "EREGL", "GARAN", "AKBNK", "BIMAS", "KCHOL", "SISE"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hisse evrenini süreç havuzunda paralel eğitir (gece eğitimi)")
+    parser.add_argument("--symbols", nargs="+", default=DEFAULT_SYMBOLS)
+    parser.add_argument("--workers", type=int, default=None, help="Süreç sayısı (varsayılan: çekirdek / thread)")
+    parser.add_argument("--threads", type=int, default=1, help="İşçi başına XGBoost/OpenMP/Stan thread sayısı")
+    parser.add_argument("--models-dir", default="models")
+    parser.add_argument("--store-dir", default="dataSets/store")
+    parser.add_argument("--force", action="store_true", help="Güncel modelleri de yeniden eğitir")
+    parser.add_argument("--no-refresh", action="store_true", help="Fiyatları indirmeden depodakilerle eğitir")
+    args = parser.parse_args()
+
+    engine = AIEngine(models_dir=args.models_dir, processor=DataProcessor(store_dir=args.store_dir))
+    report = engine.train_universe(args.symbols, max_workers=args.workers, threads_per_worker=args.threads,
+                                   refresh=not args.no_refresh, only_stale=not args.force)
+    print()
+    print(report.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
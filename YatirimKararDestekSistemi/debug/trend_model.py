@@ -0,0 +1,162 @@
+import sys
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import logging
+import warnings
+import numpy as np
+import pandas as pd
+
+# --- PATH AYARLARI ---
+# Dosya 'debug' klasöründe olduğu için proje köküne (src'nin yanına) çıkıyoruz.
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+# ---------------------
+
+from checks import Checks
+from src.ai_core.ai_models.statistical import ProphetModel, TrendModel
+from src.ai_core.data_processor import DataProcessor
+from src.ai_core.engine import AIEngine
+from src.services.market_providers import ReplayProvider
+
+warnings.simplefilter('ignore')
+logging.getLogger("cmdstanpy").disabled = True
+
+HORIZONS = [1, 5, 20]
+
+
+def seasonal_series(n: int, seed: int) -> pd.DataFrame:
+    """Bilinen parçalı trend + haftalık/yıllık mevsimsellik + gürültü (iş günleri). 'Truth' gürültüsüz seridir."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2014-01-01", periods=n)
+    t = np.arange(n) / n
+    trend = 50 + 40 * t - 60 * np.maximum(t - 0.4, 0) + 90 * np.maximum(t - 0.7, 0)
+    doy = dates.dayofyear.to_numpy() / 365.25
+    season = 3 * np.sin(2 * np.pi * doy) + 1.5 * np.cos(4 * np.pi * doy) + 0.4 * (dates.dayofweek.to_numpy() - 2)
+    truth = trend + season
+    return pd.DataFrame({"Date": dates, "Close": truth + rng.normal(0, 1.0, n), "Truth": truth})
+
+
+def fit_timed(model, df: pd.DataFrame) -> float:
+    started = time.perf_counter()
+    model.train(df, target_col='Close')
+    return time.perf_counter() - started
+
+
+def predict_timed(model, dates):
+    """Verilen tarihlerin tahmini (Prophet kendi takvimini kurmaz, iki model aynı tarihlerde kıyaslanır)."""
+    started = time.perf_counter()
+    forecast = model.predict(pd.DataFrame({'Date': dates}))['yhat'].to_numpy()
+    return forecast, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hafif trend modeli: Prophet'e göre hız ve doğruluk")
+    parser.add_argument("--symbols", nargs="+", default=["ASELS", "THYAO", "GARAN", "BIMAS"])
+    parser.add_argument("--cutoffs", type=int, default=3, help="Hisse başına geriye dönük tahmin noktası")
+    parser.add_argument("--tolerance", type=float, default=1.3,
+                        help="Kabul: Trend getiri hatası <= tolerance x Prophet getiri hatası")
+    args = parser.parse_args()
+    checks = Checks()
+
+    # 1. Bilinen yapı: Gürültüsüz seriye yakınlık (trend kırılmaları + mevsimsellik geri kazanılıyor mu?)
+    print("\n--- Bilinen trend + mevsimsellik (gürültüsüz seriye RMSE) ---")
+    df = seasonal_series(2600, seed=3)
+    train, test = df.iloc[:-20], df.iloc[-20:]
+    errors = {}
+    for model in (ProphetModel(), TrendModel()):
+        fit_s = fit_timed(model, train[['Date', 'Close']])
+        forecast, _ = predict_timed(model, test['Date'])
+        errors[model.model_name] = np.sqrt(np.mean((forecast - test['Truth'].to_numpy()) ** 2))
+        print(f"      {model.model_name:<8} eğitim {fit_s:6.2f} sn | 20 gün RMSE {errors[model.model_name]:.3f}")
+    checks.check("Trend modeli yapıyı Prophet kadar iyi geri kazanıyor",
+                 errors["Trend"] <= args.tolerance * errors["Prophet"] + 0.05)
+
+    # 2. Sentetik hisseler: Geriye dönük (rolling-origin) getiri tahmini hatası ve süreler.
+    # Seviye (fiyat) hatası rastgele yürüyüşte uzun vadeli trendin son kapanıştan sapmasını ölçer ve
+    # iki modeli de son kapanışın çok gerisine düşürür; bu yüzden h günlük GETİRİ kıyaslanır:
+    # Tahmin edilen getiri = (yhat(t+h) - yhat(t)) / Close(t), gerçekleşen = Close(t+h) / Close(t) - 1 (yüzde puan).
+    print("\n--- Geriye dönük h günlük getiri tahmini (ReplayProvider hisseleri) ---")
+    provider = ReplayProvider(end_date="2025-01-31")
+    errors = {name: {h: [] for h in HORIZONS} for name in ("Prophet", "Trend", "Naive")}
+    hits = {name: {h: [] for h in HORIZONS} for name in ("Prophet", "Trend")}
+    fit_times = {"Prophet": [], "Trend": []}
+    predict_times = {"Prophet": [], "Trend": []}
+    for symbol in args.symbols:
+        history = provider.history(symbol).rename_axis('Date').reset_index()[['Date', 'Close']]
+        for c in range(args.cutoffs):
+            end = len(history) - max(HORIZONS) - 60 * c
+            train, future = history.iloc[:end], history.iloc[end:end + max(HORIZONS)]
+            last_close = train['Close'].iloc[-1]
+            actual = (future['Close'].to_numpy() / last_close - 1) * 100
+            for h in HORIZONS:
+                errors["Naive"][h].append(abs(actual[h - 1]))        # Getiri 0 (son kapanış korunur)
+            dates = pd.concat([train['Date'].iloc[[-1]], future['Date']])
+            for model in (ProphetModel(), TrendModel()):
+                fit_times[model.model_name].append(fit_timed(model, train))
+                forecast, predict_s = predict_timed(model, dates)
+                predict_times[model.model_name].append(predict_s)
+                predicted = (forecast[1:] - forecast[0]) / last_close * 100
+                for h in HORIZONS:
+                    errors[model.model_name][h].append(abs(predicted[h - 1] - actual[h - 1]))
+                    hits[model.model_name][h].append(np.sign(predicted[h - 1]) == np.sign(actual[h - 1]))
+
+    print(f"      {'Model':<8} {'eğitim':>9} {'tahmin':>9} " + " ".join(f"{'MAE t+' + str(h):>9}" for h in HORIZONS)
+          + "   yön isabeti")
+    for name in ("Prophet", "Trend"):
+        mae = " ".join(f"{np.mean(errors[name][h]):>7.2f}pp" for h in HORIZONS)
+        hit = " ".join(f"{np.mean(hits[name][h]) * 100:>3.0f}%" for h in HORIZONS)
+        print(f"      {name:<8} {np.mean(fit_times[name]):>7.3f} s {np.mean(predict_times[name]) * 1000:>6.1f} ms "
+              f"{mae}   {hit}")
+    print(f"      {'Naive':<8} {'(getiri 0)':>19} " + " ".join(f"{np.mean(errors['Naive'][h]):>7.2f}pp"
+                                                        for h in HORIZONS))
+    speedup = np.mean(fit_times["Prophet"]) / np.mean(fit_times["Trend"])
+    checks.check("eğitim Prophet'ten en az 10 kat hızlı", speedup >= 10, f"({speedup:.0f}x)")
+    worst = max(np.mean(errors["Trend"][h]) / np.mean(errors["Prophet"][h]) for h in HORIZONS)
+    checks.check(f"tüm ufuklarda getiri hatası <= {args.tolerance} x Prophet", worst <= args.tolerance,
+                 f"(en kötü oran {worst:.2f})")
+    # Bu kontrol sadece Prophet'in yerine geçebilirliği (eşdeğerlik) içindir, tahmin başarısı değil
+    beaten = [h for h in HORIZONS if np.mean(errors["Trend"][h]) < np.mean(errors["Naive"][h])]
+    if len(beaten) < len(HORIZONS):
+        print(f"   ⚠️ Trend modeli naive'i sadece {len(beaten)}/{len(HORIZONS)} ufukta geçiyor: Seviyeye eklenen "
+              "sabit mevsimsellik, fiyat ölçeği değişen seride hata üretir (Prophet'te de aynı).")
+
+    # 3. Sadece gelecek satırlar + kaydet/yükle
+    print("\n--- Arayüz ---")
+    model = TrendModel()
+    model.train(history)
+    forecast = model.predict(steps=5)
+    last = history['Date'].iloc[-1]
+    checks.check("predict(steps=5): 5 satır, hepsi son eğitim gününden sonraki iş günleri",
+                 len(forecast) == 5 and (forecast['ds'] > last).all() and (forecast['ds'].dt.dayofweek < 5).all())
+    checks.check("tahmin aralığı ufukla genişliyor",
+                 np.all(np.diff(forecast['yhat_upper'] - forecast['yhat_lower']) >= 0))
+    folder = tempfile.mkdtemp(prefix="trend_")
+    path = os.path.join(folder, "trend.pkl")
+    model.save(path)
+    loaded = TrendModel()
+    loaded.load(path)
+    checks.check("kaydet/yükle sonrası aynı tahmin", loaded.predict(steps=5).equals(forecast))
+
+    # 4. AIEngine'de seçim: Kayıt trend modelini hatırlıyor, seçim değişince yeniden eğitiliyor
+    print("\n--- AIEngine(trend_model='trend') ---")
+    processor = DataProcessor(raw_data_dir=os.path.join(folder, "raw"), store_dir=os.path.join(folder, "store"),
+                              provider=ReplayProvider(end_date="2025-01-31"))
+    engine = AIEngine(models_dir=os.path.join(folder, "models"), processor=processor, trend_model="trend")
+    prediction = engine.predict_next_day("ASELS")
+    bundle = engine.registry.load("ASELS")
+    checks.check("kayıttan TrendModel yükleniyor", isinstance(bundle.prophet, TrendModel)
+                 and bundle.meta.get("trend_model") == "trend", f"(tahmin {prediction['predicted_price']:.4f})")
+    other = AIEngine(models_dir=os.path.join(folder, "models"), processor=processor, trend_model="prophet")
+    reason = other.registry.staleness(bundle.meta, processor.load_data("ASELS", refresh=False), bundle.feature_columns)
+    checks.check("farklı trend modeli seçilince kayıt bayat", reason == "Trend modeli değişmiş")
+
+    shutil.rmtree(folder)
+    checks.finish()
+
+
+if __name__ == "__main__":
+    main()
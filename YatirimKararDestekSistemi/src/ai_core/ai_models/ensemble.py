@@ -28,17 +28,18 @@ class EnsembleModel:
             
         return weighted_sum / total_weight
 
-    def generate_signal(self, current_price, predicted_price, volatility):
+    def generate_signal(self, current_price, predicted_price, volatility, threshold: float = 1.5):
         """
         Fiyat tahminine ve volatilite riskine göre AL/SAT sinyali üretir.
+        threshold: Sinyal için beklenen en az değişim (%).
         """
         change_pct = ((predicted_price - current_price) / current_price) * 100
         
         signal = "TUT"
         # Eşik değerleri (%1.5 kar beklentisi)
-        if change_pct > 1.5:
+        if change_pct > threshold:
             signal = "AL"
-        elif change_pct < -1.5:
+        elif change_pct < -threshold:
             signal = "SAT"
             
         # Risk Filtresi
@@ -46,4 +47,27 @@ class EnsembleModel:
             if signal == "AL": signal = "RİSKLİ AL"
             elif signal == "SAT": signal = "RİSKLİ SAT"
             
-        return signal, change_pct
\ No newline at end of file
+        return signal, change_pct
+
+    def predict_horizons(self, model, features: pd.DataFrame, current_price: float, volatility: float,
+                         trend=None) -> pd.DataFrame:
+        """
+        Çok günlük sinyaller tek toplu çağrıyla: model.predict_horizons (DirectHorizonModel) tüm
+        ufukları bir kerede tahmin eder. Trend modeli (Prophet/TrendModel) verilirse aynı hedef
+        tarihler tek predict çağrısıyla tahmin edilip ağırlıklarla birleştirilir.
+        Sinyal eşiği ufkun kareköküyle büyür (1 gün %1.5, 5 gün ~%3.4, 20 gün ~%6.7).
+
+        Returns: index ufuk (gün); Date, predicted_price, change_pct, signal sütunları.
+        """
+        horizons = model.predict_horizons(features)
+        preds = {"xgboost": horizons['predicted_price'].to_numpy()}
+        if trend is not None:
+            preds["prophet"] = trend.predict(horizons[['Date']])['yhat'].to_numpy()
+        result = horizons[['Date']].copy()
+        result['predicted_price'] = self.combine_predictions(preds)
+
+        signals = [self.generate_signal(current_price, price, volatility, threshold=1.5 * np.sqrt(h))
+                   for h, price in zip(result.index, result['predicted_price'])]
+        result['signal'] = [signal for signal, _ in signals]
+        result['change_pct'] = [change for _, change in signals]
+        return result[['Date', 'predicted_price', 'change_pct', 'signal']]
@@ -1,10 +1,21 @@
 import pandas as pd
 import numpy as np
 import joblib
+import xgboost as xgb
 from xgboost import XGBRegressor
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import TimeSeriesSplit, RandomizedSearchCV
 from src.ai_core.base import BaseModel
+from src.ai_core.streaming_features import FeatureState
+from src.ai_core.indicators import INDICATOR_COLUMNS, LAG_COLUMNS
+
+# Doğrudan (direct) çok ufuklu modelin varsayılan ufukları (işlem günü)
+DEFAULT_HORIZONS = (1, 5, 20)
+
+# DirectHorizonModel params'ından XGBoost native parametrelerine (sklearn adı -> xgb.train adı)
+XGB_NATIVE_PARAMS = {"max_depth": "max_depth", "learning_rate": "eta", "subsample": "subsample",
+                     "colsample_bytree": "colsample_bytree", "min_child_weight": "min_child_weight",
+                     "n_jobs": "nthread", "random_state": "seed"}
 
 class XGBoostModel(BaseModel):
     """
@@ -65,26 +76,70 @@ class XGBoostModel(BaseModel):
         self.model = search.best_estimator_
         print(f"XGBoost Optimized Params: {search.best_params_}")
 
-    def predict(self, data: pd.DataFrame, steps: int = 1) -> pd.DataFrame:
+    def predict(self, data: pd.DataFrame, steps: int = 1, state: FeatureState = None) -> pd.DataFrame:
         """
         ML modelleri iteratif tahmin (Recursive Forecasting) yapar.
         T+1'i tahmin eder, onu veri setine ekler, T+2'yi tahmin eder...
+
+        steps=1: Son satırın özelliklerinden T+1 (Yarın) tahmini.
+        steps>1: Yol tahmini, bkz. forecast(). Özellik durumu (state) verilmezse data'nın ham
+        sütunlarından kurulur (data bu durumda en az 50 satırlık ham geçmiş olmalıdır).
         """
+        if steps > 1:
+            if state is None:
+                raw = data.set_index('Date') if 'Date' in data.columns else data
+                features = set(INDICATOR_COLUMNS + LAG_COLUMNS)
+                state = FeatureState.from_history(raw[[c for c in raw.columns if c not in features]])
+            return self.forecast(state, steps)
+
         # Veri hazırlığı
         if 'Date' in data.columns:
             data = data.set_index('Date')
-            
-        # Sadece son satırı alıp tahmin döngüsüne gireceğiz
-        # NOT: Gerçek recursive tahmin için feature'ları yeniden hesaplamak gerekir.
-        # Basitlik ve hız için burada sadece T+1 (Yarın) tahmini döndürüyoruz.
-        # Eğer steps > 1 ise daha karmaşık bir feature update döngüsü gerekir.
-        
+
         latest_features = data.drop(columns=['Close'], errors='ignore').iloc[[-1]] # Son satır (DataFrame olarak)
         
         prediction = self.model.predict(latest_features)
         
         return pd.DataFrame({'predicted_price': prediction}, index=[data.index[-1] + pd.Timedelta(days=1)])
 
+    def forecast(self, state: FeatureState, steps: int) -> pd.DataFrame:
+        """
+        Özyinelemeli yol tahmini: Her adımın tahmini sentetik bir bar olarak özellik durumuna
+        (FeatureState.update, O(pencere)) işlenir ve bir sonraki adımın özellikleri oradan okunur.
+        10 yıllık indikatörler adım başına yeniden hesaplanmaz; maliyet ufukla doğrusaldır.
+        Verilen durum değişmez (kopyası ilerletilir). Index: Son bardan sonraki iş günleri.
+
+        Sentetik bar: Açılış = önceki kapanış, hacim = son 14 günün ortalaması; yüksek/düşük son
+        gerçek barın kapanışa oranlarıyla (bar şekli) kurulur. Diğer ham sütunlar (Ör. 'Adj Close')
+        da son barın kapanışa oranıyla ölçeklenir.
+        """
+        if state.last_row is None:
+            raise ValueError("Yol tahmini için özellik durumu boş.")
+        state = state.copy()
+        booster = self.model.get_booster()
+        columns = booster.feature_names or [c for c in state.last_row if c not in ('Date', 'Close')]
+
+        last = state.last_row
+        high_ratio, low_ratio = last['High'] / last['Close'], last['Low'] / last['Close']
+        other = {c: last[c] / last['Close'] for c in state.raw_columns
+                 if c not in ('Date', 'Open', 'High', 'Low', 'Close', 'Volume')}
+        volume = float(np.mean(state.volumes))
+        start = state.last_date if state.last_date is not None else pd.Timestamp.now().normalize()
+        dates = pd.bdate_range(start + pd.offsets.BDay(1), periods=steps)
+
+        row, path = last, np.empty(steps)
+        for i, date in enumerate(dates):
+            x = np.array([[row[c] for c in columns]], dtype=np.float64)
+            close = float(booster.inplace_predict(x)[0])
+            path[i] = close
+            open_ = state.closes[-1]
+            row = state.update({
+                'Date': date, 'Open': open_, 'Close': close, 'Volume': volume,
+                'High': max(open_, close, close * high_ratio), 'Low': min(open_, close, close * low_ratio),
+                **{c: close * ratio for c, ratio in other.items()},
+            })
+        return pd.DataFrame({'predicted_price': path}, index=dates)
+
     def save(self, path: str) -> None:
         joblib.dump(self.model, path)
 
@@ -126,4 +181,111 @@ class RandomForestModel(BaseModel):
         joblib.dump(self.model, path)
 
     def load(self, path: str) -> None:
-        self.model = joblib.load(path)
\ No newline at end of file
+        self.model = joblib.load(path)
+
+
+class DirectHorizonModel(BaseModel):
+    """
+    Doğrudan (direct) çok ufuklu tahmin: Her ufuk h için hedef h işlem günü sonraki kapanıştır
+    (Close[t+h]); özyinelemeli tahminin (XGBoostModel.forecast) aksine tahminler birbirine beslenmez.
+
+    - Özellik matrisi TEK kez float32 olarak kurulur ve tek bir QuantileDMatrix'e (histogram
+      kutulanmış) çevrilir; tüm ufuklar bu matrisi paylaşır, sadece etiket/ağırlık değişir.
+      Hedefi olmayan son satırlar (t+h geçmişin dışında) sıfır ağırlıkla eğitime katılmaz.
+    - params['strategy']: 'per_horizon' (varsayılan, ufuk başına bir ağaç modeli) veya
+      'multi_output' (tek model, çok çıkışlı ağaçlar; en uzun ufkun hedefi olmayan satırlar düşer).
+    - params['horizons']: Ufuklar (varsayılan 1, 5, 20). Ağaç parametreleri XGBoostModel ile aynı adlarla verilir.
+    - predict_horizons(): Son satır için tüm ufukların tahmini tek çağrıda.
+    """
+    def __init__(self, model_name: str = "DirectHorizon", params=None):
+        super().__init__(model_name, params)
+        self.horizons = sorted(int(h) for h in self.params.get('horizons', DEFAULT_HORIZONS))
+        self.strategy = self.params.get('strategy', 'per_horizon')
+        if self.strategy not in ('per_horizon', 'multi_output'):
+            raise ValueError(f"Bilinmeyen strateji: {self.strategy} (per_horizon / multi_output)")
+        self.boosters = {} # {ufuk: Booster}; multi_output'ta tek Booster (anahtar: 'all')
+        self.feature_names = None
+
+    def _native_params(self) -> dict:
+        params = {"objective": "reg:squarederror", "tree_method": "hist"}
+        params.update({XGB_NATIVE_PARAMS[k]: v for k, v in self.params.items() if k in XGB_NATIVE_PARAMS})
+        if self.strategy == 'multi_output':
+            params["multi_strategy"] = "multi_output_tree"
+        return params
+
+    def train(self, data: pd.DataFrame, target_col: str = 'Close') -> None:
+        if 'Date' in data.columns:
+            data = data.set_index('Date')
+        features = data.drop(columns=[target_col], errors='ignore')
+        self.feature_names = list(features.columns)
+        close = data[target_col].to_numpy(dtype=np.float64)
+        n, max_h = len(close), max(self.horizons)
+        if n <= max_h:
+            raise ValueError(f"En uzun ufuk ({max_h}) için yetersiz veri: {n} satır.")
+
+        # Ortak matris: Bir kez kurulur, tüm ufuklarda kullanılır
+        X = np.ascontiguousarray(features.to_numpy(dtype=np.float32))
+        dtrain = xgb.QuantileDMatrix(X, feature_names=self.feature_names)
+        del X
+        rounds = self.params.get('n_estimators', 100)
+        params = self._native_params()
+
+        # Hedefler: targets[:, k] = Close[t + h_k], geçmişin dışında kalanlar 0 + sıfır ağırlık
+        targets = np.zeros((n, len(self.horizons)))
+        for k, h in enumerate(self.horizons):
+            targets[:n - h, k] = close[h:]
+
+        self.boosters = {}
+        if self.strategy == 'multi_output':
+            weight = np.ones(n)
+            weight[n - max_h:] = 0.0
+            dtrain.set_label(targets)
+            dtrain.set_weight(weight)
+            self.boosters['all'] = xgb.train(params, dtrain, num_boost_round=rounds)
+        else:
+            for k, h in enumerate(self.horizons):
+                weight = np.ones(n)
+                weight[n - h:] = 0.0
+                dtrain.set_label(targets[:, k])
+                dtrain.set_weight(weight)
+                self.boosters[h] = xgb.train(params, dtrain, num_boost_round=rounds)
+
+    def _predict_matrix(self, X: np.ndarray) -> np.ndarray:
+        """(satır x ufuk) tahmin matrisi."""
+        if self.strategy == 'multi_output':
+            return self.boosters['all'].inplace_predict(X).reshape(len(X), len(self.horizons))
+        return np.column_stack([self.boosters[h].inplace_predict(X) for h in self.horizons])
+
+    def predict_horizons(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Son satırın özelliklerinden tüm ufukların tahmini (tek çağrı).
+        Returns: index ufuk (gün), sütunlar Date (hedef iş günü) ve predicted_price.
+        """
+        if not self.boosters:
+            raise Exception("Model eğitilmeden tahmin yapılamaz.")
+        if 'Date' in data.columns:
+            data = data.set_index('Date')
+        X = data[self.feature_names].iloc[[-1]].to_numpy(dtype=np.float32)
+        prices = self._predict_matrix(X)[0]
+        if isinstance(data.index, pd.DatetimeIndex):
+            last = pd.Timestamp(data.index[-1])
+        else:
+            last = pd.Timestamp.now().normalize()
+        dates = [last + pd.offsets.BDay(h) for h in self.horizons]
+        return pd.DataFrame({'Date': dates, 'predicted_price': prices}, index=pd.Index(self.horizons, name='horizon'))
+
+    def predict(self, data: pd.DataFrame, steps: int = 1) -> pd.DataFrame:
+        """BaseModel arayüzü: 'steps' ufkunun tahmini (eğitilmiş ufuklardan biri olmalıdır)."""
+        if steps not in self.horizons:
+            raise ValueError(f"{steps} günlük ufuk eğitilmedi (Ufuklar: {self.horizons}).")
+        row = self.predict_horizons(data).loc[steps]
+        return pd.DataFrame({'predicted_price': [row['predicted_price']]}, index=[row['Date']])
+
+    def save(self, path: str) -> None:
+        joblib.dump({"horizons": self.horizons, "strategy": self.strategy, "boosters": self.boosters,
+                     "feature_names": self.feature_names}, path)
+
+    def load(self, path: str) -> None:
+        obj = joblib.load(path)
+        self.horizons, self.strategy = obj["horizons"], obj["strategy"]
+        self.boosters, self.feature_names = obj["boosters"], obj["feature_names"]
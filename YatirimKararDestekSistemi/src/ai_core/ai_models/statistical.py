@@ -1,9 +1,11 @@
 import pandas as pd
 import numpy as np
 import joblib
+import threading
 from prophet import Prophet
-from arch import arch_model
 from src.ai_core.base import BaseModel
+from src.ai_core.volatility import GarchState, fit_garch
+from src.ai_core.trend import PiecewiseTrend
 import warnings
 
 # GARCH uyarılarını bastırmak için (Convergence warning vb.)
@@ -13,10 +15,19 @@ class ProphetModel(BaseModel):
     """
     Facebook Prophet tabanlı Zaman Serisi Modeli.
     Trend ve Mevsimsellik (Haftalık/Yıllık) yakalamada çok iyidir.
+
+    Tahmin maliyeti geçmiş uzunluğuyla değil ufukla ölçeklenir:
+    - predict() sadece gelecek tarihleri Prophet'e verir (tüm geçmiş + ufuk yeniden hesaplanmaz).
+    - Eğitim dönemindeki tahmin ve bileşenler (trend, weekly, yearly, holidays...) eğitimde bir kez
+      hesaplanıp saklanır, bkz. fitted().
+    - params['uncertainty_samples'] (Prophet varsayılanı 1000): Tahmin aralığı için örnek sayısı;
+      0 ise örnekleme yapılmaz ve yhat_lower/yhat_upper = yhat olur. predict() içinde çağrı bazında da verilebilir.
     """
     def __init__(self, model_name: str = "Prophet", params=None):
         super().__init__(model_name, params)
         self.model = None
+        self.in_sample = None # Eğitim dönemi tahmini ve bileşenleri (örneklemesiz)
+        self._lock = threading.Lock() # Örnek sayısı çağrı bazında değiştiği için tahminler sıralı yapılır
 
     def train(self, data: pd.DataFrame, target_col: str = 'Close') -> None:
         # Prophet 'ds' (Tarih) ve 'y' (Hedef) sütun isimlerini zorunlu kılar
@@ -42,71 +53,213 @@ class ProphetModel(BaseModel):
             daily_seasonality=True, 
             yearly_seasonality=True,
             weekly_seasonality=True,
-            changepoint_prior_scale=self.params.get('changepoint_prior_scale', 0.05)
+            changepoint_prior_scale=self.params.get('changepoint_prior_scale', 0.05),
+            uncertainty_samples=self.params.get('uncertainty_samples', 1000)
         )
         self.model.add_country_holidays(country_name='TR') # Türkiye tatillerini ekle
         self.model.fit(df_prophet)
+        self.in_sample = self._forecast(self.model.history[['ds']], uncertainty_samples=0)
 
-    def predict(self, data: pd.DataFrame = None, steps: int = 1) -> pd.DataFrame:
+    def _forecast(self, future: pd.DataFrame, uncertainty_samples: int = None) -> pd.DataFrame:
+        """Sadece verilen 'ds' satırları için Prophet tahmini (örnek sayısı çağrı bazında değiştirilebilir)."""
+        with self._lock:
+            default = self.model.uncertainty_samples
+            if uncertainty_samples is not None:
+                self.model.uncertainty_samples = uncertainty_samples
+            try:
+                forecast = self.model.predict(future)
+            finally:
+                self.model.uncertainty_samples = default
+        if 'yhat_lower' not in forecast.columns:
+            # Örnekleme kapalı: Aralık üretilmez
+            forecast['yhat_lower'] = forecast['yhat_upper'] = forecast['yhat']
+        return forecast
+
+    def future_dates(self, steps: int, freq: str = 'D') -> pd.DatetimeIndex:
+        """Son eğitim gününden sonraki 'steps' tarih (make_future_dataframe ile aynı takvim)."""
+        last_date = self.model.history['ds'].max()
+        dates = pd.date_range(start=last_date, periods=steps + 1, freq=freq)
+        return dates[dates > last_date][:steps]
+
+    def predict(self, data: pd.DataFrame = None, steps: int = 1, uncertainty_samples: int = None) -> pd.DataFrame:
         """
         Prophet, tahmin için 'data'ya ihtiyaç duymaz, kendi takvimini oluşturur.
-        Ancak interface uyumu için data parametresi tutulmuştur.
+        Ancak interface uyumu için data parametresi tutulmuştur: 'Date' sütunu/Datetime index
+        verilirse o tarihler, yoksa son eğitim gününden sonraki 'steps' gün tahmin edilir.
         """
         if self.model is None:
             raise Exception("Model eğitilmeden tahmin yapılamaz.")
-            
-        future = self.model.make_future_dataframe(periods=steps)
-        forecast = self.model.predict(future)
-        
-        # Sadece geleceği ve önemli sütunları döndür
-        result = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].tail(steps)
-        return result
+
+        if data is not None and 'Date' in data.columns:
+            dates = pd.to_datetime(data['Date'])
+        elif data is not None and isinstance(data.index, pd.DatetimeIndex):
+            dates = data.index
+        else:
+            dates = self.future_dates(steps)
+        forecast = self._forecast(pd.DataFrame({'ds': pd.DatetimeIndex(dates)}), uncertainty_samples)
+
+        # Sadece önemli sütunları döndür
+        return forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
+
+    def fitted(self) -> pd.DataFrame:
+        """Eğitim dönemindeki tahmin ve bileşenler (önbellekten; eski kayıtlarda ilk çağrıda hesaplanır)."""
+        if self.model is None:
+            raise Exception("Model eğitilmeden tahmin yapılamaz.")
+        if self.in_sample is None:
+            self.in_sample = self._forecast(self.model.history[['ds']], uncertainty_samples=0)
+        return self.in_sample
 
     def save(self, path: str) -> None:
         # Prophet modeli pickle/joblib ile serileştirilebilir
-        joblib.dump(self.model, path)
+        joblib.dump({"model": self.model, "in_sample": self.in_sample}, path)
 
     def load(self, path: str) -> None:
-        self.model = joblib.load(path)
+        obj = joblib.load(path)
+        if isinstance(obj, dict):
+            self.model, self.in_sample = obj["model"], obj.get("in_sample")
+        else:
+            # Eski format: Sadece Prophet nesnesi (önbellek fitted() ile kurulur)
+            self.model, self.in_sample = obj, None
+
+
+class TrendModel(BaseModel):
+    """
+    Prophet'in hafif alternatifi: Parçalı doğrusal trend + haftalık/yıllık Fourier mevsimselliği,
+    cezalı en küçük kareler ile saniyenin altında eğitilir (bkz. src/ai_core/trend.py).
+    Çıktı sütunları ProphetModel ile aynıdır (ds, yhat, yhat_lower, yhat_upper).
+
+    Farklar: Tatil etkileri modellenmez (tatillerde bar yoktur), tahmin aralığı örneklemeyle değil
+    analitik hesaplanır ve gelecek tarihler iş günüdür (params['freq'], varsayılan 'B').
+    """
+    def __init__(self, model_name: str = "Trend", params=None):
+        super().__init__(model_name, params)
+        self.model = None
+
+    def train(self, data: pd.DataFrame, target_col: str = 'Close') -> None:
+        if 'Date' in data.columns:
+            dates = pd.to_datetime(data['Date'], dayfirst=True)
+        elif isinstance(data.index, pd.DatetimeIndex):
+            dates = data.index
+        else:
+            raise ValueError("Veri setinde 'Date' sütunu veya Datetime Index bulunamadı.")
+
+        self.model = PiecewiseTrend(
+            n_changepoints=self.params.get('n_changepoints', 25),
+            changepoint_prior_scale=self.params.get('changepoint_prior_scale', 0.05),
+            seasonality_prior_scale=self.params.get('seasonality_prior_scale', 10.0),
+            interval_width=self.params.get('interval_width', 0.8),
+        ).fit(dates, data[target_col])
+
+    def predict(self, data: pd.DataFrame = None, steps: int = 1) -> pd.DataFrame:
+        """
+        Sadece gelecek satırlar hesaplanır: data 'Date' sütunu/Datetime index içeriyorsa o tarihler,
+        yoksa son eğitim gününden sonraki 'steps' iş günü.
+        """
+        if self.model is None:
+            raise Exception("Model eğitilmeden tahmin yapılamaz.")
+        if data is not None and 'Date' in data.columns:
+            dates = pd.to_datetime(data['Date'])
+        elif data is not None and isinstance(data.index, pd.DatetimeIndex):
+            dates = data.index
+        else:
+            dates = self.model.future_dates(steps, freq=self.params.get('freq', 'B'))
+        return self.model.predict(dates)
+
+    def save(self, path: str) -> None:
+        joblib.dump(self.model.to_dict(), path)
+
+    def load(self, path: str) -> None:
+        self.model = PiecewiseTrend.from_dict(joblib.load(path))
 
 
 class GarchModel(BaseModel):
     """
     GARCH (Generalized Autoregressive Conditional Heteroskedasticity)
     Fiyatı DEĞİL, Riski (Volatiliteyi) tahmin eder.
+
+    Eğitim ve tahmin volatilite motorunu (src/ai_core/volatility.py) kullanır:
+    - params['starting_values']: Önceki eğitimin parametreleri (self.parameters) ile sıcak başlangıç.
+    - params['vol']: 'GARCH' (varsayılan) veya 'EGARCH'.
+    - params['p'], params['q']: Model derecesi (varsayılan 1, 1).
+    - Yeniden eğitimler arasında yeni kapanışlar update() ile O(1) işlenir; predict(data) eğitimden
+      sonra gelen barları durumu değiştirmeden hesaba katar. Bu özyineleme (GarchState) sadece
+      (1,1) içindir; diğer derecelerde durum tutulmaz, tahmin arch forecast ile eğitim sonundan yapılır.
     """
     def __init__(self, model_name: str = "GARCH", params=None):
         super().__init__(model_name, params)
         self.res = None # Model fit sonucu
+        self.state = None # Özyineleme durumu (GarchState)
+
+    @property
+    def parameters(self) -> dict:
+        """Eğitilmiş parametreler (bir sonraki eğitimde starting_values olarak verilebilir)."""
+        return {k: float(v) for k, v in self.res.params.items()} if self.res is not None else {}
 
     def train(self, data: pd.DataFrame, target_col: str = 'Close') -> None:
         # GARCH getiriler (returns) üzerinde çalışır
-        # Logaritmik getiri hesapla (Daha durağandır)
+        # Yüzde getiri hesapla (optimizasyon ölçeği için 100 ile çarpılır)
         returns = 100 * data[target_col].pct_change().dropna()
-        
+
         # GARCH(1,1) varsayılan standarttır
         p = self.params.get('p', 1)
         q = self.params.get('q', 1)
-        
-        self.model = arch_model(returns, vol='Garch', p=p, q=q, dist='Normal')
-        self.res = self.model.fit(disp='off')
+        vol = self.params.get('vol', 'GARCH').upper()
+        self.model, self.res = fit_garch(returns, vol=vol, starting_values=self.params.get('starting_values'),
+                                         p=p, q=q)
+        if (p, q) != (1, 1):
+            self.state = None
+            return
+        last_date = data['Date'].iloc[-1] if 'Date' in data.columns else data.index[-1]
+        self.state = GarchState.from_result(self.res, vol, last_close=float(data[target_col].iloc[-1]),
+                                            last_date=pd.Timestamp(last_date))
+
+    def update(self, close: float, date=None) -> float:
+        """Yeni kapanışı işler (O(1), yeniden eğitim yok). Bu barın koşullu volatilitesini döndürür."""
+        if self.state is None:
+            raise Exception("Model eğitilmeden (veya (1,1) dışı derecede) O(1) güncelleme yapılamaz.")
+        return float(np.sqrt(self.state.update_close(close, date)))
+
+    def _rolled_state(self, data: pd.DataFrame, target_col: str = 'Close') -> GarchState:
+        """Durumun, data'daki eğitimden/son güncellemeden sonraki barlarla ilerletilmiş kopyası."""
+        state = self.state.copy()
+        if data is None or data.empty or state.last_date is None:
+            return state
+        dates = pd.to_datetime(data['Date'] if 'Date' in data.columns else data.index)
+        new = np.asarray(dates > state.last_date)
+        for date, close in zip(dates[new], data[target_col].to_numpy()[new]):
+            state.update_close(close, date)
+        return state
 
     def predict(self, data: pd.DataFrame = None, steps: int = 1) -> pd.DataFrame:
         if self.res is None:
             raise Exception("Model eğitilmeden tahmin yapılamaz.")
-            
+
         # Volatilite tahmini (Variance -> Std Dev dönüşümü yapıyoruz)
-        forecast = self.res.forecast(horizon=steps)
-        variance = forecast.variance.values[-1, :]
+        if self.state is not None:
+            # Analitik tahmin (arch forecast ile aynı); data verilirse yeni barlar da işlenir
+            variance = self._rolled_state(data).forecast(steps)
+        else:
+            forecast = self.res.forecast(horizon=steps)
+            variance = forecast.variance.values[-1, :]
         volatility = np.sqrt(variance)
-        
+
         # DataFrame olarak döndür
         dates = pd.date_range(start=pd.Timestamp.now(), periods=steps, freq='B')
         return pd.DataFrame({'predicted_volatility': volatility}, index=dates)
 
     def save(self, path: str) -> None:
-        # GARCH sonucunu kaydetmek biraz tricklidir, joblib iş görür
-        joblib.dump(self.res, path)
-        
+        # GARCH sonucu + özyineleme durumu (joblib iş görür)
+        joblib.dump({"res": self.res, "state": self.state.to_dict() if self.state else None}, path)
+
     def load(self, path: str) -> None:
-        self.res = joblib.load(path)
\ No newline at end of file
+        obj = joblib.load(path)
+        if isinstance(obj, dict):
+            self.res = obj["res"]
+            self.state = GarchState.from_dict(obj["state"]) if obj.get("state") else None
+        else:
+            # Eski format: Sadece fit sonucu (durum yok, arch forecast kullanılır)
+            self.res, self.state = obj, None
+
+
+# Topluluktaki trend bileşeni için seçilebilir modeller (AIEngine(trend_model=...))
+TREND_MODELS = {"prophet": ProphetModel, "trend": TrendModel}
@@ -1,51 +1,52 @@
 import pandas as pd
 import numpy as np
 import os
-import yfinance as yf
 from datetime import datetime, timedelta
+from src.services.bulk_downloader import BulkDownloader, NO_DATA
+from src.services.market_providers import MarketDataProvider, get_default_provider
+from src.ai_core.storage import (
+    PriceStore, get_price_store, normalize_prices,
+    read_legacy_csv, export_csv, migrate_csv_dir
+)
 
 class DataProcessor:
     """
     Veri yükleme, temizleme, güncelleme ve ön işleme sınıfı.
-    Otomatik olarak Yahoo Finance üzerinden eksik verileri tamamlar.
+    Otomatik olarak piyasa verisi sağlayıcısı (varsayılan: Yahoo Finance) üzerinden eksik verileri tamamlar.
+    Veriler tipli, sütun bazlı bir depoda (Parquet/Feather) tutulur; CSV sadece dışa aktarım içindir.
     """
-    def __init__(self, raw_data_dir="dataSets/raw"):
+    def __init__(self, raw_data_dir="dataSets/raw", store_dir="dataSets/store", store="parquet",
+                 provider: MarketDataProvider = None):
         self.raw_data_dir = raw_data_dir
+        self.provider = provider or get_default_provider()
         os.makedirs(raw_data_dir, exist_ok=True)
+        # store parametresi backend adı ("parquet"/"feather") veya hazır bir PriceStore olabilir
+        self.store = store if isinstance(store, PriceStore) else get_price_store(store, store_dir)
 
-    def load_data(self, symbol: str) -> pd.DataFrame:
+    def load_data(self, symbol: str, refresh: bool = True) -> pd.DataFrame:
         """
         Belirtilen sembolün verisini yükler. 
         Eğer veri eskiyse Yahoo Finance'den günceller.
+        refresh=False ise sadece depodaki veri okunur (toplu güncelleme refresh_universe ile
+        önceden yapıldıysa sembol başına ağ isteği atılmaz). Depoda hiç veri yoksa yine indirilir.
         """
-        file_path = os.path.join(self.raw_data_dir, f"{symbol}.csv")
         df = None
         
-        # 1. MEVCUT DOSYAYI OKU (VARSA)
-        if os.path.exists(file_path):
+        # 1. DEPODAN OKU (VARSA) - Tipli sütunlar, parse gerektirmez
+        if self.store.exists(symbol):
             try:
-                # DÜZELTME 1: encoding='utf-8-sig' (Türkçe karakterler için)
-                df = pd.read_csv(file_path, encoding='utf-8-sig')
-                
-                # Sütun isimlerini İngilizce/Standart formata çevir
-                column_map = {
-                    'Tarih': 'Date', 'Açılış': 'Open', 'Yüksek': 'High', 
-                    'Düşük': 'Low', 'Kapanış': 'Close', 'Hacim': 'Volume',
-                    'Düzeltilmiş_Kapanış': 'Adj Close'
-                }
-                df.rename(columns=column_map, inplace=True)
-                
-                # Tarih formatını düzelt
-                if 'Date' in df.columns:
-                    df['Date'] = pd.to_datetime(df['Date'], dayfirst=True)
-                    df.sort_values('Date', inplace=True)
+                df = self.store.read(symbol)
             except Exception as e:
-                print(f"⚠️ CSV okuma hatası: {e}. Dosya yeniden oluşturulacak.")
+                print(f"⚠️ Depo okuma hatası: {e}. Veri yeniden oluşturulacak.")
                 df = None
+        else:
+            # Depoda yok ama eski CSV önbelleği varsa tek seferlik taşı
+            df = self._migrate_legacy_csv(symbol)
 
         # 2. GÜNCELLEME KONTROLÜ
         # Eğer df yoksa veya son tarih eskiyse güncelle
-        df = self._update_with_live_data(symbol, df, file_path)
+        if refresh or df is None or df.empty:
+            df = self._update_with_live_data(symbol, df)
         
         # 3. SON TEMİZLİK
         # Düzeltilmiş kapanış yoksa Close'u kopyala (Garanti olsun)
@@ -59,15 +60,36 @@ class DataProcessor:
         
         return df
 
-    def _update_with_live_data(self, symbol: str, df: pd.DataFrame, file_path: str) -> pd.DataFrame:
+    def _migrate_legacy_csv(self, symbol: str):
+        """dataSets/raw altındaki Türkçe başlıklı CSV'yi depoya aktarır (sadece ilk okumada)."""
+        file_path = os.path.join(self.raw_data_dir, f"{symbol}.csv")
+        if not os.path.exists(file_path):
+            return None
+        try:
+            df = read_legacy_csv(file_path)
+            self.store.write(symbol, df)
+            print(f"📦 {symbol} CSV önbelleği depoya taşındı.")
+            return df
+        except Exception as e:
+            print(f"⚠️ CSV okuma hatası: {e}. Dosya yeniden oluşturulacak.")
+            return None
+
+    def migrate_from_csv(self, overwrite: bool = False) -> dict:
+        """raw_data_dir altındaki tüm CSV'leri tek seferde depoya taşır."""
+        return migrate_csv_dir(self.raw_data_dir, self.store, overwrite=overwrite)
+
+    def export_csv(self, symbol: str, file_path: str = None) -> str:
+        """Depodaki veriyi eski formatta (Türkçe başlıklı) CSV olarak dışa aktarır."""
+        file_path = file_path or os.path.join(self.raw_data_dir, f"{symbol}.csv")
+        return export_csv(self.store.read(symbol), file_path)
+
+    def _update_with_live_data(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
         """
-        Yahoo Finance API kullanarak eksik günleri tamamlar ve CSV'yi günceller.
+        Yahoo Finance API kullanarak eksik günleri tamamlar ve depoyu günceller.
+        Mevcut geçmiş yeniden yazılmaz; sadece yeni günler depoya eklenir (append-only).
         """
         today = datetime.now()
         
-        # BIST hisseleri için .IS uzantısı ekle
-        yf_symbol = f"{symbol}.IS" if not symbol.endswith(".IS") else symbol
-        
         start_date = None
         
         # Başlangıç tarihini belirle
@@ -84,67 +106,127 @@ class DataProcessor:
         print(f"🌍 {symbol} için güncel veriler indiriliyor ({start_date.date()} - Bugün)...")
         
         try:
-            # Yahoo Finance'den çek
-            new_data = yf.download(
-                yf_symbol, 
-                start=start_date, 
-                end=today + timedelta(days=1),
-                progress=False
-            )
+            new_data = self._download(symbol, start_date, today)
             
             if new_data.empty:
                 print(f"⚠️ {symbol} için yeni veri bulunamadı. Mevcut veriyle devam ediliyor.")
                 return df if df is not None else pd.DataFrame()
 
-            new_data.reset_index(inplace=True)
-            
-            # DÜZELTME 2: 'Adj Close' EKLENDİ
-            required_cols = ['Date', 'Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
-            
-            # Sütun isimleri bazen ('Close', 'ASELS.IS') gibi tuple gelir, düzelt:
-            if isinstance(new_data.columns, pd.MultiIndex):
-                # Sütun isimlerini düzleştir
-                new_data.columns = [col[0] if isinstance(col, tuple) else col for col in new_data.columns]
-            
-            # Sadece ihtiyacımız olan sütunları al (Eğer Adj Close gelmezse hata vermesin diye intersection yapıyoruz)
-            available_cols = list(set(required_cols) & set(new_data.columns))
-            new_data = new_data[available_cols]
-
-            # Birleştirme (Concat)
-            if df is not None:
-                # Sütun uyumsuzluğunu önlemek için
-                # Eski veride Adj Close yoksa NaN ile oluştur
-                if 'Adj Close' not in df.columns:
-                    df['Adj Close'] = df['Close'] 
-                
-                updated_df = pd.concat([df, new_data], ignore_index=True)
-            else:
-                updated_df = new_data
+            if df is None or df.empty:
+                # İlk indirme: tüm geçmiş ana dosya olarak yazılır
+                self.store.write(symbol, new_data)
+                print(f"✅ {symbol} verileri indirildi ve kaydedildi.")
+                return new_data
 
-            # Tekrar eden tarihleri temizle
-            updated_df.drop_duplicates(subset=['Date'], keep='last', inplace=True)
-            
-            # 4. GÜNCEL VERİYİ CSV OLARAK KAYDET (CACHE)
-            save_df = updated_df.copy()
-            
-            # Tarihi string formata çevir
-            save_df['Date'] = save_df['Date'].dt.strftime('%d/%m/%Y')
-            
-            # Türkçe başlıklarla kaydet
-            reverse_map = {
-                'Date': 'Tarih', 'Open': 'Açılış', 'High': 'Yüksek', 
-                'Low': 'Düşük', 'Close': 'Kapanış', 'Volume': 'Hacim',
-                'Adj Close': 'Düzeltilmiş_Kapanış' # <-- Burası artık çalışacak
-            }
-            save_df.rename(columns=reverse_map, inplace=True)
-            
-            # DÜZELTME 3: encoding='utf-8-sig' (Excel/Windows uyumluluğu için BOM ekler)
-            save_df.to_csv(file_path, index=False, encoding='utf-8-sig')
-            
-            print(f"✅ {symbol} verileri güncellendi ve kaydedildi.")
-            
-            return updated_df
+            # 4. SADECE YENİ SATIRLARI DEPOYA EKLE (O(yeni satır))
+            # append() son tarihe göre çakışma kontrolü yapar, aynı gün iki kez yazılmaz
+            appended = self.store.append(symbol, new_data)
+            if appended.empty:
+                return df
+
+            # Eski veride Adj Close yoksa Close ile doldur (Sütun uyumu)
+            if 'Adj Close' not in df.columns:
+                df['Adj Close'] = df['Close']
+            print(f"✅ {symbol} için {len(appended)} yeni gün eklendi.")
+            return pd.concat([df, appended], ignore_index=True)
 
         except Exception as e:
             print(f"❌ Veri güncelleme hatası: {e}")
-            return df if df is not None else pd.DataFrame()
\ No newline at end of file
+            return df if df is not None else pd.DataFrame()
+
+    def refresh(self, symbol: str) -> int:
+        """
+        Geçmişi belleğe yüklemeden sembolü günceller (Gece toplu güncellemesi için).
+        Depodaki son tarihi okur, sadece sonrasını indirip ekler. Geriye eklenen satır sayısı döner.
+        """
+        today = datetime.now()
+        last_date = self.store.last_date(symbol) if self.store.exists(symbol) else None
+        if last_date is None:
+            df = self._migrate_legacy_csv(symbol)
+            if df is None:
+                return len(self._update_with_live_data(symbol, None))
+            last_date = df['Date'].iloc[-1]
+        if last_date.date() >= today.date():
+            return 0
+
+        try:
+            new_data = self._download(symbol, last_date + timedelta(days=1), today)
+            return len(self.store.append(symbol, new_data)) if not new_data.empty else 0
+        except Exception as e:
+            print(f"❌ {symbol} güncelleme hatası: {e}")
+            return 0
+
+    def refresh_universe(self, symbols, downloader=None, checkpoint_path: str = None) -> dict:
+        """
+        Tüm sembolleri paralel ve toplu (batch) indirme ile günceller.
+        Depoda olmayanlar için 10 yıllık geçmiş, olanlar için sadece son tarihten sonrası çekilir.
+        Her sembol indiği anda depoya yazılır; checkpoint_path verilirse yarıda kalan iş devam ettirilebilir.
+        Güncellenen sembolde yeni bar yoksa (hafta sonu/tatil) sembol güncel sayılır, hatalı değil.
+        """
+        # İndirici sembolleri büyük harfe çevirir; save() geri çağrısı aynı anahtarları görmeli
+        symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+        downloader = downloader or BulkDownloader(provider=self.provider, checkpoint_path=checkpoint_path)
+        today = datetime.now()
+
+        # Sembolleri "ilk kez indirilecek" ve "güncellenecek" olarak ayır
+        fresh, last_dates = [], {}
+        for symbol in symbols:
+            last_date = self.store.last_date(symbol) if self.store.exists(symbol) else None
+            if last_date is None:
+                df = self._migrate_legacy_csv(symbol)
+                last_date = df['Date'].iloc[-1] if df is not None and not df.empty else None
+            if last_date is None:
+                fresh.append(symbol)
+            elif last_date.date() < today.date():
+                last_dates[symbol] = last_date
+
+        def save(symbol, frame):
+            new_data = normalize_prices(frame.rename_axis('Date').reset_index())
+            if symbol in last_dates:
+                self.store.append(symbol, new_data)
+            else:
+                self.store.write(symbol, new_data)
+
+        report = {"completed": [], "failed": {}}
+        groups = []
+        if fresh:
+            groups.append((fresh, today - timedelta(days=365*10)))
+        if last_dates:
+            # Tek istekte çekebilmek için grubun en eski son tarihinden başla, append() çakışanları eler
+            groups.append((list(last_dates), min(last_dates.values()) + timedelta(days=1)))
+
+        for group, start_date in groups:
+            result = downloader.download(group, start=start_date, end=today + timedelta(days=1), on_result=save,
+                                         verbose=False)
+            report["completed"].extend(result["completed"] + result["skipped"])
+            for symbol, error in result["failed"].items():
+                # Son tarihten sonra bar yoksa boş sonuç gelir: Depo zaten güncel
+                if symbol in last_dates and error == NO_DATA:
+                    report["completed"].append(symbol)
+                else:
+                    report["failed"][symbol] = error
+        print(f"[GÜNCELLEME] {len(report['completed'])} güncel, {len(report['failed'])} hatalı.")
+        return report
+
+    def compact(self, symbol: str = None) -> dict:
+        """
+        Eklenen parçaları ana dosyaya birleştirir (Geçmişin yeniden yazıldığı tek komut).
+        symbol verilmezse tüm depo sıkıştırılır.
+        """
+        if symbol:
+            return {symbol: self.store.compact(symbol)}
+        return self.store.compact_all()
+
+    def _download(self, symbol: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        """Sağlayıcıdan [start_date, end_date] aralığını çeker ve depo şemasına getirir."""
+        new_data = self.provider.history(symbol, start=start_date, end=end_date + timedelta(days=1))
+        if new_data is None or new_data.empty:
+            return pd.DataFrame()
+
+        # DÜZELTME 2: 'Adj Close' EKLENDİ
+        required_cols = ['Date', 'Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+        new_data = new_data.rename_axis('Date').reset_index()
+        
+        # Sadece ihtiyacımız olan sütunları al (Eğer Adj Close gelmezse hata vermesin diye intersection yapıyoruz)
+        available_cols = [c for c in required_cols if c in new_data.columns]
+        return normalize_prices(new_data[available_cols])
@@ -1,79 +1,264 @@
 import pandas as pd
 import os
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
 from src.ai_core.data_processor import DataProcessor
 from src.ai_core.feature_engineering import FeatureEngineer
-from src.ai_core.ai_models.statistical import ProphetModel, GarchModel
-from src.ai_core.ai_models.machine_learning import XGBoostModel
+from src.ai_core.feature_store import FeatureStore
+from src.ai_core.ai_models.statistical import GarchModel, TREND_MODELS
+from src.ai_core.ai_models.machine_learning import XGBoostModel, DirectHorizonModel
 from src.ai_core.ai_models.ensemble import EnsembleModel
+from src.ai_core.model_registry import ModelRegistry, ModelBundle
 from src.ai_core.explainability.shap_explainer import ModelExplainer
+from src.ai_core.model_pool import ModelPool
+from src.ai_core.training import train_universe
+
+# Hisse başına akan özellik durumlarının kontrol noktası ({models_dir}/feature_states.json)
+FEATURE_STATE_FILE = "feature_states.json"
+
 
 class AIEngine:
-    def __init__(self,models_dir="models"):
+    def __init__(self, models_dir="models", registry: ModelRegistry = None, processor: DataProcessor = None,
+                 pool: ModelPool = None, xgb_params: dict = None, max_staleness_days: int = 7,
+                 fit_executor: Executor = None, parallel_fit: bool = True, feature_store: FeatureStore = None,
+                 trend_model: str = "prophet", horizons=None):
         self.models_dir = models_dir
- 
+        self.xgb_params = xgb_params
+        # Topluluğun trend bileşeni: "prophet" (Stan) veya "trend" (en küçük kareler, çok daha hızlı)
+        if trend_model not in TREND_MODELS:
+            raise ValueError(f"Bilinmeyen trend modeli: {trend_model} (Seçenekler: {', '.join(TREND_MODELS)})")
+        self.trend_model = trend_model
+        # Verilirse (Ör. (1, 5, 20)) çok ufuklu doğrudan model de eğitilir, bkz. DirectHorizonModel
+        self.horizons = sorted(int(h) for h in horizons) if horizons else None
+        # Tek hisse eğitiminde modellerin eşzamanlı eğitimi (bkz. _run_fit_tasks)
+        self.fit_executor = fit_executor
+        self.parallel_fit = parallel_fit
+
         os.makedirs(self.models_dir, exist_ok=True)
-        
+
         # Alt Modüller
-        self.processor = DataProcessor()
+        self.processor = processor or DataProcessor()
         self.fe = FeatureEngineer(use_lags=True)
+        # Hesaplanmış özellik tabloları fiyat deposunun yanında tutulur (dataSets/store -> dataSets/features)
+        self.feature_store = feature_store or FeatureStore(
+            os.path.join(os.path.dirname(os.path.abspath(self.processor.store.root_dir)), "features"),
+            engineer=FeatureEngineer(use_lags=self.fe.use_lags, dtype=self.fe.dtype))
         self.ensemble = EnsembleModel(weights={"xgboost": 0.6, "prophet": 0.4})
-        
-        # Modeller
-        self.xgb = XGBoostModel()
-        self.prophet = ProphetModel()
-        self.garch = GarchModel()
-        self.explainer = None
-
-    def train_full_pipeline(self, symbol: str):
+
+        # Modeller: Hisse başına kalıcı kayıt (disk) + sınırlı bellek havuzu.
+        # Her hissenin kendi model seti vardır; ASELS'den sonra THYAO analiz etmek ASELS'i ezmez.
+        self.registry = registry or ModelRegistry(models_dir, max_staleness_days=max_staleness_days,
+                                                  trend_model=trend_model, horizons=self.horizons)
+        self.pool = pool or ModelPool()
+
+        # Akan özellik durumları: Yeniden başlatmada kaldığı yerden devam (bkz. save_feature_states)
+        self.feature_state_path = os.path.join(self.models_dir, FEATURE_STATE_FILE)
+        self.fe.restore(self.feature_state_path)
+
+    def train_full_pipeline(self, symbol: str, df: pd.DataFrame = None, df_ml: pd.DataFrame = None) -> ModelBundle:
+        """Hissenin modellerini eğitir, kaydeder ve bellek havuzuna koyar (havuzdaki eski seti değiştirir)."""
+        bundle = self._train_bundle(symbol, df, df_ml)
+        self.pool.put(bundle)
+        return bundle
+
+    def _train_bundle(self, symbol: str, df: pd.DataFrame = None, df_ml: pd.DataFrame = None) -> ModelBundle:
+        """Eğitir ve diske kaydeder; havuza KOYMAZ (get_models'ta havuza get_or_load koyar)."""
         print(f"🚀 {symbol} için Eğitim Başlıyor...")
-        
+
         # 1. Veri Yükle
-        df = self.processor.load_data(symbol)
-        
-        # 2. Feature Engineering
-        df_ml = self.fe.create_features(df)
-        
-        # 3. Eğitim
-        print("   -> Modeller eğitiliyor...")
-        self.xgb.train(df_ml, target_col='Close')
-        self.prophet.train(df, target_col='Close') # Ham veri
-        self.garch.train(df, target_col='Close')   # Ham veri
-        
-        # 4. XAI Hazırlığı (Son 200 gün referans)
+        if df is None:
+            df = self.processor.load_data(symbol)
+
+        # 2. Feature Engineering (özellik deposundan; sadece yeni barlar hesaplanır)
+        if df_ml is None:
+            df_ml = self.feature_store.get(symbol, df)
+
+        # 3. XAI Hazırlığı (Son 200 gün referans)
         X_train = df_ml.drop(columns=['Close', 'Date'], errors='ignore')
-        self.explainer = ModelExplainer(self.xgb.model, X_train.tail(200))
-        
-        # 5. Kaydet
-        self.xgb.save(f"{self.models_dir}/{symbol}_xgb.pkl")
-        self.prophet.save(f"{self.models_dir}/{symbol}_prophet.pkl")
+        background = X_train.tail(200)
+
+        # 4. Eğitim: Üç model birbirinden bağımsızdır, eşzamanlı eğitilir.
+        # Explainer XGBoost'a bağlı olduğu için onun görevinin devamında kurulur.
+        # GARCH önceki eğitimin parametrelerinden sıcak başlar (birkaç günlük yeni veri optimumu az kaydırır)
+        previous = self.registry.read_meta(symbol) or {}
+        garch_params = {"starting_values": previous["garch_params"]} if previous.get("garch_params") else None
+        xgb, prophet = XGBoostModel(params=self.xgb_params), TREND_MODELS[self.trend_model]()
+        garch = GarchModel(params=garch_params)
+        direct = DirectHorizonModel(params={**(self.xgb_params or {}), "horizons": self.horizons}) \
+            if self.horizons else None
+        timings = {}
+
+        def timed(name, func, *args, **kwargs):
+            started = time.perf_counter()
+            result = func(*args, **kwargs)
+            timings[name] = round(time.perf_counter() - started, 2)
+            return result
+
+        def fit_xgb():
+            timed("xgboost", xgb.train, df_ml, target_col='Close')
+            return timed("explainer", ModelExplainer, xgb.model, background)
+
+        tasks = {
+            "xgboost": fit_xgb,
+            "prophet": lambda: timed(self.trend_model, prophet.train, df, target_col='Close'),  # Ham veri
+            "garch": lambda: timed("garch", garch.train, df, target_col='Close'),        # Ham veri
+        }
+        if direct is not None:
+            tasks["direct"] = lambda: timed("direct", direct.train, df_ml, target_col='Close')
+        started = time.perf_counter()
+        results = self._run_fit_tasks(tasks)
+        timings["total"] = round(time.perf_counter() - started, 2)
+        print("   -> " + " | ".join(f"{name}: {sec:.2f} sn" for name, sec in timings.items()))
+
+        # 5. Kaydet (Model dosyaları + meta: veri parmak izi, son tarih, özellik listesi)
+        meta = self.registry.build_meta(symbol, df, list(X_train.columns), fit_seconds=timings,
+                                        garch_params=garch.parameters, trend_model=self.trend_model,
+                                        horizons=self.horizons)
+        bundle = ModelBundle(symbol.upper(), xgb=xgb, prophet=prophet, garch=garch,
+                             background=background, meta=meta, explainer=results["xgboost"], direct=direct)
+        self.registry.save(bundle)
         print("✅ Eğitim tamamlandı.")
+        return bundle
+
+    def _run_fit_tasks(self, tasks: dict) -> dict:
+        """
+        Model eğitim görevlerini çalıştırır, {isim: sonuç} döner. Hata olursa ilk hata fırlatılır.
+        fit_executor verildiyse o kullanılır (kapatılmaz; modeller yerinde eğitildiği için thread
+        tabanlı olmalıdır). parallel_fit=False ise sırayla çalışır.
+        Varsayılan: görev başına bir thread. XGBoost ve Stan (ayrı süreç) GIL'i bıraktığı için
+        thread'ler gerçekten paralel ilerler; toplam süre en yavaş modele (genelde Prophet) iner.
+        """
+        if not self.parallel_fit:
+            print("   -> Modeller eğitiliyor (sıralı)...")
+            return {name: task() for name, task in tasks.items()}
+
+        print("   -> Modeller eğitiliyor (eşzamanlı)...")
+        if self.fit_executor is not None:
+            futures = {name: self.fit_executor.submit(task) for name, task in tasks.items()}
+            return {name: future.result() for name, future in futures.items()}
+        with ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix="fit") as executor:
+            futures = {name: executor.submit(task) for name, task in tasks.items()}
+            return {name: future.result() for name, future in futures.items()}
+
+    def train_universe(self, symbols, max_workers: int = None, threads_per_worker: int = 1,
+                       refresh: bool = True, only_stale: bool = True) -> pd.DataFrame:
+        """
+        Hisse evrenini (Ör. gece toplu eğitimi) süreç havuzunda paralel eğitir, bkz. training.train_universe.
+        Fiyatlar önce TEK toplu indirme ile güncellenir; işçiler sadece depodan okur ve
+        modelleri bu motorun kayıt klasörüne yazar. Rapor DataFrame'i döner.
+        """
+        symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+        if refresh and symbols:
+            self.processor.refresh_universe(symbols)
+
+        # İşçiler sağlayıcıyı ortamdan (get_default_provider) kurar; veriler zaten depoda
+        config = {
+            "models_dir": self.models_dir,
+            "raw_data_dir": self.processor.raw_data_dir,
+            "store": self.processor.store,
+            "feature_store_dir": self.feature_store.root_dir,
+            "xgb_params": self.xgb_params,
+            "trend_model": self.trend_model,
+            "horizons": self.horizons,
+            "max_staleness_days": self.registry.max_staleness_days,
+        }
+        report = train_universe(symbols, config, max_workers=max_workers,
+                                threads_per_worker=threads_per_worker, only_stale=only_stale)
+
+        # Bellekteki eski setler bir sonraki istekte diskten (yeni eğitilmiş) yüklensin
+        for symbol in report.loc[report["status"] == "trained", "symbol"]:
+            self.pool.evict(symbol)
+        return report
+
+    def get_models(self, symbol: str, df: pd.DataFrame = None, df_ml: pd.DataFrame = None) -> ModelBundle:
+        """
+        Hissenin model setini döndürür: önce bellek havuzu, sonra disk kaydı.
+        Kayıt yoksa veya bayatsa (bkz. ModelRegistry.staleness) yeniden eğitilir.
+        Thread-safe'tir; aynı hisse için eşzamanlı istekler tek bir yükleme/eğitimi paylaşır.
+        """
+        symbol = symbol.upper()
+        if df is None:
+            df = self.processor.load_data(symbol)
+        # Özellik listesi için tüm geçmişin özelliklerini hesaplamaya gerek yok
+        features = self._model_features(df) if df_ml is None else \
+            [c for c in df_ml.columns if c not in ('Close', 'Date')]
+
+        def is_fresh(bundle):
+            return self.registry.staleness(bundle.meta, df, features) is None
+
+        def loader(_stale_bundle):
+            # Havuzdaki set bayatsa bile diskte (başka süreçte eğitilmiş) daha yenisi olabilir
+            bundle = self.registry.load(symbol)
+            reason = self.registry.staleness(bundle.meta if bundle else None, df, features)
+            if reason:
+                print(f"[BİLGİ] {symbol} modeli yeniden eğitilecek: {reason}")
+                return self._train_bundle(symbol, df)
+            return bundle
+
+        return self.pool.get_or_load(symbol, loader, is_fresh)
+
+    def _model_features(self, df: pd.DataFrame) -> list:
+        """Ham veriden üretilecek, modele giren sütunlar (özellikler hesaplanmadan)."""
+        return [c for c in self.fe.output_columns(list(df.columns)) if c not in ('Close', 'Date')]
 
     def predict_next_day(self, symbol: str):
         """
-        Canlı/Güncel tahmin üretir.
+        Canlı/Güncel tahmin üretir. Model yoksa veya bayatsa önce eğitir.
+        Özellikler akan durumdan gelir: Sadece son tahminden sonra gelen barlar işlenir.
+        """
+        # 1. Güncel veriyi yükle
+        df = self.processor.load_data(symbol)
+        latest = self.fe.latest_features(symbol, df)
+        bundle = self.get_models(symbol, df)
+        return self._predict_with_bundle(symbol, df, latest, bundle)
+
+    def forecast_path(self, symbol: str, steps: int = 7) -> pd.DataFrame:
+        """
+        Çok adımlı (Ör. 7 / 30 iş günü) yol tahmini. Index: tarih, sütunlar:
+        xgboost (özyinelemeli, bkz. XGBoostModel.forecast), prophet (trend bileşeni),
+        ensemble (ağırlıklı birleşim) ve volatility (GARCH, adım başına).
         """
-        # 1. Güncel veriyi yükle (Normalde canlı API'den gelir, şimdilik CSV)
         df = self.processor.load_data(symbol)
-        df_ml = self.fe.create_features(df)
-        
+        self.fe.latest_features(symbol, df)  # Durum df'nin son barına kadar ilerletilir
+        bundle = self.get_models(symbol, df)
+
+        xgb_path = bundle.xgb.forecast(self.fe.snapshot(symbol), steps)['predicted_price']
+        trend_path = bundle.prophet.predict(pd.DataFrame({'Date': xgb_path.index}))['yhat'].to_numpy()
+        volatility = bundle.garch.predict(df, steps=steps)['predicted_volatility'].to_numpy()
+        return pd.DataFrame({
+            "xgboost": xgb_path.to_numpy(),
+            "prophet": trend_path,
+            "ensemble": self.ensemble.combine_predictions({"xgboost": xgb_path.to_numpy(), "prophet": trend_path}),
+            "volatility": volatility,
+        }, index=xgb_path.index.rename('Date'))
+
+    def save_feature_states(self) -> int:
+        """Akan özellik durumlarını diske yazar (kaydedilen hisse sayısı)."""
+        return self.fe.checkpoint(self.feature_state_path)
+
+    def _predict_with_bundle(self, symbol: str, df: pd.DataFrame, df_ml: pd.DataFrame, bundle: ModelBundle) -> dict:
         # 2. Tahminler
-        price_xgb = self.xgb.predict(df_ml).iloc[0]['predicted_price']
-        price_pro = self.prophet.predict(steps=1).iloc[0]['yhat']
-        volatility = self.garch.predict(steps=1).iloc[0]['predicted_volatility']
-        
+        price_xgb = bundle.xgb.predict(df_ml).iloc[0]['predicted_price']
+        # Trend modeli de XGBoost ile aynı hedef günü tahmin eder: Son bardan sonraki iş günü
+        # (Kayıt birkaç gün eski olabilir; steps=1 eğitim sonundan sonraki günü verirdi)
+        target_date = pd.Timestamp(df['Date'].iloc[-1]) + pd.offsets.BDay(1)
+        price_pro = bundle.prophet.predict(pd.DataFrame({'Date': [target_date]})).iloc[0]['yhat']
+        # Eğitimden sonra gelen barlar GARCH varyansına O(1) özyinelemeyle işlenir
+        volatility = bundle.garch.predict(df, steps=1).iloc[0]['predicted_volatility']
+
         # 3. Ensemble (Birleştirme)
         preds = {"xgboost": price_xgb, "prophet": price_pro}
         final_price = self.ensemble.combine_predictions(preds)
-        
+
         # 4. Sinyal ve Açıklama
         current_price = df['Close'].iloc[-1]
         signal, change_pct = self.ensemble.generate_signal(current_price, final_price, volatility)
-        
+
         # XAI
         latest_features = df_ml.drop(columns=['Close', 'Date'], errors='ignore').iloc[[-1]]
-        explanations = self.explainer.explain_prediction(latest_features)
-        
-        return {
+        explanations = bundle.explainer.explain_prediction(latest_features)
+
+        result = {
             "symbol": symbol,
             "current_price": current_price,
             "predicted_price": final_price,
@@ -81,4 +266,66 @@ class AIEngine:
             "volatility": volatility,
             "signal": signal,
             "reasons": explanations['reasons']
-        }
\ No newline at end of file
+        }
+        # Çok günlük sinyaller (ufuklar istendiyse): Tüm ufuklar tek toplu çağrıyla
+        if bundle.direct is not None:
+            result["horizons"] = self.ensemble.predict_horizons(bundle.direct, df_ml, current_price, volatility,
+                                                                trend=bundle.prophet)
+        return result
+
+    def predict_universe(self, symbols, refresh: bool = True, train_missing: bool = True,
+                         max_workers: int = 4) -> pd.DataFrame:
+        """
+        Çok sayıda hisse için toplu tahmin (Ör. sabah taraması).
+
+        1. Fiyatlar TEK toplu indirme ile güncellenir (refresh_universe), sonra hisse başına
+           ağ isteği atılmadan depodan okunur.
+        2. Modeller havuz/kayıttan gelir; train_missing=False ise modeli olmayan/bayat hisse
+           eğitilmez, hata sütununda raporlanır.
+        3. Hisseler thread havuzunda paralel işlenir; bir hissenin hatası taramayı durdurmaz.
+           Her hissenin kendi XGBoost modeli ve SHAP explainer'ı olduğundan tahmin ve açıklama
+           hisse başına birer çağrıdır; satırlar hisseler arasında tek matriste toplanamaz.
+
+        Returns:
+            symbol, current_price, predicted_price, change_pct, volatility, signal, reasons, error
+            sütunlu DataFrame (değişim yüzdesine göre azalan sıralı).
+        """
+        symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+        if refresh and symbols:
+            self.processor.refresh_universe(symbols)
+
+        def predict_one(symbol):
+            try:
+                df = self.processor.load_data(symbol, refresh=False)
+                if df is None or df.empty:
+                    raise ValueError("Fiyat verisi yok")
+                latest = self.fe.latest_features(symbol, df)
+                if train_missing:
+                    bundle = self.get_models(symbol, df)
+                else:
+                    bundle = self._cached_models(symbol, df)
+                    if bundle is None:
+                        raise ValueError("Güncel model yok (train_missing=False)")
+                return {**self._predict_with_bundle(symbol, df, latest, bundle), "error": None}
+            except Exception as e:
+                return {"symbol": symbol, "error": str(e)}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            rows = list(pool.map(predict_one, symbols))
+        self.save_feature_states()
+
+        columns = ["symbol", "current_price", "predicted_price", "change_pct",
+                   "volatility", "signal", "reasons", "error"]
+        result = pd.DataFrame(rows, columns=columns)
+        failed = result["error"].notna().sum()
+        print(f"✅ Toplu tahmin: {len(result) - failed} başarılı, {failed} hatalı.")
+        return result.sort_values("change_pct", ascending=False, na_position="last").reset_index(drop=True)
+
+    def _cached_models(self, symbol: str, df: pd.DataFrame):
+        """Eğitim YAPMADAN havuz veya diskteki güncel model setini döndürür; yoksa None."""
+        features = self._model_features(df)
+        bundle = self.pool.get(symbol) or self.registry.load(symbol)
+        if bundle is None or self.registry.staleness(bundle.meta, df, features):
+            return None
+        self.pool.put(bundle)
+        return bundle
@@ -1,9 +1,20 @@
+import os
+import json
+import hashlib
+import threading
 import pandas as pd
 import numpy as np
-from ta.momentum import RSIIndicator, StochRSIIndicator
-from ta.trend import MACD, SMAIndicator, EMAIndicator, CCIIndicator
-from ta.volatility import BollingerBands, AverageTrueRange
-from ta.volume import OnBalanceVolumeIndicator, VolumeWeightedAveragePrice
+from src.ai_core.indicators import (
+    compute_indicators, compute_lag_features, INDICATOR_COLUMNS, LAG_COLUMNS, FEATURE_WINDOWS
+)
+from src.ai_core.streaming_features import FeatureState
+
+# Özellik tanımları (indikatörler, pencereler, formüller) değişince artırılır:
+# Özellik deposundaki (FeatureStore) eski tablolar geçersiz sayılıp yeniden hesaplanır.
+FEATURE_SET_VERSION = 1
+
+# Bu sayıdan fazla yeni bar birikmişse bar bar güncellemek yerine durum geçmişten (vektörel) yeniden kurulur
+MAX_INCREMENTAL_BARS = 250
 
 class FeatureEngineer:
     """
@@ -11,77 +22,212 @@ class FeatureEngineer:
     ve zaman serisi özellikleri (Lag Features) üretir.
     """
     
-    def __init__(self, use_lags: bool = True):
+    def __init__(self, use_lags: bool = True, dtype=np.float64):
+        """
+        Args:
+            use_lags: Gecikmeli (lag) özellikler ve getiriler eklensin mi.
+            dtype: İndikatör sütunlarının tipi. np.float32 bellek ve XGBoost için yeterlidir;
+                   hareketli toplamlar yine float64'te biriktirilir.
+        """
         self.use_lags = use_lags
+        self.dtype = np.dtype(dtype)
+        # Hisse başına akan (streaming) indikatör durumu, bkz. latest_features / update
+        self.states = {}
+        # Ortak kilit sadece durum sözlüğünü ve durumun değiştiği kısa anları korur;
+        # aynı hissenin çağrıları hisse kilidiyle sıralanır, farklı hisseler birbirini beklemez.
+        self._symbol_locks = {}
+        self._lock = threading.Lock()
+
+    @property
+    def feature_columns(self) -> list:
+        return INDICATOR_COLUMNS + (LAG_COLUMNS if self.use_lags else [])
+
+    def config(self) -> dict:
+        """Çıktıyı belirleyen ayarlar (özellik deposu anahtarı)."""
+        return {
+            "feature_set_version": FEATURE_SET_VERSION,
+            "use_lags": self.use_lags,
+            "dtype": self.dtype.name,
+            "windows": FEATURE_WINDOWS,
+            "columns": self.feature_columns,
+        }
+
+    def config_hash(self) -> str:
+        payload = json.dumps(self.config(), sort_keys=True)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+    def output_columns(self, raw_columns) -> list:
+        """create_features çıktısının sütunları (ham sütunlar + özellikler), veri hesaplanmadan."""
+        features = self.feature_columns
+        return [c for c in raw_columns if c not in features] + features
 
     def create_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Verilen DataFrame'e teknik analiz indikatörleri ekler.
-        Orijinal veri bozulmaz, kopya üzerinde çalışılır.
+        Orijinal veri bozulmaz; sonuç sadece korunan satırlardan oluşan yeni bir DataFrame'dir.
+        İndikatörler saf NumPy çekirdekleriyle (src/ai_core/indicators.py) tek geçişte hesaplanır,
+        çıktılar 'ta' kütüphanesiyle aynıdır (bkz. debug/indicator_parity.py).
         """
-        # Veri kopyası al (Data Integrity)
-        data = df.copy()
-        
-        # Sütun isimlerini garantiye al (Bazen 'Close' yerine 'close' gelebilir)
-        # Eğer senin CSV'lerinde Türkçe başlık varsa burada map'leme yapabiliriz.
         # Varsayım: Columns -> ['Open', 'High', 'Low', 'Close', 'Volume']
-        
-        # 1. TREND GÖSTERGELERİ
-        # SMA (Basit Hareketli Ortalama)
-        data['sma_20'] = SMAIndicator(close=data['Close'], window=20).sma_indicator()
-        data['sma_50'] = SMAIndicator(close=data['Close'], window=50).sma_indicator()
-        
-        # EMA (Üstel Hareketli Ortalama - Fiyata daha duyarlı)
-        data['ema_12'] = EMAIndicator(close=data['Close'], window=12).ema_indicator()
-        data['ema_26'] = EMAIndicator(close=data['Close'], window=26).ema_indicator()
-        
-        # MACD (Moving Average Convergence Divergence)
-        macd = MACD(close=data['Close'])
-        data['macd'] = macd.macd()
-        data['macd_signal'] = macd.macd_signal()
-        data['macd_diff'] = macd.macd_diff() # Histogram
-
-        # 2. MOMENTUM GÖSTERGELERİ
-        # RSI (Relative Strength Index)
-        data['rsi'] = RSIIndicator(close=data['Close'], window=14).rsi()
-        
-        # CCI (Commodity Channel Index)
-        data['cci'] = CCIIndicator(high=data['High'], low=data['Low'], close=data['Close']).cci()
-
-        # 3. VOLATİLİTE GÖSTERGELERİ
-        # Bollinger Bantları
-        bb = BollingerBands(close=data['Close'], window=20, window_dev=2)
-        data['bb_high'] = bb.bollinger_hband()
-        data['bb_low'] = bb.bollinger_lband()
-        data['bb_width'] = (data['bb_high'] - data['bb_low']) / data['Close'] # Bant genişliği
-        
-        # ATR (Average True Range - Oynaklık ölçer)
-        data['atr'] = AverageTrueRange(high=data['High'], low=data['Low'], close=data['Close']).average_true_range()
-
-        # 4. HACİM GÖSTERGELERİ
-        # OBV (On-Balance Volume)
-        data['obv'] = OnBalanceVolumeIndicator(close=data['Close'], volume=data['Volume']).on_balance_volume()
-        
-        # VWAP (Hacim Ağırlıklı Ortalama Fiyat)
-        data['vwap'] = VolumeWeightedAveragePrice(high=data['High'], low=data['Low'], close=data['Close'], volume=data['Volume']).volume_weighted_average_price()
+        high = df['High'].to_numpy(dtype=self.dtype)
+        low = df['Low'].to_numpy(dtype=self.dtype)
+        close = df['Close'].to_numpy(dtype=self.dtype)
+        volume = df['Volume'].to_numpy()
+        if volume.dtype.kind == 'f' or self.dtype == np.float32:
+            volume = volume.astype(self.dtype, copy=False)
+
+        # 1-4. TREND, MOMENTUM, VOLATİLİTE ve HACİM GÖSTERGELERİ
+        # SMA 20/50, EMA 12/26, MACD, RSI, CCI, Bollinger, ATR, OBV, VWAP
+        features = compute_indicators(high, low, close, volume)
 
         # 5. ZAMAN SERİSİ ÖZELLİKLERİ (LAG FEATURES)
         # ML modelleri için en kritik kısım: Geçmiş veriyi bugünün satırına taşıma.
         if self.use_lags:
-            # 1 gün önceki kapanış, hacim ve RSI
-            data['lag_close_1'] = data['Close'].shift(1)
-            data['lag_close_2'] = data['Close'].shift(2)
-            data['lag_close_5'] = data['Close'].shift(5) # 1 Hafta öncesi
-            
-            data['lag_vol_1'] = data['Volume'].shift(1)
-            data['lag_rsi_1'] = data['rsi'].shift(1)
-            
-            # Günlük Getiri (Return)
-            data['pct_change'] = data['Close'].pct_change()
-            data['log_return'] = np.log(data['Close'] / data['Close'].shift(1))
+            features.update(compute_lag_features(close, volume, features['rsi']))
 
         # 6. TEMİZLİK
         # İndikatör hesaplamaları (özellikle SMA_50) ilk satırlarda NaN oluşturur.
-        data.dropna(inplace=True)
-        
-        return data
\ No newline at end of file
+        # dropna() ile aynı: Ham veride veya herhangi bir özellikte NaN olan satır atılır.
+        keep = df.notna().all(axis=1).to_numpy()
+        for values in features.values():
+            keep &= ~np.isnan(values)
+
+        base = df.drop(columns=[c for c in features if c in df.columns])
+        data = pd.concat([
+            base.loc[keep],
+            pd.DataFrame({name: values[keep] for name, values in features.items()}, index=df.index[keep])
+        ], axis=1)
+        return data
+
+    # --- AKAN (STREAMING) HESAPLAMA ---
+    def _symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._lock:
+            return self._symbol_locks.setdefault(symbol, threading.Lock())
+
+    def init_state(self, symbol: str, df: pd.DataFrame) -> FeatureState:
+        """Hissenin indikatör durumunu geçmişten kurar (tek vektörel geçiş)."""
+        symbol = symbol.upper()
+        with self._symbol_lock(symbol):
+            state = FeatureState.from_history(df, use_lags=self.use_lags)
+            with self._lock:
+                self.states[symbol] = state
+        return state
+
+    def update(self, symbol: str, bar, commit: bool = True, as_frame: bool = True):
+        """
+        Yeni bar için en yeni özellik satırını O(pencere) sürede üretir (tek satırlık DataFrame).
+        Önce init_state/latest_features ile durum kurulmuş olmalıdır.
+        commit=False: Durum değişmez (seans içi, kapanmamış bar için tahmin).
+        as_frame=False: DataFrame kurulmadan {sütun: değer} sözlüğü döner (en hızlı yol).
+        """
+        symbol = symbol.upper()
+        with self._symbol_lock(symbol), self._lock:
+            state = self.states.get(symbol)
+            if state is None:
+                raise KeyError(f"{symbol} için özellik durumu yok. Önce init_state() çağrılmalı.")
+            row = state.update(bar, commit=commit)
+            index = state.count - (1 if commit else 0)
+        if not as_frame:
+            return row
+        index = index if 'Date' in state.raw_columns else row.get('Date', index)
+        return self._row_frame(state, row, index)
+
+    def latest_features(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        create_features(df).iloc[[-1]] ile aynı sonucu, tüm geçmişi yeniden hesaplamadan verir.
+        Durum df'nin devamıysa sadece yeni barlar işlenir; değilse (ilk çağrı, geçmiş değişmiş,
+        çok sayıda yeni bar) durum geçmişten yeniden kurulur.
+        """
+        symbol = symbol.upper()
+        dates = pd.to_datetime(df['Date'] if 'Date' in df.columns else df.index)
+        with self._symbol_lock(symbol):
+            # Ortak kilit sadece durumu okumak ve takmak için: İlerletme/yeniden kurulum sırasında
+            # diğer hisseler beklemez. Hisse kilidi aynı hissenin update/latest_features çağrılarını sıralar.
+            with self._lock:
+                state = self.states.get(symbol)
+                start = self._resume_position(state, df, dates)
+            if start is None:
+                state = FeatureState.from_history(df, use_lags=self.use_lags)
+            elif start < len(df):
+                # Kopya üzerinde ilerletilir; checkpoint/snapshot yarım güncellenmiş durumu görmez
+                state = state.copy()
+                # En fazla MAX_INCREMENTAL_BARS bar, her biri O(pencere)
+                for _, bar in df.iloc[start:].iterrows():
+                    state.update(bar)
+            row = state.last_row
+            if start is None or start < len(df):
+                with self._lock:
+                    self.states[symbol] = state
+        return self._row_frame(state, row, df.index[-1])
+
+    def snapshot(self, symbol: str) -> FeatureState:
+        """Hissenin özellik durumunun kopyası (Ör. yol tahmininde sentetik barlarla ilerletmek için)."""
+        with self._lock:
+            state = self.states.get(symbol.upper())
+            if state is None:
+                raise KeyError(f"{symbol} için özellik durumu yok. Önce init_state() çağrılmalı.")
+            return state.copy()
+
+    def _resume_position(self, state, df: pd.DataFrame, dates):
+        """Durum df'ye kaldığı yerden devam edebiliyorsa ilk yeni barın konumu, edemiyorsa None."""
+        if state is None or state.last_date is None or state.use_lags != self.use_lags:
+            return None
+        if list(df.columns) != state.raw_columns:
+            return None
+        pos = int(dates.searchsorted(state.last_date, side='right')) - 1
+        # Geçmiş aynı uzunlukta ve son işlenen kapanış aynı olmalı (bölünme düzeltmesi vb. değilse)
+        if pos < 0 or pos + 1 != state.count or dates[pos] != state.last_date:
+            return None
+        if float(df['Close'].iloc[pos]) != state.closes[-1]:
+            return None
+        if len(df) - (pos + 1) > MAX_INCREMENTAL_BARS:
+            return None
+        return pos + 1
+
+    def _row_frame(self, state: FeatureState, row: dict, index) -> pd.DataFrame:
+        columns = self.output_columns(state.raw_columns)
+        if self.dtype != np.float64:
+            features = set(self.feature_columns)
+            data = {col: np.array([row.get(col, np.nan)], dtype=self.dtype) if col in features else [row.get(col)]
+                    for col in columns}
+            return pd.DataFrame(data, index=[index])
+
+        # Hızlı yol: Sayısal sütunlar tek bir float64 blok olarak kurulur, tarih sonradan eklenir
+        other = [c for c in columns if not isinstance(row.get(c, np.nan), (int, float, np.number))]
+        numeric = [c for c in columns if c not in other]
+        frame = pd.DataFrame(np.array([[row.get(c, np.nan) for c in numeric]], dtype=np.float64),
+                             columns=numeric, index=[index])
+        for col in other:
+            frame.insert(columns.index(col), col, [row.get(col)])
+        return frame
+
+    def checkpoint(self, path: str, symbols=None) -> int:
+        """Durumları (tümü veya verilen hisseler) JSON kontrol noktasına yazar. Yazılan hisse sayısını döner."""
+        with self._lock:
+            wanted = [s.upper() for s in symbols] if symbols else list(self.states)
+            payload = {s: self.states[s].to_dict() for s in wanted if s in self.states}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"use_lags": self.use_lags, "states": payload}, f)
+        os.replace(tmp_path, path)
+        return len(payload)
+
+    def restore(self, path: str) -> list:
+        """Kontrol noktasından durumları yükler. Uyumsuz (sürüm/ayar) kayıtlar atlanır; yüklenen hisseleri döner."""
+        if not os.path.exists(path):
+            return []
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("use_lags") != self.use_lags:
+            print("⚠️ Özellik durumu farklı ayarla (use_lags) kaydedilmiş, yüklenmedi.")
+            return []
+        restored = {}
+        for symbol, payload in data.get("states", {}).items():
+            try:
+                restored[symbol] = FeatureState.from_dict(payload)
+            except (KeyError, ValueError) as e:
+                print(f"⚠️ {symbol} özellik durumu yüklenemedi: {e}")
+        with self._lock:
+            self.states.update(restored)
+        return sorted(restored)
@@ -0,0 +1,237 @@
+# src/ai_core/feature_store.py
+# Hesaplanmış özellik tablolarının (create_features çıktısı) hisse bazlı, sütun bazlı (Parquet) disk deposu.
+
+import os
+import glob
+import json
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from src.ai_core.feature_engineering import FeatureEngineer, FEATURE_SET_VERSION, MAX_INCREMENTAL_BARS
+from src.ai_core.streaming_features import FeatureState
+from src.ai_core.storage import data_fingerprint
+
+# Bu kadar parça birikince ana dosyaya birleştirilir (PriceStore.compact ile aynı mantık)
+COMPACT_PARTS = 20
+
+
+class FeatureStore:
+    """
+    Özellik deposu: Her hissenin özellik tablosu bir kez hesaplanır, diske yazılır ve tekrar kullanılır.
+
+    Yerleşim:
+        {root}/{SYMBOL}.parquet          -> Ana özellik tablosu (index korunur)
+        {root}/{SYMBOL}.parts/*.parquet  -> Sonradan eklenen yeni satırlar
+        {root}/{SYMBOL}.json             -> Meta: ayar özeti (config_hash), ham verinin son tarihi,
+                                            satır sayısı, geçmiş özeti ve akan indikatör durumu
+
+    get(symbol, df):
+        - Ayar özeti (use_lags, dtype, pencereler, FEATURE_SET_VERSION) aynı ve ham geçmiş
+          değişmemişse tablo diskten okunur; sadece istenen sütunlar yüklenir.
+        - Ham veride yeni barlar varsa sadece onlar akan durumla (FeatureState) hesaplanıp parça
+          olarak eklenir; geçmiş yeniden hesaplanmaz.
+        - Özellik tanımları veya ham geçmiş değişmişse tablo baştan hesaplanır.
+    Thread-safe'tir (hisse başına kilit). Dönen tablo create_features(df) ile aynıdır
+    (eklenen satırlar akan hesaplamadan gelir, bkz. debug/feature_store.py).
+    """
+    extension = ".parquet"
+
+    def __init__(self, root_dir: str = "dataSets/features", engineer: FeatureEngineer = None):
+        self.root_dir = root_dir
+        # Durumlar meta dosyasında tutulur; FeatureEngineer'ın kendi durum sözlüğü kullanılmaz
+        self.engineer = engineer or FeatureEngineer(use_lags=True)
+        self._symbol_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        os.makedirs(root_dir, exist_ok=True)
+
+    # --- YOLLAR ---
+    def path_for(self, symbol: str) -> str:
+        return os.path.join(self.root_dir, f"{symbol}{self.extension}")
+
+    def parts_dir(self, symbol: str) -> str:
+        return os.path.join(self.root_dir, f"{symbol}.parts")
+
+    def meta_path(self, symbol: str) -> str:
+        return os.path.join(self.root_dir, f"{symbol}.json")
+
+    def part_files(self, symbol: str) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.parts_dir(symbol), f"*{self.extension}")))
+
+    def symbols(self) -> List[str]:
+        """Depoda özellik tablosu bulunan hisseler."""
+        files = glob.glob(os.path.join(self.root_dir, "*.json"))
+        return sorted(os.path.basename(f)[:-len(".json")] for f in files)
+
+    def _symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._lock:
+            return self._symbol_locks.setdefault(symbol, threading.Lock())
+
+    # --- OKUMA ---
+    def read_meta(self, symbol: str) -> Optional[dict]:
+        path = self.meta_path(symbol.upper())
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ {symbol} özellik meta dosyası okunamadı: {e}")
+            return None
+
+    def read(self, symbol: str, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        Kayıtlı özellik tablosunu (veya sadece istenen sütunları) okur; kayıt yoksa None.
+        Geçerlilik kontrolü yapmaz, güncel tablo için get() kullanılmalıdır.
+        """
+        symbol = symbol.upper()
+        if not os.path.exists(self.path_for(symbol)):
+            return None
+        frames = [pd.read_parquet(self.path_for(symbol), columns=columns)]
+        frames.extend(pd.read_parquet(f, columns=columns) for f in self.part_files(symbol))
+        return frames[0] if len(frames) == 1 else pd.concat(frames)
+
+    # --- ANA GİRİŞ ---
+    def get(self, symbol: str, df: pd.DataFrame, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        df (ham OHLCV) için özellik tablosunu döndürür: create_features(df) ile aynı sonuç.
+        columns verilirse sadece bu sütunlar okunur/döndürülür.
+        """
+        symbol = symbol.upper()
+        with self._symbol_lock(symbol):
+            meta = self.read_meta(symbol)
+            reason = self._invalid_reason(symbol, meta, df)
+            if reason is not None:
+                return self._rebuild(symbol, df, columns, reason)
+
+            new_bars = len(df) - meta["raw_rows"]
+            if new_bars > MAX_INCREMENTAL_BARS:
+                return self._rebuild(symbol, df, columns, f"{new_bars} yeni bar")
+            if new_bars > 0:
+                self._append(symbol, df, meta)
+            return self.read(symbol, columns)
+
+    def _invalid_reason(self, symbol: str, meta: Optional[dict], df: pd.DataFrame) -> Optional[str]:
+        """Kayıtlı tablo df için kullanılamıyorsa sebebi, kullanılabiliyorsa None."""
+        if meta is None or not os.path.exists(self.path_for(symbol)):
+            return "kayıt yok"
+        if meta.get("feature_set_version") != FEATURE_SET_VERSION:
+            return "özellik seti sürümü değişti"
+        if meta.get("config_hash") != self.engineer.config_hash():
+            return "özellik ayarları değişti"
+        if meta.get("raw_columns") != list(df.columns):
+            return "ham sütunlar değişti"
+        raw_rows = meta.get("raw_rows", 0)
+        if len(df) < raw_rows:
+            return "ham veri kısaldı"
+        # Kayıtlı kısım aynı mı? (bölünme/temettü düzeltmesi geçmişi değiştirir)
+        if data_fingerprint(df.iloc[:raw_rows]) != meta.get("raw_hash"):
+            return "ham geçmiş değişti"
+        return None
+
+    # --- YAZMA ---
+    def _rebuild(self, symbol: str, df: pd.DataFrame, columns, reason: str) -> pd.DataFrame:
+        print(f"[BİLGİ] {symbol} özellikleri hesaplanıyor ({reason})...")
+        features = self.engineer.create_features(df)
+        self._write_frame(features, self.path_for(symbol))
+        self._clear_parts(symbol)
+        state = FeatureState.from_history(df, use_lags=self.engineer.use_lags)
+        self._write_meta(symbol, df, state, rows=len(features), parts=0)
+        return features if columns is None else features[columns]
+
+    def _append(self, symbol: str, df: pd.DataFrame, meta: dict) -> int:
+        """Kayıtlı durumdan devam ederek sadece yeni barların özelliklerini parça olarak ekler."""
+        start = meta["raw_rows"]
+        try:
+            state = FeatureState.from_dict(meta["state"])
+        except (KeyError, ValueError):
+            # Durum okunamazsa kayıtlı geçmişten (vektörel) yeniden kurulur
+            state = FeatureState.from_history(df.iloc[:start], use_lags=self.engineer.use_lags)
+
+        new = df.iloc[start:]
+        feature_cols = self.engineer.feature_columns
+        rows = [state.update(bar) for _, bar in new.iterrows()]
+        values = np.array([[row[c] for c in feature_cols] for row in rows], dtype=np.float64)
+
+        # create_features ile aynı temizlik: Ham veride veya bir özellikte NaN olan satır atılır
+        keep = new.notna().all(axis=1).to_numpy() & ~np.isnan(values).any(axis=1)
+        base = new.drop(columns=[c for c in feature_cols if c in new.columns])
+        added = pd.concat([
+            base.loc[keep],
+            pd.DataFrame(values[keep].astype(self.engineer.dtype, copy=False),
+                         columns=feature_cols, index=new.index[keep])
+        ], axis=1)
+
+        parts = len(self.part_files(symbol))
+        if not added.empty:
+            parts_dir = self.parts_dir(symbol)
+            os.makedirs(parts_dir, exist_ok=True)
+            self._write_frame(added, os.path.join(parts_dir, f"{parts:06d}{self.extension}"))
+            parts += 1
+        self._write_meta(symbol, df, state, rows=meta.get("rows", 0) + len(added), parts=parts)
+        if parts >= COMPACT_PARTS:
+            self.compact(symbol)
+        return len(added)
+
+    def compact(self, symbol: str) -> int:
+        """Ana tabloyu ve eklenen parçaları tek dosyada birleştirir. Birleştirilen parça sayısını döner."""
+        symbol = symbol.upper()
+        parts = self.part_files(symbol)
+        if not parts:
+            return 0
+        self._write_frame(self.read(symbol), self.path_for(symbol))
+        self._clear_parts(symbol)
+        meta = self.read_meta(symbol)
+        if meta is not None:
+            meta["parts"] = 0
+            self._dump_meta(symbol, meta)
+        return len(parts)
+
+    def invalidate(self, symbol: str) -> None:
+        """Hissenin özellik kaydını siler (bir sonraki get() baştan hesaplar)."""
+        symbol = symbol.upper()
+        with self._symbol_lock(symbol):
+            for path in (self.meta_path(symbol), self.path_for(symbol)):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._clear_parts(symbol)
+
+    def _write_meta(self, symbol: str, df: pd.DataFrame, state: FeatureState, rows: int, parts: int) -> None:
+        dates = pd.DatetimeIndex(df['Date'] if 'Date' in df.columns else df.index)
+        self._dump_meta(symbol, {
+            "config_hash": self.engineer.config_hash(),
+            "feature_set_version": FEATURE_SET_VERSION,
+            "raw_columns": list(df.columns),
+            "raw_rows": int(len(df)),
+            "raw_last_date": str(dates[-1].date()) if len(dates) else None,
+            "raw_hash": data_fingerprint(df),
+            "rows": int(rows),
+            "parts": int(parts),
+            "state": state.to_dict(),
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+        })
+
+    def _dump_meta(self, symbol: str, meta: dict) -> None:
+        path = self.meta_path(symbol)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _write_frame(df: pd.DataFrame, path: str) -> None:
+        # Atomik yazım; index (tarih veya satır no) korunur ki create_features çıktısıyla aynı olsun
+        tmp_path = path + ".tmp"
+        df.to_parquet(tmp_path, index=True, compression='snappy')
+        os.replace(tmp_path, path)
+
+    def _clear_parts(self, symbol: str) -> None:
+        for f in self.part_files(symbol):
+            os.remove(f)
+        parts_dir = self.parts_dir(symbol)
+        if os.path.isdir(parts_dir) and not os.listdir(parts_dir):
+            os.rmdir(parts_dir)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: {self.root_dir}>"
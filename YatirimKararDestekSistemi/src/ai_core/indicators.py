@@ -0,0 +1,299 @@
+# src/ai_core/indicators.py
+# Saf NumPy teknik indikatör çekirdekleri ('ta' kütüphanesiyle aynı çıktılar).
+#
+# - Tüm fonksiyonlar 0. eksen (zaman) boyunca çalışır: girdi (n,) tek hisse veya
+#   (n, k) panel (tarih x hisse) olabilir. Çıktı girdiyle aynı şekildedir.
+# - Hareketli toplam/ortalama kümülatif toplam (cumsum) farkıyla O(n) hesaplanır.
+# - EMA ve Wilder ortalamaları özyinelemeli (recursive) IIR filtre ile hesaplanır (scipy lfilter, C döngüsü).
+# - NaN kuralı pandas'taki min_periods=window ile aynıdır: penceresinde NaN olan satır NaN olur.
+#   EMA'larda sadece baştaki (leading) NaN'ler desteklenir (fiyat verisi ffill/dropna'dan geçer).
+
+import numpy as np
+from scipy.signal import lfilter
+
+# Birikimli toplamlar float32 modunda bile float64'te tutulur (hassasiyet kaybı olmasın)
+ACCUMULATOR_DTYPE = np.float64
+
+
+def shift(x: np.ndarray, periods: int = 1) -> np.ndarray:
+    """pandas shift(periods): ilk 'periods' satır NaN olur."""
+    out = np.full(x.shape, np.nan, dtype=np.result_type(x.dtype, np.float32))
+    if periods < len(x):
+        out[periods:] = x[:len(x) - periods]
+    return out
+
+
+def constant_windows(x: np.ndarray, window: int) -> np.ndarray:
+    """Penceresindeki tüm değerleri eşit olan satırlar (art arda window-1 eşitlik)."""
+    constant = np.zeros(x.shape, dtype=bool)
+    if len(x) < window:
+        return constant
+    if window == 1:
+        constant[:] = True
+        return constant
+    same = np.zeros(x.shape, dtype=np.int64)
+    same[1:] = x[1:] == x[:-1]
+    run = np.cumsum(same, axis=0)
+    # t satırının penceresi (t-window+1 .. t) içindeki eşit komşu çifti sayısı
+    pairs = run[window - 1:] - run[:len(x) - window + 1]
+    constant[window - 1:] = pairs == window - 1
+    return constant
+
+
+def rolling_sum(x: np.ndarray, window: int) -> np.ndarray:
+    """
+    Hareketli toplam (pandas rolling(window, min_periods=window).sum()).
+    Sabit pencerelerde (Ör. işlem görmeyen günlerde 0 hacim) sonuç pandas gibi tam olarak window * değer'dir;
+    cumsum farkından kalan yuvarlama artığı 0/0 bölmelerini sonlu sayıya çevirmesin.
+    """
+    n = len(x)
+    out = np.full(x.shape, np.nan, dtype=ACCUMULATOR_DTYPE)
+    if n < window:
+        return out.astype(x.dtype, copy=False) if x.dtype == np.float32 else out
+
+    nan_mask = np.isnan(x)
+    # Ortalamadan sapma üzerinden toplanır: büyük değerlerde (fiyat x hacim) cumsum farkı hassas kalır
+    center = np.nanmean(x, axis=0) if nan_mask.any() else x.mean(axis=0, dtype=ACCUMULATOR_DTYPE)
+    center = np.nan_to_num(center)
+    values = np.where(nan_mask, 0.0, x - center)
+
+    cs = np.cumsum(values, axis=0, dtype=ACCUMULATOR_DTYPE)
+    window_sum = cs[window - 1:].copy()
+    window_sum[1:] -= cs[:-window]
+    out[window - 1:] = window_sum + window * center
+    constant = constant_windows(x, window)
+    out[constant] = window * x[constant]
+
+    if nan_mask.any():
+        nan_count = np.cumsum(nan_mask, axis=0)
+        window_nans = nan_count[window - 1:].copy()
+        window_nans[1:] -= nan_count[:-window]
+        out[window - 1:][window_nans > 0] = np.nan
+    return out.astype(x.dtype, copy=False) if x.dtype == np.float32 else out
+
+
+def rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """Basit hareketli ortalama (SMA)."""
+    return rolling_sum(x, window) / window
+
+
+def rolling_std(x: np.ndarray, window: int, ddof: int = 0) -> np.ndarray:
+    """
+    Hareketli standart sapma (pandas rolling().std(ddof)).
+    Var = E[(x-c)^2] - E[x-c]^2 (c: sütun ortalaması). Penceredeki tüm değerler eşitse
+    pandas gibi tam 0 döner (cumsum farkından kalan 1e-12 mertebesindeki artık sapma sayılmaz).
+    """
+    acc = x.astype(ACCUMULATOR_DTYPE, copy=False)
+    center = np.nan_to_num(np.nanmean(acc, axis=0)) if np.isnan(acc).any() else acc.mean(axis=0)
+    dev = acc - center
+    mean = rolling_sum(dev, window) / window
+    mean_sq = rolling_sum(dev * dev, window) / window
+    var = np.maximum(mean_sq - mean * mean, 0.0) * (window / (window - ddof))
+    var = np.where(constant_windows(x, window) & ~np.isnan(var), 0.0, var)
+
+    std = np.sqrt(var)
+    return std.astype(x.dtype, copy=False) if x.dtype == np.float32 else std
+
+
+def rolling_mad(x: np.ndarray, window: int) -> np.ndarray:
+    """
+    Hareketli ortalama mutlak sapma: mean(|x - mean(x)|) (CCI için; pandas rolling().apply yerine).
+    Pencere ofsetleri üzerinden window adet bitişik dilim toplanır; (n, k) panelde
+    sliding_window_view'in adımlı (strided) son ekseninden belirgin şekilde hızlıdır.
+    """
+    out_dtype = np.result_type(x.dtype, np.float32)
+    out = np.full(x.shape, np.nan, dtype=out_dtype)
+    if len(x) < window:
+        return out
+    m = len(x) - window + 1
+    mean = x[:m].astype(out_dtype, copy=True)
+    for j in range(1, window):
+        mean += x[j:j + m]
+    mean /= window
+    acc = np.zeros_like(mean)
+    tmp = np.empty_like(mean)
+    for j in range(window):
+        np.subtract(x[j:j + m], mean, out=tmp)
+        np.abs(tmp, out=tmp)
+        acc += tmp
+    out[window - 1:] = acc / window
+    return out
+
+
+def ema(x: np.ndarray, span: int = None, alpha: float = None, min_periods: int = 0) -> np.ndarray:
+    """
+    Üstel hareketli ortalama (pandas ewm(adjust=False).mean()).
+    y[0] = x[0], y[t] = (1 - alpha) * y[t-1] + alpha * x[t]; alpha = 2 / (span + 1).
+    Baştaki NaN'ler: Özyineleme her sütunun ilk geçerli değerinden başlar;
+    ilk geçerli değerden itibaren min_periods gözlem dolmadan sonuç NaN'dir.
+    """
+    if alpha is None:
+        alpha = 2.0 / (span + 1.0)
+    out_dtype = np.result_type(x.dtype, np.float32)
+    n = len(x)
+    if n == 0:
+        return np.empty(x.shape, dtype=out_dtype)
+
+    values = x.astype(out_dtype, copy=True)
+    valid = ~np.isnan(values)
+    first = np.where(valid.any(axis=0), valid.argmax(axis=0), n)
+    seed = values[np.minimum(first, n - 1), np.arange(values.shape[1])] if values.ndim == 2 \
+        else values[min(first, n - 1)]
+    # Baştaki NaN'ler ilk geçerli değerle doldurulur: Sabit girdide EMA sabit kalır,
+    # yani özyineleme ilk geçerli değerde "başlamış" olur.
+    if not valid.all():
+        values = np.where(valid | (np.arange(n).reshape((n,) + (1,) * (x.ndim - 1)) >= first), values, seed)
+
+    decay = 1.0 - alpha
+    zi = np.expand_dims(decay * np.nan_to_num(seed), 0)
+    out, _ = lfilter([alpha], [1.0, -decay], values, axis=0, zi=zi)
+    out = out.astype(out_dtype, copy=False)
+
+    start = first + max(min_periods, 1) - 1
+    rows = np.arange(n).reshape((n,) + (1,) * (x.ndim - 1))
+    out[rows < start] = np.nan
+    return out
+
+
+def wilder_average(x: np.ndarray, window: int) -> np.ndarray:
+    """
+    ta AverageTrueRange ortalaması: İlk değer (window-1. satır) ilk 'window' değerin ortalaması,
+    sonra atr[t] = (atr[t-1] * (window-1) + x[t]) / window. Öncesi 0'dır (ta ile aynı).
+    """
+    out_dtype = np.result_type(x.dtype, np.float32)
+    out = np.zeros(x.shape, dtype=out_dtype)
+    if len(x) < window:
+        return out
+    alpha = 1.0 / window
+    seed = x[:window].mean(axis=0)
+    out[window - 1] = seed
+    if len(x) > window:
+        zi = np.expand_dims((1.0 - alpha) * seed, 0)
+        out[window:], _ = lfilter([alpha], [1.0, alpha - 1.0], x[window:].astype(out_dtype), axis=0, zi=zi)
+    return out
+
+
+# --- İNDİKATÖRLER (ta varsayılanlarıyla) ---
+
+# compute_indicators / compute_lag_features çıktı sütunları (sırası FeatureEngineer çıktısıyla aynı)
+INDICATOR_COLUMNS = ["sma_20", "sma_50", "ema_12", "ema_26", "macd", "macd_signal", "macd_diff", "rsi",
+                     "cci", "bb_high", "bb_low", "bb_width", "atr", "obv", "vwap"]
+# Özellik setinin pencere ayarları (FeatureEngineer.config() ile özellik deposu anahtarına girer)
+FEATURE_WINDOWS = {"sma": [20, 50], "ema": [12, 26], "macd": [12, 26, 9], "rsi": 14, "cci": [20, 0.015],
+                   "bollinger": [20, 2], "atr": 14, "vwap": 14, "lags": [1, 2, 5]}
+LAG_COLUMNS = ["lag_close_1", "lag_close_2", "lag_close_5", "lag_vol_1", "lag_rsi_1", "pct_change", "log_return"]
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9):
+    """(macd, macd_signal, macd_diff) - ta.trend.MACD"""
+    line = ema(close, span=fast, min_periods=fast) - ema(close, span=slow, min_periods=slow)
+    sig = ema(line, span=signal, min_periods=signal)
+    return line, sig, line - sig
+
+
+def rsi_averages(close: np.ndarray, window: int = 14, min_periods: int = None):
+    """RSI'nin yükseliş/düşüş Wilder ortalamaları (ema_up, ema_down)."""
+    diff = np.empty(close.shape, dtype=np.result_type(close.dtype, np.float32))
+    diff[:1] = np.nan
+    diff[1:] = close[1:] - close[:-1]
+    # pandas where(diff > 0, 0.0): NaN fark (ilk satır) 0 sayılır
+    up = np.where(diff > 0, diff, 0.0).astype(diff.dtype, copy=False)
+    down = np.where(diff < 0, -diff, 0.0).astype(diff.dtype, copy=False)
+    min_periods = window if min_periods is None else min_periods
+    return (ema(up, alpha=1.0 / window, min_periods=min_periods),
+            ema(down, alpha=1.0 / window, min_periods=min_periods))
+
+
+def rsi_from_averages(ema_up, ema_down):
+    """ta ile aynı: Düşüş ortalaması 0 ise RSI = 100."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = ema_up / ema_down
+        return np.where(ema_down == 0, 100.0, 100.0 - 100.0 / (1.0 + rs)).astype(np.result_type(ema_up, np.float32), copy=False)
+
+
+def rsi(close: np.ndarray, window: int = 14) -> np.ndarray:
+    """ta.momentum.RSIIndicator (Wilder: alpha = 1/window)."""
+    return rsi_from_averages(*rsi_averages(close, window))
+
+
+def typical_price(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    return (high + low + close) / 3.0
+
+
+def cci(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 20, constant: float = 0.015) -> np.ndarray:
+    """ta.trend.CCIIndicator"""
+    tp = typical_price(high, low, close)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (tp - rolling_mean(tp, window)) / (constant * rolling_mad(tp, window))
+
+
+def bollinger(close: np.ndarray, window: int = 20, window_dev: float = 2):
+    """(bb_high, bb_low) - ta.volatility.BollingerBands (ddof=0)"""
+    mavg = rolling_mean(close, window)
+    mstd = rolling_std(close, window, ddof=0)
+    return mavg + window_dev * mstd, mavg - window_dev * mstd
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """max(H-L, |H-C_önceki|, |L-C_önceki|); ilk satırda sadece H-L (pandas max NaN'i atlar)."""
+    prev_close = shift(close, 1)
+    tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    return tr
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> np.ndarray:
+    """ta.volatility.AverageTrueRange (ilk window-1 satır 0)."""
+    return wilder_average(true_range(high, low, close), window)
+
+
+def obv(close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    """ta.volume.OnBalanceVolumeIndicator: Düşen günde -hacim, diğerlerinde +hacim, kümülatif."""
+    falling = np.zeros(close.shape, dtype=bool)
+    falling[1:] = close[1:] < close[:-1]
+    signed = np.where(falling, -volume, volume)
+    if signed.dtype.kind != 'f':
+        return np.cumsum(signed, axis=0)
+    return np.cumsum(signed, axis=0, dtype=ACCUMULATOR_DTYPE).astype(signed.dtype, copy=False)
+
+
+def vwap(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray, window: int = 14) -> np.ndarray:
+    """ta.volume.VolumeWeightedAveragePrice (hareketli pencere)."""
+    tp = typical_price(high, low, close)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return rolling_sum(tp * volume, window) / rolling_sum(volume, window)
+
+
+def compute_indicators(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray) -> dict:
+    """
+    FeatureEngineer'ın indikatör setini tek geçişte hesaplar. {sütun adı: dizi} döner (sıra korunur).
+    Girdiler (n,) veya (n, k) olabilir; hepsi aynı şekil ve dtype'ta olmalıdır.
+    """
+    features = {
+        "sma_20": rolling_mean(close, 20),
+        "sma_50": rolling_mean(close, 50),
+        "ema_12": ema(close, span=12, min_periods=12),
+        "ema_26": ema(close, span=26, min_periods=26),
+    }
+    features["macd"], features["macd_signal"], features["macd_diff"] = macd(close)
+    features["rsi"] = rsi(close, 14)
+    features["cci"] = cci(high, low, close, 20)
+    features["bb_high"], features["bb_low"] = bollinger(close, 20, 2)
+    features["bb_width"] = (features["bb_high"] - features["bb_low"]) / close
+    features["atr"] = atr(high, low, close, 14)
+    features["obv"] = obv(close, volume)
+    features["vwap"] = vwap(high, low, close, volume, 14)
+    return features
+
+
+def compute_lag_features(close: np.ndarray, volume: np.ndarray, rsi_values: np.ndarray) -> dict:
+    """Gecikmeli (lag) özellikler ve getiriler (FeatureEngineer use_lags=True)."""
+    prev_close = shift(close, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "lag_close_1": prev_close,
+            "lag_close_2": shift(close, 2),
+            "lag_close_5": shift(close, 5),
+            "lag_vol_1": shift(volume, 1),
+            "lag_rsi_1": shift(rsi_values, 1),
+            "pct_change": close / prev_close - 1.0,
+            "log_return": np.log(close / prev_close),
+        }
@@ -0,0 +1,108 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+from src.ai_core.model_registry import ModelBundle
+
+# Bellek tahmini olmayan (ör. henüz kaydedilmemiş) model seti için varsayılan boyut
+DEFAULT_BUNDLE_BYTES = 16 * 1024 * 1024
+
+
+class ModelPool:
+    """
+    Hisse bazlı model setlerinin (ModelBundle) bellek havuzu.
+
+    - Her hisse kendi model setine sahiptir; bir hissenin modeli diğerininkini ezmez.
+    - Bellek sınırlıdır: en fazla max_bundles set ve yaklaşık max_bytes bayt.
+      Sınır aşılınca en uzun süredir kullanılmayan (LRU) set çıkarılır (disk kaydı kalır).
+    - Thread-safe'tir. get_or_load() aynı hisse için yükleme/eğitimi tek seferde yapar
+      (single-flight): aynı anda gelen ikinci istek ilkinin bitmesini bekler, tekrar eğitmez.
+      Farklı hisseler birbirini beklemez.
+    """
+    def __init__(self, max_bundles: int = 16, max_bytes: int = 512 * 1024 * 1024):
+        self.max_bundles = max_bundles
+        self.max_bytes = max_bytes
+        self._bundles = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._symbol_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    @staticmethod
+    def _size_of(bundle: ModelBundle) -> int:
+        return int(bundle.meta.get("artifact_bytes") or DEFAULT_BUNDLE_BYTES)
+
+    def _symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._lock:
+            return self._symbol_locks.setdefault(symbol, threading.Lock())
+
+    def get(self, symbol: str) -> Optional[ModelBundle]:
+        symbol = symbol.upper()
+        with self._lock:
+            bundle = self._bundles.get(symbol)
+            if bundle is not None:
+                self._bundles.move_to_end(symbol)
+            return bundle
+
+    def put(self, bundle: ModelBundle) -> None:
+        with self._lock:
+            self._bundles[bundle.symbol] = bundle
+            self._bundles.move_to_end(bundle.symbol)
+            self._sizes[bundle.symbol] = self._size_of(bundle)
+            self._evict_over_budget(keep=bundle.symbol)
+
+    def _evict_over_budget(self, keep: str) -> None:
+        # Kilit altında çağrılır. Yeni eklenen set tek başına bütçeyi aşsa bile tutulur.
+        while len(self._bundles) > 1 and (
+            len(self._bundles) > self.max_bundles or sum(self._sizes.values()) > self.max_bytes
+        ):
+            oldest = next(iter(self._bundles))
+            if oldest == keep:
+                break
+            self._bundles.pop(oldest)
+            self._sizes.pop(oldest, None)
+            self.evictions += 1
+
+    def get_or_load(self, symbol: str, loader: Callable[[Optional[ModelBundle]], ModelBundle],
+                    is_fresh: Callable[[ModelBundle], bool] = None) -> ModelBundle:
+        """
+        Havuzdaki set güncelse (is_fresh) onu döndürür; değilse loader(eski_set) ile yükletir/eğittirir.
+        Aynı hisse için loader aynı anda sadece bir thread'de çalışır.
+        """
+        symbol = symbol.upper()
+        bundle = self.get(symbol)
+        if bundle is not None and (is_fresh is None or is_fresh(bundle)):
+            return bundle
+
+        with self._symbol_lock(symbol):
+            # Beklerken başka bir thread yüklemiş olabilir
+            bundle = self.get(symbol)
+            if bundle is not None and (is_fresh is None or is_fresh(bundle)):
+                return bundle
+            bundle = loader(bundle)
+            self.put(bundle)
+            return bundle
+
+    def evict(self, symbol: str) -> None:
+        with self._lock:
+            self._bundles.pop(symbol.upper(), None)
+            self._sizes.pop(symbol.upper(), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bundles.clear()
+            self._sizes.clear()
+
+    def symbols(self) -> List[str]:
+        """Bellekteki hisseler (en eski kullanılandan en yeniye)."""
+        with self._lock:
+            return list(self._bundles)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "bundles": len(self._bundles),
+                "bytes": sum(self._sizes.values()),
+                "max_bundles": self.max_bundles,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,204 @@
+import os
+import json
+import joblib
+import pandas as pd
+from datetime import datetime
+from typing import List, Optional
+from src.ai_core.ai_models.statistical import ProphetModel, GarchModel, TREND_MODELS
+from src.ai_core.ai_models.machine_learning import XGBoostModel, DirectHorizonModel
+from src.ai_core.explainability.shap_explainer import ModelExplainer
+from src.ai_core.storage import data_fingerprint
+
+# Kayıt formatı değişirse artırılır (eski kayıtlar bayat sayılıp yeniden eğitilir)
+REGISTRY_VERSION = 1
+
+# Hisse başına dosyalar: {models_dir}/{SYMBOL}/...
+MODEL_FILES = {"xgb": "xgb.pkl", "prophet": "prophet.pkl", "garch": "garch.pkl", "direct": "direct.pkl"}
+BACKGROUND_FILE = "explainer_bg.pkl"
+META_FILE = "meta.json"
+
+# Meta'da trend modeli yazmayan (eski) kayıtlar Prophet ile eğitilmiştir
+DEFAULT_TREND_MODEL = "prophet"
+
+
+class ModelBundle:
+    """
+    Bir hissenin eğitilmiş model seti: XGBoost, Prophet, GARCH ve SHAP referans (background) verisi.
+    'prophet' yuvası topluluğun trend bileşenidir; meta['trend_model']'e göre ProphetModel veya TrendModel olur.
+    'direct' (opsiyonel): Çok ufuklu doğrudan model (DirectHorizonModel), sadece ufuklar istenmişse eğitilir.
+    Explainer diske yazılmaz; eğitimde hazır verilmediyse ilk ihtiyaçta background verisinden kurulur.
+    """
+    def __init__(self, symbol: str, xgb: XGBoostModel = None, prophet: ProphetModel = None,
+                 garch: GarchModel = None, background: pd.DataFrame = None, meta: dict = None,
+                 explainer: ModelExplainer = None, direct: DirectHorizonModel = None):
+        self.symbol = symbol
+        self.xgb = xgb
+        self.prophet = prophet
+        self.garch = garch
+        self.direct = direct
+        self.background = background
+        self.meta = meta or {}
+        self._explainer = explainer
+
+    @property
+    def explainer(self) -> ModelExplainer:
+        if self._explainer is None:
+            self._explainer = ModelExplainer(self.xgb.model, self.background)
+        return self._explainer
+
+    @property
+    def feature_columns(self) -> List[str]:
+        return self.meta.get("features", [])
+
+    def __repr__(self):
+        return f"<ModelBundle: {self.symbol} (Son veri: {self.meta.get('last_date')})>"
+
+
+class ModelRegistry:
+    """
+    Eğitilmiş modellerin kalıcı (disk) kaydı.
+
+    - Her hisse kendi klasöründe saklanır; meta.json en son yazılır, varlığı kaydın tamamlandığını gösterir.
+    - meta: eğitim verisinin parmak izi, satır sayısı, ilk/son tarih, özellik listesi, eğitim zamanı.
+    - Bellekte tutma (önbellek) bu sınıfın işi değildir, bkz. ModelPool.
+    - staleness() modelin yeniden eğitilmesi gerekip gerekmediğini söyler; gerekmedikçe eğitim yapılmaz.
+    """
+    def __init__(self, models_dir: str = "models", max_staleness_days: int = 7, trend_model: str = None,
+                 horizons=None):
+        self.models_dir = models_dir
+        self.max_staleness_days = max_staleness_days
+        # Verilirse başka trend modeliyle / başka ufuklarla eğitilmiş kayıtlar bayat sayılır (None: kontrol yok)
+        self.trend_model = trend_model
+        self.horizons = sorted(int(h) for h in horizons) if horizons else None
+        os.makedirs(models_dir, exist_ok=True)
+
+    # --- DOSYA YERLEŞİMİ ---
+    def symbol_dir(self, symbol: str) -> str:
+        return os.path.join(self.models_dir, symbol.upper())
+
+    def exists(self, symbol: str) -> bool:
+        return os.path.exists(os.path.join(self.symbol_dir(symbol), META_FILE))
+
+    def symbols(self) -> List[str]:
+        """Kaydı tamamlanmış hisseler."""
+        if not os.path.isdir(self.models_dir):
+            return []
+        return sorted(name for name in os.listdir(self.models_dir) if self.exists(name))
+
+    def read_meta(self, symbol: str) -> Optional[dict]:
+        path = os.path.join(self.symbol_dir(symbol), META_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    # --- YAZMA ---
+    @staticmethod
+    def build_meta(symbol: str, df: pd.DataFrame, features: List[str], **extra) -> dict:
+        """Eğitim verisinden meta bilgisini üretir (df: ham veri, 'Date' sütunlu)."""
+        dates = pd.to_datetime(df['Date'])
+        meta = {
+            "symbol": symbol.upper(),
+            "registry_version": REGISTRY_VERSION,
+            "trained_at": datetime.now().isoformat(timespec="seconds"),
+            "data_hash": data_fingerprint(df),
+            "data_rows": int(len(df)),
+            "first_date": str(dates.min().date()),
+            "last_date": str(dates.max().date()),
+            "features": list(features),
+        }
+        meta.update(extra)
+        return meta
+
+    def save(self, bundle: ModelBundle) -> str:
+        """Model setini diske yazar. Geriye klasör yolunu döner."""
+        folder = self.symbol_dir(bundle.symbol)
+        os.makedirs(folder, exist_ok=True)
+        meta_path = os.path.join(folder, META_FILE)
+        # Yazım sırasında çökerse yarım kayıt "tamamlanmış" görünmesin
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
+        for key, filename in MODEL_FILES.items():
+            model = getattr(bundle, key)
+            if model is not None:
+                self._atomic_dump(model, os.path.join(folder, filename))
+        if bundle.background is not None:
+            self._atomic_dump(bundle.background, os.path.join(folder, BACKGROUND_FILE))
+
+        # Dosya boyutları bellekteki yaklaşık boyutu verir (ModelPool bütçesi için)
+        bundle.meta["artifact_bytes"] = sum(
+            os.path.getsize(os.path.join(folder, f))
+            for f in list(MODEL_FILES.values()) + [BACKGROUND_FILE]
+            if os.path.exists(os.path.join(folder, f))
+        )
+        tmp_path = meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(bundle.meta, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, meta_path)
+        return folder
+
+    @staticmethod
+    def _atomic_dump(model, path: str) -> None:
+        tmp_path = path + ".tmp"
+        if hasattr(model, "save"):
+            model.save(tmp_path)
+        else:
+            joblib.dump(model, tmp_path)
+        os.replace(tmp_path, path)
+
+    # --- OKUMA ---
+    def load(self, symbol: str) -> Optional[ModelBundle]:
+        """Model setini diskten yükler. Kayıt yoksa None."""
+        symbol = symbol.upper()
+        meta = self.read_meta(symbol)
+        if meta is None:
+            return None
+
+        folder = self.symbol_dir(symbol)
+        trend_cls = TREND_MODELS.get(meta.get("trend_model", DEFAULT_TREND_MODEL), ProphetModel)
+        bundle = ModelBundle(symbol, xgb=XGBoostModel(), prophet=trend_cls(), garch=GarchModel(), meta=meta,
+                             direct=DirectHorizonModel())
+        for key, filename in MODEL_FILES.items():
+            path = os.path.join(folder, filename)
+            if os.path.exists(path):
+                getattr(bundle, key).load(path)
+            else:
+                setattr(bundle, key, None)
+        bg_path = os.path.join(folder, BACKGROUND_FILE)
+        bundle.background = joblib.load(bg_path) if os.path.exists(bg_path) else None
+
+        return bundle
+
+    # --- BAYATLIK KONTROLÜ ---
+    def staleness(self, meta: Optional[dict], df: pd.DataFrame, features: List[str] = None) -> Optional[str]:
+        """
+        Modelin yeniden eğitilmesi gerekiyorsa sebebini, gerekmiyorsa None döner.
+
+        - Kayıt yok / kayıt formatı eski
+        - Özellik listesi değişmiş (FeatureEngineer güncellenmiş)
+        - Trend modeli seçimi veya çok ufuklu modelin ufukları değişmiş (bkz. trend_model, horizons)
+        - Eğitimde kullanılan geçmiş değişmiş (parmak izi tutmuyor)
+        - Eğitimden sonra max_staleness_days'den fazla yeni veri gelmiş
+        """
+        if meta is None:
+            return "Kayıtlı model yok"
+        if meta.get("registry_version") != REGISTRY_VERSION:
+            return "Model kayıt formatı eski"
+        if features is not None and list(features) != meta.get("features"):
+            return "Özellik listesi değişmiş"
+        if self.trend_model and meta.get("trend_model", DEFAULT_TREND_MODEL) != self.trend_model:
+            return "Trend modeli değişmiş"
+        if self.horizons and meta.get("horizons") != self.horizons:
+            return "Tahmin ufukları değişmiş"
+
+        dates = pd.to_datetime(df['Date'])
+        trained_last = pd.Timestamp(meta["last_date"])
+        history = df[dates <= trained_last]
+        if len(history) != meta.get("data_rows") or data_fingerprint(history) != meta.get("data_hash"):
+            return "Eğitim verisinin geçmişi değişmiş"
+
+        age_days = (dates.max() - trained_last).days
+        if age_days > self.max_staleness_days:
+            return f"Model {age_days} gün eski (Sınır: {self.max_staleness_days} gün)"
+        return None
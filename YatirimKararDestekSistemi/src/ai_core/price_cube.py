@@ -0,0 +1,170 @@
+# src/ai_core/price_cube.py
+# Hisse evreninin fiyatlarını tek bir bellek eşlemli (memory-mapped) NumPy küpünde (tarih x hisse x alan) tutar.
+
+import os
+import json
+from datetime import datetime
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+from numpy.lib.format import open_memmap
+from src.ai_core.panel_features import PricePanel, PANEL_FIELDS
+
+# Sidecar formatı değişirse artırılır
+CUBE_VERSION = 1
+
+
+def build_price_cube(store, symbols, path: str, dtype=np.float64, fields=None) -> "PriceCube":
+    """
+    Depodaki (PriceStore) hisseleri tek bir .npy küpüne yazar: (tarih x hisse x alan).
+    Tarihler tüm hisselerin tarihlerinin birleşimidir; hissenin barı olmayan hücreler NaN'dir.
+    Yanına {path}.json (sembol/tarih/alan index'i) yazılır. Bellekte aynı anda tek hissenin verisi tutulur.
+    """
+    fields = list(fields or PANEL_FIELDS)
+    symbols = [s.upper() for s in dict.fromkeys(symbols) if store.exists(s.upper())]
+    if not symbols:
+        raise ValueError("Küp için depoda veri yok.")
+
+    # 1. Tarih birleşimi (sadece Date sütunları okunur)
+    dates = np.unique(np.concatenate([store.read(s, columns=['Date'])['Date'].to_numpy() for s in symbols]))
+
+    # 2. Küpü diske doğrudan yaz (atomik: önce geçici dosya)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp.npy"
+    cube = open_memmap(tmp_path, mode="w+", dtype=np.dtype(dtype), shape=(len(dates), len(symbols), len(fields)))
+    cube[:] = np.nan
+    for j, symbol in enumerate(symbols):
+        df = store.read(symbol, columns=['Date'] + fields)
+        rows = np.searchsorted(dates, df['Date'].to_numpy())
+        cube[rows, j, :] = df[fields].to_numpy(dtype=dtype)
+    cube.flush()
+    del cube
+    os.replace(tmp_path, path)
+
+    index = {
+        "version": CUBE_VERSION,
+        "dtype": np.dtype(dtype).name,
+        "shape": [len(dates), len(symbols), len(fields)],
+        "fields": fields,
+        "symbols": symbols,
+        "dates": [str(d) for d in pd.DatetimeIndex(dates).date],
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    with open(PriceCube.index_path(path) + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(PriceCube.index_path(path) + ".tmp", PriceCube.index_path(path))
+    print(f"✅ Fiyat küpü yazıldı: {len(dates)} gün x {len(symbols)} hisse x {len(fields)} alan -> {path}")
+    return PriceCube(path)
+
+
+class PriceCube:
+    """
+    Salt okunur, bellek eşlemli fiyat küpü. Dosya bir kez açılır; veriler ihtiyaç oldukça işletim
+    sisteminin sayfa önbelleğinden okunur ve aynı dosyayı açan tüm süreçler bu önbelleği paylaşır.
+
+    - window()/field(): Tarih aralığı ve ardışık hisse/alan seçimleri kopyasız görünümdür (view).
+      Ardışık olmayan hisse listeleri NumPy kuralı gereği kopya üretir.
+    - Pickle edilince sadece dosya yolu taşınır: ProcessPoolExecutor işçilerine verilebilir,
+      her işçi veriyi kopyalamadan aynı dosyayı yeniden eşler.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(self.index_path(path), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") != CUBE_VERSION:
+            raise ValueError(f"Desteklenmeyen küp sürümü: {index.get('version')}")
+        self.data = np.load(path, mmap_mode="r")
+        self.dates = pd.DatetimeIndex(index["dates"])
+        self.symbols: List[str] = index["symbols"]
+        self.fields: List[str] = index["fields"]
+        self.built_at = index.get("built_at")
+        self._symbol_pos = {s: i for i, s in enumerate(self.symbols)}
+        self._field_pos = {f: i for i, f in enumerate(self.fields)}
+
+    @staticmethod
+    def index_path(path: str) -> str:
+        return path + ".json"
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol.upper() in self._symbol_pos
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    # --- SEÇİM ---
+    def _date_slice(self, start=None, end=None) -> slice:
+        lo = 0 if start is None else int(self.dates.searchsorted(pd.Timestamp(start), side="left"))
+        hi = len(self.dates) if end is None else int(self.dates.searchsorted(pd.Timestamp(end), side="right"))
+        return slice(lo, hi)
+
+    @staticmethod
+    def _positions(names, lookup: dict, kind: str):
+        """İsim listesini konumlara çevirir; ardışık artan konumlar slice olur (kopyasız seçim)."""
+        if names is None:
+            return slice(None)
+        try:
+            pos = [lookup[n.upper() if kind == "hisse" else n] for n in names]
+        except KeyError as e:
+            raise KeyError(f"Küpte olmayan {kind}: {e.args[0]}") from None
+        if pos and pos == list(range(pos[0], pos[0] + len(pos))):
+            return slice(pos[0], pos[0] + len(pos))
+        return np.asarray(pos)
+
+    @staticmethod
+    def _is_all(selection) -> bool:
+        return isinstance(selection, slice) and selection == slice(None)
+
+    def window(self, start=None, end=None, symbols: Optional[List[str]] = None,
+               fields: Optional[List[str]] = None) -> np.ndarray:
+        """(tarih x hisse x alan) alt küpü. Tarih aralığı [start, end] uçlar dahildir."""
+        rows = self._date_slice(start, end)
+        cols = self._positions(symbols, self._symbol_pos, "hisse")
+        depth = self._positions(fields, self._field_pos, "alan")
+        block = self.data[rows]
+        # Eksenler ayrı ayrı seçilir: slice'lar görünüm olarak kalır, liste seçimi sadece o eksende kopyalar
+        if not self._is_all(cols):
+            block = block[:, cols]
+        if not self._is_all(depth):
+            block = block[:, :, depth]
+        return block
+
+    def field(self, name: str, start=None, end=None, symbols: Optional[List[str]] = None) -> np.ndarray:
+        """Tek alanın (tarih x hisse) matrisi, Ör. field('Close')."""
+        return self.window(start, end, symbols, [name])[:, :, 0]
+
+    def dates_between(self, start=None, end=None) -> pd.DatetimeIndex:
+        return self.dates[self._date_slice(start, end)]
+
+    def frame(self, name: str, start=None, end=None, symbols: Optional[List[str]] = None) -> pd.DataFrame:
+        """Tek alanın geniş (wide) tablosu: index tarih, sütunlar hisse."""
+        values = self.field(name, start, end, symbols)
+        columns = [s.upper() for s in symbols] if symbols is not None else self.symbols
+        return pd.DataFrame(values, index=self.dates_between(start, end), columns=columns, copy=False)
+
+    def history(self, symbol: str, start=None, end=None) -> pd.DataFrame:
+        """Tek hissenin OHLCV geçmişi (depo şeması: Date sütunlu), barı olmayan günler atlanır."""
+        values = self.window(start, end, [symbol])[:, 0, :]
+        df = pd.DataFrame(values, columns=self.fields)
+        df.insert(0, 'Date', self.dates_between(start, end))
+        return df[~np.isnan(values).all(axis=1)].reset_index(drop=True)
+
+    def to_panel(self, start=None, end=None, symbols: Optional[List[str]] = None) -> PricePanel:
+        """Panel özellik hesaplaması (PanelFeatureEngineer) için PricePanel görünümü (tüm PANEL_FIELDS gerekir)."""
+        missing = [name for name in PANEL_FIELDS if name not in self._field_pos]
+        if missing:
+            raise ValueError(f"Küp panel için gereken alanları içermiyor: {', '.join(missing)} "
+                             f"(Küp alanları: {', '.join(self.fields)}). Küpü fields=None ile yeniden kurun.")
+        block = self.window(start, end, symbols)
+        names = [s.upper() for s in symbols] if symbols is not None else self.symbols
+        return PricePanel(self.dates_between(start, end), names,
+                          {name: block[:, :, self._field_pos[name]] for name in PANEL_FIELDS})
+
+    def __repr__(self):
+        return f"<PriceCube: {len(self.dates)} gün x {len(self.symbols)} hisse x {len(self.fields)} alan, {self.path}>"
@@ -0,0 +1,290 @@
+import os
+import glob
+import hashlib
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+# Depoda tutulan standart (İngilizce) sütunlar ve sıraları
+PRICE_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+
+# Eski CSV önbelleğindeki Türkçe başlıkların standart karşılıkları
+CSV_COLUMN_MAP = {
+    'Tarih': 'Date', 'Açılış': 'Open', 'Yüksek': 'High',
+    'Düşük': 'Low', 'Kapanış': 'Close', 'Hacim': 'Volume',
+    'Düzeltilmiş_Kapanış': 'Adj Close'
+}
+CSV_REVERSE_MAP = {v: k for k, v in CSV_COLUMN_MAP.items()}
+
+# Parmak izi alınan ham veri sütunları (model kaydı ve özellik deposu ortak kullanır)
+FINGERPRINT_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def normalize_prices(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Fiyat tablosunu depo şemasına getirir:
+    Date -> datetime64, diğer tüm sayısal sütunlar -> float64, tarihe göre sıralı.
+    """
+    cols = [c for c in PRICE_COLUMNS if c in df.columns]
+    data = df[cols].copy()
+    data['Date'] = pd.to_datetime(data['Date'])
+    # yfinance bazen tz-aware tarih döndürür, depoda saf tarih tutuyoruz
+    if getattr(data['Date'].dt, 'tz', None) is not None:
+        data['Date'] = data['Date'].dt.tz_localize(None)
+    for col in cols:
+        if col != 'Date':
+            data[col] = data[col].astype('float64')
+    data.sort_values('Date', inplace=True)
+    data.reset_index(drop=True, inplace=True)
+    return data
+
+
+def data_fingerprint(df: pd.DataFrame) -> str:
+    """Ham fiyat verisinin içerik özeti (SHA1). Geçmiş değişirse (bölünme düzeltmesi vb.) özet değişir."""
+    cols = [c for c in FINGERPRINT_COLUMNS if c in df.columns]
+    hashed = pd.util.hash_pandas_object(df[cols].reset_index(drop=True), index=False)
+    return hashlib.sha1(hashed.values.tobytes()).hexdigest()
+
+
+def read_legacy_csv(file_path: str) -> pd.DataFrame:
+    """Türkçe başlıklı, gün/ay/yıl tarihli eski CSV önbelleğini okur."""
+    # encoding='utf-8-sig' (Türkçe karakterler ve Excel BOM'u için)
+    df = pd.read_csv(file_path, encoding='utf-8-sig')
+    df.rename(columns=CSV_COLUMN_MAP, inplace=True)
+    df['Date'] = pd.to_datetime(df['Date'], dayfirst=True)
+    return normalize_prices(df)
+
+
+def export_csv(df: pd.DataFrame, file_path: str) -> str:
+    """
+    Fiyat tablosunu eski formatta (Türkçe başlık, gg/aa/yyyy tarih) CSV olarak dışa aktarır.
+    CSV artık sadece dışa aktarım formatıdır, sistem okurken kullanmaz.
+    """
+    save_df = df.copy()
+    save_df['Date'] = save_df['Date'].dt.strftime('%d/%m/%Y')
+    save_df.rename(columns=CSV_REVERSE_MAP, inplace=True)
+    # utf-8-sig: Excel/Windows uyumluluğu için BOM ekler
+    save_df.to_csv(file_path, index=False, encoding='utf-8-sig')
+    return file_path
+
+
+class PriceStore(ABC):
+    """
+    Sembol bazlı fiyat geçmişi deposu (Storage Backend) için temel sınıf.
+    Veriler tipli sütunlarla saklanır; okurken başlık çevirisi veya tarih parse'ı yapılmaz.
+
+    Yerleşim:
+        {root}/{SYMBOL}.ext           -> Ana (sıkıştırılmış) geçmiş dosyası
+        {root}/{SYMBOL}.parts/*.ext   -> Sadece eklenen (append-only) yeni satır parçaları
+    Günlük güncellemeler geçmişi yeniden yazmaz, sadece yeni bir parça ekler.
+    Parçalar compact() ile ana dosyaya birleştirilir.
+    """
+    extension = ""
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        os.makedirs(root_dir, exist_ok=True)
+
+    def path_for(self, symbol: str) -> str:
+        return os.path.join(self.root_dir, f"{symbol}{self.extension}")
+
+    def parts_dir(self, symbol: str) -> str:
+        return os.path.join(self.root_dir, f"{symbol}.parts")
+
+    def part_files(self, symbol: str) -> List[str]:
+        """Sembolün eklenmiş parça dosyaları (yazılma sırasına göre)."""
+        return sorted(glob.glob(os.path.join(self.parts_dir(symbol), f"*{self.extension}")))
+
+    def exists(self, symbol: str) -> bool:
+        return os.path.exists(self.path_for(symbol)) or bool(self.part_files(symbol))
+
+    def symbols(self) -> List[str]:
+        """Depoda verisi bulunan sembolleri döndürür."""
+        files = glob.glob(os.path.join(self.root_dir, f"*{self.extension}"))
+        names = {os.path.basename(f)[:-len(self.extension)] for f in files}
+        names.update(os.path.basename(d)[:-len(".parts")] for d in glob.glob(os.path.join(self.root_dir, "*.parts")))
+        return sorted(names)
+
+    def read(self, symbol: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Sembolün tüm geçmişini (veya sadece istenen sütunları) okur."""
+        frames = []
+        if os.path.exists(self.path_for(symbol)):
+            frames.append(self._read_file(self.path_for(symbol), columns))
+        frames.extend(self._read_file(f, columns) for f in self.part_files(symbol))
+        if len(frames) == 1:
+            return frames[0]
+        # Parçalar append() tarafından hep daha yeni tarihlerle yazılır, sıralama korunur
+        return pd.concat(frames, ignore_index=True)
+
+    def last_date(self, symbol: str):
+        """Depodaki son tarihi, tüm geçmişi okumadan (sadece son dosyanın Date sütunu) bulur."""
+        parts = self.part_files(symbol)
+        if parts:
+            path = parts[-1]
+        elif os.path.exists(self.path_for(symbol)):
+            path = self.path_for(symbol)
+        else:
+            return None
+        dates = self._read_file(path, ['Date'])['Date']
+        return dates.max() if not dates.empty else None
+
+    def write(self, symbol: str, df: pd.DataFrame) -> None:
+        """Sembolün geçmişini baştan yazar (atomik: önce geçici dosya, sonra rename)."""
+        path = self.path_for(symbol)
+        tmp_path = path + ".tmp"
+        self._write_file(normalize_prices(df), tmp_path)
+        os.replace(tmp_path, path)
+        # Ana dosya artık tüm geçmişi içeriyor, eski parçalar geçersiz
+        self._clear_parts(symbol)
+
+    def append(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Sadece depodaki son tarihten SONRAKİ satırları yeni bir parça olarak ekler.
+        Aynı veri iki kez gelse bile tekrar yazılmaz (idempotent).
+        Geriye gerçekten eklenen satırları döndürür. Maliyet: O(yeni satır).
+        """
+        new_rows = normalize_prices(df).drop_duplicates(subset=['Date'], keep='last')
+        last_date = self.last_date(symbol)
+        if last_date is not None:
+            new_rows = new_rows[new_rows['Date'] > last_date]
+        if new_rows.empty:
+            return new_rows
+        new_rows = new_rows.reset_index(drop=True)
+
+        if os.path.exists(self.path_for(symbol)):
+            new_rows = self._match_columns(new_rows, self._columns(self.path_for(symbol)))
+
+        if last_date is None and not os.path.exists(self.path_for(symbol)):
+            # İlk kayıt: doğrudan ana dosya olarak yaz
+            self.write(symbol, new_rows)
+            return new_rows
+
+        parts_dir = self.parts_dir(symbol)
+        os.makedirs(parts_dir, exist_ok=True)
+        index = len(self.part_files(symbol))
+        part_path = os.path.join(parts_dir, f"{index:06d}{self.extension}")
+        tmp_path = part_path + ".tmp"
+        self._write_file(new_rows, tmp_path)
+        os.replace(tmp_path, part_path)
+        return new_rows
+
+    @staticmethod
+    def _match_columns(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        """
+        Parçayı ana dosyanın sütunlarına getirir (read() parçaları hizalamadan birleştirir).
+        Eski CSV'den gelen ana dosyada 'Adj Close' olup sağlayıcı verisinde yoksa Close ile doldurulur;
+        aksi halde yeni satırlar NaN alır ve load_data'daki dropna onları sessizce atardı.
+        """
+        df = df.copy()
+        if 'Adj Close' in columns and 'Adj Close' not in df.columns and 'Close' in df.columns:
+            df['Adj Close'] = df['Close']
+        return df.reindex(columns=columns)
+
+    def compact(self, symbol: str) -> int:
+        """
+        Ana dosya ile parçaları tek dosyada birleştirir (geçmişin yeniden yazıldığı TEK yer).
+        Geriye birleştirilen parça sayısını döndürür.
+        """
+        parts = self.part_files(symbol)
+        if not parts:
+            return 0
+        df = self.read(symbol).drop_duplicates(subset=['Date'], keep='last')
+        self.write(symbol, df)
+        return len(parts)
+
+    def compact_all(self, min_parts: int = 1) -> dict:
+        """En az min_parts parçası birikmiş tüm sembolleri sıkıştırır."""
+        report = {}
+        for symbol in self.symbols():
+            if len(self.part_files(symbol)) >= min_parts:
+                report[symbol] = self.compact(symbol)
+        return report
+
+    def _clear_parts(self, symbol: str) -> None:
+        for f in self.part_files(symbol):
+            os.remove(f)
+        parts_dir = self.parts_dir(symbol)
+        if os.path.isdir(parts_dir) and not os.listdir(parts_dir):
+            os.rmdir(parts_dir)
+
+    @abstractmethod
+    def _read_file(self, path: str, columns: Optional[List[str]]) -> pd.DataFrame:
+        pass
+
+    @abstractmethod
+    def _write_file(self, df: pd.DataFrame, path: str) -> None:
+        pass
+
+    @abstractmethod
+    def _columns(self, path: str) -> List[str]:
+        """Dosyanın sütun adları (veri okunmadan, sadece şemadan)."""
+        pass
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: {self.root_dir}>"
+
+
+class ParquetPriceStore(PriceStore):
+    """Apache Parquet (sıkıştırılmış, sütun bazlı) depo. Varsayılan backend."""
+    extension = ".parquet"
+
+    def _read_file(self, path, columns):
+        return pd.read_parquet(path, columns=columns)
+
+    def _write_file(self, df, path):
+        df.to_parquet(path, index=False, compression='snappy')
+
+    def _columns(self, path):
+        return pq.read_schema(path).names
+
+
+class FeatherPriceStore(PriceStore):
+    """Arrow IPC (Feather) depo. Sıkıştırmasız, okuması en hızlı format."""
+    extension = ".feather"
+
+    def _read_file(self, path, columns):
+        return pd.read_feather(path, columns=columns)
+
+    def _write_file(self, df, path):
+        df.to_feather(path)
+
+    def _columns(self, path):
+        with pa.memory_map(path) as source:
+            return pa.ipc.open_file(source).schema.names
+
+
+STORE_BACKENDS = {
+    "parquet": ParquetPriceStore,
+    "feather": FeatherPriceStore,
+}
+
+
+def get_price_store(backend: str = "parquet", root_dir: str = "dataSets/store") -> PriceStore:
+    """İsmi verilen backend için depo nesnesi oluşturur."""
+    if backend not in STORE_BACKENDS:
+        raise ValueError(f"Bilinmeyen depo tipi: {backend}. Seçenekler: {list(STORE_BACKENDS)}")
+    return STORE_BACKENDS[backend](root_dir)
+
+
+def migrate_csv_dir(csv_dir: str, store: PriceStore, overwrite: bool = False) -> dict:
+    """
+    Eski CSV önbelleğindeki tüm sembolleri tek seferde depoya aktarır.
+    Geriye {"migrated": [...], "skipped": [...], "failed": {sembol: hata}} döner.
+    """
+    report = {"migrated": [], "skipped": [], "failed": {}}
+    for file_path in sorted(glob.glob(os.path.join(csv_dir, "*.csv"))):
+        symbol = os.path.splitext(os.path.basename(file_path))[0]
+        if store.exists(symbol) and not overwrite:
+            report["skipped"].append(symbol)
+            continue
+        try:
+            store.write(symbol, read_legacy_csv(file_path))
+            report["migrated"].append(symbol)
+        except Exception as e:
+            report["failed"][symbol] = str(e)
+
+    print(f"✅ CSV taşıma tamamlandı: {len(report['migrated'])} aktarıldı, "
+          f"{len(report['skipped'])} atlandı, {len(report['failed'])} hatalı.")
+    return report
@@ -0,0 +1,293 @@
+# src/ai_core/streaming_features.py
+# Yeni gelen bar (gün/seans) için özellikleri tüm geçmişi yeniden hesaplamadan üreten durum (state) nesnesi.
+
+import math
+from collections import deque
+import numpy as np
+import pandas as pd
+from src.ai_core import indicators as ind
+from src.ai_core.indicators import INDICATOR_COLUMNS, LAG_COLUMNS
+
+# Durum formatı değişirse artırılır (eski kontrol noktaları yüklenmez, geçmişten yeniden kurulur)
+STATE_VERSION = 1
+
+# Pencere uzunlukları (FeatureEngineer / ta varsayılanları)
+CLOSE_BUFFER = 50      # SMA 50 (SMA 20, Bollinger 20 ve lag_close_5 de bu tampondan okunur)
+CCI_WINDOW = 20
+VWAP_WINDOW = 14
+RSI_WINDOW = 14
+ATR_WINDOW = 14
+EMA_FAST, EMA_SLOW, MACD_SIGNAL = 12, 26, 9
+
+
+# Pencereler küçük olduğu için (<= 50) hesaplar saf Python ile yapılır; NumPy çağrı maliyeti
+# bu boyutta hesaplamanın kendisinden büyüktür.
+
+def _window_mean(values) -> float:
+    # Sabit pencerede tam değer (toplu hesaplamadaki constant_windows kuralı)
+    return values[0] if min(values) == max(values) else sum(values) / len(values)
+
+
+def _div(a: float, b: float) -> float:
+    """NumPy bölme kuralları: x/0 -> ±inf, 0/0 -> NaN (toplu hesaplamayla aynı)."""
+    if b == 0 or math.isnan(b):
+        return math.nan if a == 0 or math.isnan(a) or math.isnan(b) else math.copysign(math.inf, a) * math.copysign(1, b)
+    return a / b
+
+
+class FeatureState:
+    """
+    Bir hissenin indikatör durumu: EMA değerleri, RSI/ATR Wilder ortalamaları, OBV toplamı
+    ve hareketli pencere tamponları (son 50 kapanış, son 20 tipik fiyat, son 14 hacim).
+
+    - from_history(df): Geçmişten NumPy çekirdekleriyle (tek geçiş) kurulur.
+    - update(bar): Yeni barı işler ve en yeni özellik satırını O(pencere) sürede üretir.
+      commit=False ile durum değişmez (Ör. seans içi, henüz kapanmamış bar için önizleme).
+    - to_dict()/from_dict(): Kontrol noktası (checkpoint); yeniden başlatmada durum korunur.
+    Üretilen satır FeatureEngineer.create_features çıktısının aynı tarihli satırıyla aynıdır.
+    """
+    def __init__(self, use_lags: bool = True, raw_columns=None):
+        self.use_lags = use_lags
+        self.raw_columns = list(raw_columns or ['Date', 'Open', 'High', 'Low', 'Close', 'Volume'])
+        self.count = 0
+        self.closes = deque(maxlen=CLOSE_BUFFER)
+        self.typical = deque(maxlen=CCI_WINDOW)
+        self.typical_volume = deque(maxlen=VWAP_WINDOW)
+        self.volumes = deque(maxlen=VWAP_WINDOW)
+        self.ema_fast = None
+        self.ema_slow = None
+        self.macd_signal = None
+        self.macd_count = 0
+        self.avg_up = None
+        self.avg_down = None
+        self.atr = 0.0
+        self.tr_sum = 0.0
+        self.obv = 0.0
+        self.prev_volume = math.nan
+        self.prev_rsi = math.nan
+        self.last_date = None
+        self.last_row = None
+
+    # --- KURULUM ---
+    @classmethod
+    def from_history(cls, df: pd.DataFrame, use_lags: bool = True) -> "FeatureState":
+        """Geçmiş veriden (ham OHLCV, 'Date' sütunlu veya tarih index'li) durumu kurar."""
+        state = cls(use_lags, raw_columns=list(df.columns))
+        n = len(df)
+        if n == 0:
+            return state
+
+        high = df['High'].to_numpy(dtype=np.float64)
+        low = df['Low'].to_numpy(dtype=np.float64)
+        close = df['Close'].to_numpy(dtype=np.float64)
+        volume = df['Volume'].to_numpy(dtype=np.float64)
+        typical = ind.typical_price(high, low, close)
+
+        state.count = n
+        state.closes.extend(close[-CLOSE_BUFFER:].tolist())
+        state.typical.extend(typical[-CCI_WINDOW:].tolist())
+        state.typical_volume.extend((typical * volume)[-VWAP_WINDOW:].tolist())
+        state.volumes.extend(volume[-VWAP_WINDOW:].tolist())
+
+        # Özyinelemeli değerlerin maskelenmemiş (min_periods=0) son hali
+        ema_fast = ind.ema(close, span=EMA_FAST)
+        ema_slow = ind.ema(close, span=EMA_SLOW)
+        state.ema_fast, state.ema_slow = float(ema_fast[-1]), float(ema_slow[-1])
+        if n >= EMA_SLOW:
+            line = ema_fast - ema_slow
+            line[:EMA_SLOW - 1] = np.nan
+            state.macd_signal = float(ind.ema(line, span=MACD_SIGNAL)[-1])
+            state.macd_count = n - EMA_SLOW + 1
+        avg_up, avg_down = ind.rsi_averages(close, RSI_WINDOW, min_periods=0)
+        state.avg_up, state.avg_down = float(avg_up[-1]), float(avg_down[-1])
+
+        tr = ind.true_range(high, low, close)
+        state.tr_sum = float(tr.sum()) if n < ATR_WINDOW else 0.0
+        state.atr = float(ind.wilder_average(tr, ATR_WINDOW)[-1])
+        state.obv = float(ind.obv(close, volume)[-1])
+        state.prev_volume = float(volume[-1])
+
+        rsi = ind.rsi_from_averages(*ind.rsi_averages(close, RSI_WINDOW))
+        state.prev_rsi = float(rsi[-1])
+
+        # Son satır: Toplu hesaplamanın son satırı (update çağrılmadan latest_row için)
+        features = ind.compute_indicators(high, low, close, volume)
+        if use_lags:
+            features.update(ind.compute_lag_features(close, volume, features['rsi']))
+        last = df.iloc[-1]
+        state.last_date = state._bar_date(last, df.index[-1])
+        state.last_row = {**last.to_dict(), **{k: float(v[-1]) for k, v in features.items()}}
+        return state
+
+    @staticmethod
+    def _bar_date(bar, fallback=None):
+        date = bar.get('Date') if hasattr(bar, 'get') else None
+        if date is None:
+            date = bar.name if isinstance(bar, pd.Series) and bar.name is not None else fallback
+        return pd.Timestamp(date) if date is not None else None
+
+    # --- GÜNCELLEME ---
+    def update(self, bar, commit: bool = True) -> dict:
+        """
+        Yeni barı işler, {sütun: değer} olarak en yeni özellik satırını döner (ham sütunlar + özellikler).
+        bar: dict veya Series (Open/High/Low/Close/Volume, opsiyonel 'Date').
+        Isınma süresince (Ör. ilk 50 bar) bazı özellikler NaN'dir; toplu hesaplama bu satırları atar.
+        """
+        if not commit:
+            return self.copy().update(bar, commit=True)
+
+        date = self._bar_date(bar)
+        if date is not None and self.last_date is not None and date <= self.last_date:
+            raise ValueError(f"Bar tarihi ({date.date()}) son işlenen tarihten ({self.last_date.date()}) yeni değil.")
+
+        h, l, c, v = (float(bar['High']), float(bar['Low']), float(bar['Close']), float(bar['Volume']))
+        prev_close = self.closes[-1] if self.closes else math.nan
+        tp = (h + l + c) / 3.0
+        self.count += 1
+        self.closes.append(c)
+        self.typical.append(tp)
+        self.typical_volume.append(tp * v)
+        self.volumes.append(v)
+        closes = list(self.closes)
+        row = {}
+
+        # 1. TREND: SMA, EMA, MACD
+        row['sma_20'] = _window_mean(closes[-20:]) if len(closes) >= 20 else math.nan
+        row['sma_50'] = _window_mean(closes) if len(closes) >= 50 else math.nan
+        a_fast, a_slow, a_sig = 2.0 / (EMA_FAST + 1), 2.0 / (EMA_SLOW + 1), 2.0 / (MACD_SIGNAL + 1)
+        self.ema_fast = c if self.ema_fast is None else (1 - a_fast) * self.ema_fast + a_fast * c
+        self.ema_slow = c if self.ema_slow is None else (1 - a_slow) * self.ema_slow + a_slow * c
+        row['ema_12'] = self.ema_fast if self.count >= EMA_FAST else math.nan
+        row['ema_26'] = self.ema_slow if self.count >= EMA_SLOW else math.nan
+        macd = math.nan
+        if self.count >= EMA_SLOW:
+            macd = self.ema_fast - self.ema_slow
+            self.macd_signal = macd if self.macd_signal is None else (1 - a_sig) * self.macd_signal + a_sig * macd
+            self.macd_count += 1
+        signal = self.macd_signal if self.macd_count >= MACD_SIGNAL else math.nan
+        row['macd'], row['macd_signal'], row['macd_diff'] = macd, signal, macd - signal
+
+        # 2. MOMENTUM: RSI (Wilder), CCI
+        diff = c - prev_close
+        up, down = (diff if diff > 0 else 0.0), (-diff if diff < 0 else 0.0)
+        a_rsi = 1.0 / RSI_WINDOW
+        self.avg_up = up if self.avg_up is None else (1 - a_rsi) * self.avg_up + a_rsi * up
+        self.avg_down = down if self.avg_down is None else (1 - a_rsi) * self.avg_down + a_rsi * down
+        if self.count < RSI_WINDOW:
+            rsi = math.nan
+        else:
+            rsi = 100.0 if self.avg_down == 0 else 100.0 - 100.0 / (1.0 + _div(self.avg_up, self.avg_down))
+        row['rsi'] = rsi
+
+        if len(self.typical) == CCI_WINDOW:
+            typical = list(self.typical)
+            mean = sum(typical) / CCI_WINDOW
+            mad = sum(abs(x - mean) for x in typical) / CCI_WINDOW
+            row['cci'] = _div(tp - _window_mean(typical), 0.015 * mad)
+        else:
+            row['cci'] = math.nan
+
+        # 3. VOLATİLİTE: Bollinger, ATR
+        if len(closes) >= 20:
+            window = closes[-20:]
+            mavg = _window_mean(window)
+            mstd = 0.0 if min(window) == max(window) else math.sqrt(sum((x - mavg) ** 2 for x in window) / 20)
+            row['bb_high'], row['bb_low'] = mavg + 2 * mstd, mavg - 2 * mstd
+        else:
+            row['bb_high'] = row['bb_low'] = math.nan
+        row['bb_width'] = (row['bb_high'] - row['bb_low']) / c
+
+        tr = h - l if math.isnan(prev_close) else max(h - l, abs(h - prev_close), abs(l - prev_close))
+        if self.count < ATR_WINDOW:
+            self.tr_sum += tr
+        elif self.count == ATR_WINDOW:
+            self.atr = (self.tr_sum + tr) / ATR_WINDOW
+        else:
+            self.atr = (1 - 1.0 / ATR_WINDOW) * self.atr + tr / ATR_WINDOW
+        row['atr'] = self.atr
+
+        # 4. HACİM: OBV, VWAP
+        self.obv += -v if c < prev_close else v
+        row['obv'] = self.obv
+        if len(self.volumes) == VWAP_WINDOW:
+            volumes = list(self.volumes)
+            total_volume = VWAP_WINDOW * volumes[0] if min(volumes) == max(volumes) else sum(volumes)
+            row['vwap'] = _div(sum(self.typical_volume), total_volume)
+        else:
+            row['vwap'] = math.nan
+
+        # 5. LAG ÖZELLİKLERİ
+        if self.use_lags:
+            row['lag_close_1'] = prev_close
+            row['lag_close_2'] = closes[-3] if len(closes) >= 3 else math.nan
+            row['lag_close_5'] = closes[-6] if len(closes) >= 6 else math.nan
+            row['lag_vol_1'] = self.prev_volume
+            row['lag_rsi_1'] = self.prev_rsi
+            ratio = _div(c, prev_close)
+            row['pct_change'] = ratio - 1.0
+            row['log_return'] = math.log(ratio) if ratio > 0 else (-math.inf if ratio == 0 else math.nan)
+        self.prev_volume, self.prev_rsi = v, rsi
+
+        raw = {col: bar[col] for col in self.raw_columns if col in bar}
+        if date is not None:
+            raw['Date'] = date
+            self.last_date = date
+        self.last_row = {**raw, **row}
+        return self.last_row
+
+    def copy(self) -> "FeatureState":
+        return FeatureState.from_dict(self.to_dict())
+
+    # --- KONTROL NOKTASI ---
+    def to_dict(self) -> dict:
+        """JSON'a yazılabilir durum."""
+        last_row = None
+        if self.last_row is not None:
+            last_row = {k: (v.isoformat() if isinstance(v, pd.Timestamp) else
+                            v.item() if isinstance(v, np.generic) else v)
+                        for k, v in self.last_row.items()}
+        return {
+            "version": STATE_VERSION,
+            "use_lags": self.use_lags,
+            "raw_columns": self.raw_columns,
+            "count": self.count,
+            "closes": list(self.closes),
+            "typical": list(self.typical),
+            "typical_volume": list(self.typical_volume),
+            "volumes": list(self.volumes),
+            "ema_fast": self.ema_fast,
+            "ema_slow": self.ema_slow,
+            "macd_signal": self.macd_signal,
+            "macd_count": self.macd_count,
+            "avg_up": self.avg_up,
+            "avg_down": self.avg_down,
+            "atr": self.atr,
+            "tr_sum": self.tr_sum,
+            "obv": self.obv,
+            "prev_volume": self.prev_volume,
+            "prev_rsi": self.prev_rsi,
+            "last_date": self.last_date.isoformat() if self.last_date is not None else None,
+            "last_row": last_row,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FeatureState":
+        if data.get("version") != STATE_VERSION:
+            raise ValueError(f"Desteklenmeyen özellik durumu sürümü: {data.get('version')}")
+        state = cls(data["use_lags"], raw_columns=data["raw_columns"])
+        state.closes.extend(data["closes"])
+        state.typical.extend(data["typical"])
+        state.typical_volume.extend(data["typical_volume"])
+        state.volumes.extend(data["volumes"])
+        for key in ("count", "ema_fast", "ema_slow", "macd_signal", "macd_count", "avg_up", "avg_down",
+                    "atr", "tr_sum", "obv", "prev_volume", "prev_rsi"):
+            setattr(state, key, data[key])
+        state.last_date = pd.Timestamp(data["last_date"]) if data["last_date"] else None
+        if data["last_row"] is not None:
+            state.last_row = dict(data["last_row"])
+            if state.last_row.get('Date') is not None:
+                state.last_row['Date'] = pd.Timestamp(state.last_row['Date'])
+        return state
+
+    def feature_columns(self):
+        return INDICATOR_COLUMNS + (LAG_COLUMNS if self.use_lags else [])
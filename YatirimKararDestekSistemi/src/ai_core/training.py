@@ -0,0 +1,139 @@
+# src/ai_core/training.py
+# Hisse evrenini (universe) süreç havuzunda paralel eğiten orkestratör.
+# NOT: Bu modülün üst seviye import'ları bilerek hafif tutuldu. İşçi süreçler (spawn) modülü
+# içe aktarırken numpy/xgboost/Stan yüklenmeden önce thread ortam değişkenleri ayarlanabilsin.
+
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Her işçi süreçte thread sayısını sınırlayan ortam değişkenleri.
+# N işçi x M çekirdek thread'i = aşırı abonelik (oversubscription) olmasın diye.
+THREAD_ENV_VARS = [
+    "OMP_NUM_THREADS",        # XGBoost (OpenMP), numpy/scipy (OpenBLAS/MKL)
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "STAN_NUM_THREADS",       # Prophet -> cmdstan
+]
+
+# İşçi süreç başına tek AIEngine (modeller/özellik hesaplayıcı her görevde yeniden kurulmaz)
+_worker_engine = None
+
+
+def default_workers(threads_per_worker: int = 1) -> int:
+    """Çekirdek sayısına göre varsayılan işçi sayısı."""
+    return max(1, (os.cpu_count() or 1) // max(1, threads_per_worker))
+
+
+def _init_worker(config: dict, threads_per_worker: int) -> None:
+    """İşçi süreç başlatıcısı: thread limitlerini ayarlar, süreç başına AIEngine kurar."""
+    global _worker_engine
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads_per_worker)
+
+    # Ağır kütüphaneler ortam değişkenleri ayarlandıktan SONRA yüklenir
+    from threadpoolctl import threadpool_limits
+    from src.ai_core.data_processor import DataProcessor
+    from src.ai_core.engine import AIEngine
+    from src.ai_core.feature_store import FeatureStore
+
+    # Zaten yüklenmiş BLAS/OpenMP havuzları için de (fork ile başlatılan ortamlar) sınır koy
+    threadpool_limits(threads_per_worker)
+
+    processor = DataProcessor(raw_data_dir=config["raw_data_dir"], store=config["store"],
+                              provider=config.get("provider"))
+    xgb_params = dict(config.get("xgb_params") or {})
+    xgb_params["n_jobs"] = threads_per_worker
+    feature_store = FeatureStore(config["feature_store_dir"]) if config.get("feature_store_dir") else None
+    # Modeller işçide sırayla eğitilir: Eşzamanlı eğitim (XGBoost, trend, GARCH, çok ufuklu) her işçide
+    # 3-4 thread daha açar ve threads_per_worker sınırını aşırı abonelikle bozardı. Paralellik süreçlerdedir.
+    _worker_engine = AIEngine(models_dir=config["models_dir"], processor=processor,
+                              xgb_params=xgb_params, parallel_fit=False,
+                              max_staleness_days=config.get("max_staleness_days", 7),
+                              feature_store=feature_store,
+                              trend_model=config.get("trend_model", "prophet"),
+                              horizons=config.get("horizons"))
+
+
+def _train_symbol(symbol: str, only_stale: bool) -> dict:
+    """Tek hisseyi işçi süreçte eğitir. Hata fırlatmaz; sonucu sözlük olarak döner."""
+    engine = _worker_engine
+    started = time.perf_counter()
+    result = {"symbol": symbol, "status": "failed", "seconds": 0.0, "rows": 0,
+              "last_date": None, "reason": None, "error": None}
+    try:
+        # Fiyatlar ana süreçte toplu güncellendi; burada sadece depodan okunur
+        df = engine.processor.load_data(symbol, refresh=False)
+        if df is None or df.empty:
+            raise ValueError("Fiyat verisi yok")
+        result["rows"] = int(len(df))
+        result["last_date"] = str(df['Date'].iloc[-1].date())
+
+        features = engine._model_features(df)
+        reason = engine.registry.staleness(engine.registry.read_meta(symbol), df, features)
+        if only_stale and reason is None:
+            result["status"] = "skipped"
+        else:
+            result["reason"] = reason
+            engine._train_bundle(symbol, df)   # İşçide bellek havuzu kullanılmaz
+            result["status"] = "trained"
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = round(time.perf_counter() - started, 2)
+    return result
+
+
+def train_universe(symbols, config: dict, max_workers: int = None, threads_per_worker: int = 1,
+                   only_stale: bool = True, verbose: bool = True):
+    """
+    Hisseleri ProcessPoolExecutor ile paralel eğitir (CPU-bound iş, GIL'e takılmaz).
+
+    config: İşçilerde AIEngine kurmak için gereken, pickle edilebilir ayarlar:
+        models_dir, raw_data_dir, store (PriceStore), provider (opsiyonel), feature_store_dir (opsiyonel),
+        xgb_params (opsiyonel), max_staleness_days (opsiyonel), trend_model (opsiyonel),
+        horizons (opsiyonel)
+    threads_per_worker: İşçi başına XGBoost n_jobs / OpenMP / BLAS / Stan thread sayısı.
+    only_stale: True ise kaydı güncel olan hisseler atlanır (status="skipped").
+
+    Modeller işçilerde doğrudan ModelRegistry'ye yazılır. Bir hissenin hatası diğerlerini durdurmaz.
+    Returns: symbol, status (trained/skipped/failed), seconds, rows, last_date, reason, error
+             sütunlu DataFrame.
+    """
+    import pandas as pd
+
+    symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+    max_workers = max_workers or default_workers(threads_per_worker)
+    max_workers = max(1, min(max_workers, len(symbols) or 1))
+    if verbose:
+        print(f"🚀 {len(symbols)} hisse eğitiliyor ({max_workers} süreç x {threads_per_worker} thread)...")
+
+    started = time.perf_counter()
+    results = []
+    # spawn: İşçi, ebeveynin yüklü thread havuzlarını miras almaz; ortam değişkenleri etkili olur
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                             initializer=_init_worker, initargs=(config, threads_per_worker)) as pool:
+        futures = {pool.submit(_train_symbol, symbol, only_stale): symbol for symbol in symbols}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                # İşçi sürecin kendisi çöktüyse (BrokenProcessPool vb.)
+                result = {"symbol": futures[future], "status": "failed", "seconds": None,
+                          "error": f"{type(e).__name__}: {e}"}
+            results.append(result)
+            if verbose:
+                icon = {"trained": "✅", "skipped": "⏭️"}.get(result["status"], "❌")
+                detail = result.get("error") or result.get("reason") or ""
+                print(f"   {icon} {result['symbol']:<8} {result['status']:<8} "
+                      f"{result['seconds'] if result['seconds'] is not None else '-'} sn {detail}")
+
+    columns = ["symbol", "status", "seconds", "rows", "last_date", "reason", "error"]
+    report = pd.DataFrame(results, columns=columns).sort_values("symbol").reset_index(drop=True)
+    if verbose:
+        counts = report["status"].value_counts()
+        print(f"✅ Eğitim bitti: {counts.get('trained', 0)} eğitildi, {counts.get('skipped', 0)} atlandı, "
+              f"{counts.get('failed', 0)} hatalı ({time.perf_counter() - started:.1f} sn).")
+    return report
@@ -0,0 +1,140 @@
+# src/ai_core/trend.py
+# Prophet'in trend + mevsimsellik ayrışımının hafif karşılığı: Parçalı doğrusal trend ve Fourier
+# mevsimselliği tek bir cezalı (ridge) en küçük kareler çözümüyle kestirilir (Stan/MCMC yok).
+
+from typing import Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+# Prophet varsayılanları: {isim: (periyot (gün), Fourier derecesi)}.
+# Günlük mevsimsellik alınmaz: Günlük barların saati sabit olduğundan terimleri sabite eşittir.
+DEFAULT_SEASONALITIES = {"yearly": (365.25, 10), "weekly": (7.0, 3)}
+
+# Kırılma noktaları geçmişin ilk %80'ine eşit aralıkla yerleştirilir (Prophet: n_changepoints, changepoint_range)
+N_CHANGEPOINTS = 25
+CHANGEPOINT_RANGE = 0.8
+
+# Gürültü varyansı bilinmediği için ceza katsayıları birkaç kez yeniden kestirilen sigma ile güncellenir
+SIGMA_ITERATIONS = 3
+
+
+def fourier_features(dates: pd.DatetimeIndex, period: float, order: int) -> np.ndarray:
+    """Prophet ile aynı Fourier terimleri: [sin(2πkt/P), cos(2πkt/P)] k=1..order, t: 1970'ten beri gün."""
+    t = dates.to_numpy(dtype="datetime64[ns]").astype(np.int64) / (86400 * 1e9)
+    x = 2 * np.pi * np.arange(1, order + 1) * t[:, None] / period
+    return np.hstack([np.sin(x), np.cos(x)])
+
+
+class PiecewiseTrend:
+    """
+    y(t) = (k + a(t)·δ)·t + (m + a(t)·γ) + Σ mevsimsellik  -> tek doğrusal sistem:
+        y ≈ k·t + m + Σ_j δ_j·(t - s_j)+ + X_fourier·β
+
+    Prophet'in MAP kestirimine denk cezalar (σ: gürültü std, y ve t Prophet gibi ölçeklenir):
+    - δ (kırılma noktası eğim değişimleri): Laplace(τ) önceli yerine aynı varyanslı normal önsel,
+      λ = σ² / (2τ²), τ = changepoint_prior_scale. Laplace'ın seyrekliği yok; eğim değişimleri küçülür
+      ama tam sıfırlanmaz.
+    - β (mevsimsellik): normal(0, seasonality_prior_scale), k ve m: normal(0, 5).
+    Tahmin aralığı analitiktir: Gürültü + Prophet'in gelecekte rastgele kırılma üretimiyle aynı
+    oranda/ölçekte kırılmaların trend varyansı (örnekleme yok).
+    """
+    def __init__(self, n_changepoints: int = N_CHANGEPOINTS, changepoint_range: float = CHANGEPOINT_RANGE,
+                 changepoint_prior_scale: float = 0.05, seasonality_prior_scale: float = 10.0,
+                 seasonalities: Optional[Dict[str, Tuple[float, int]]] = None, interval_width: float = 0.8):
+        self.n_changepoints = n_changepoints
+        self.changepoint_range = changepoint_range
+        self.changepoint_prior_scale = changepoint_prior_scale
+        self.seasonality_prior_scale = seasonality_prior_scale
+        self.seasonalities = dict(DEFAULT_SEASONALITIES if seasonalities is None else seasonalities)
+        self.interval_width = interval_width
+        # Eğitimde dolan durum
+        self.start = None
+        self.t_scale = None
+        self.y_scale = None
+        self.changepoints_t = None
+        self.coef = None
+        self.sigma = None
+        self.last_date = None
+
+    # --- TASARIM MATRİSİ ---
+    def _t(self, dates: pd.DatetimeIndex) -> np.ndarray:
+        return (dates - self.start).total_seconds().to_numpy() / self.t_scale
+
+    def _design(self, dates: pd.DatetimeIndex) -> np.ndarray:
+        t = self._t(dates)
+        columns = [t[:, None], np.ones((len(t), 1)), np.maximum(t[:, None] - self.changepoints_t, 0.0)]
+        columns += [fourier_features(dates, period, order) for period, order in self.seasonalities.values()]
+        return np.hstack(columns)
+
+    def _penalty(self, sigma: float) -> np.ndarray:
+        """Köşegen ridge cezası (k, m, δ..., β...)."""
+        n_season = sum(2 * order for _, order in self.seasonalities.values())
+        return np.concatenate([
+            np.full(2, sigma ** 2 / 5.0 ** 2),
+            np.full(len(self.changepoints_t), sigma ** 2 / (2 * self.changepoint_prior_scale ** 2)),
+            np.full(n_season, sigma ** 2 / self.seasonality_prior_scale ** 2),
+        ])
+
+    # --- EĞİTİM ---
+    def fit(self, dates, y) -> "PiecewiseTrend":
+        dates = pd.DatetimeIndex(dates)
+        y = np.asarray(y, dtype=np.float64)
+        if len(y) < 3:
+            raise ValueError("Trend modeli için en az 3 gözlem gerekir.")
+
+        self.start, self.last_date = dates[0], dates[-1]
+        self.t_scale = max((dates[-1] - dates[0]).total_seconds(), 1.0)
+        self.y_scale = float(np.abs(y).max()) or 1.0
+        # Prophet ile aynı yerleşim: İlk %80'lik satırlara eşit aralıklı satır indeksleri (ilk satır hariç)
+        hist = int(np.floor(len(y) * self.changepoint_range))
+        n_cp = min(self.n_changepoints, max(hist - 1, 0))
+        rows = np.linspace(0, hist - 1, n_cp + 1).round().astype(int)[1:] if n_cp else np.array([], dtype=int)
+        self.changepoints_t = self._t(dates[rows]) if n_cp else np.array([])
+
+        X = self._design(dates)
+        target = y / self.y_scale
+        XtX, Xty = X.T @ X, X.T @ target
+        sigma = 0.5 * target.std() or 1e-3
+        for _ in range(SIGMA_ITERATIONS):
+            coef = np.linalg.solve(XtX + np.diag(self._penalty(sigma)), Xty)
+            sigma = max(float(np.sqrt(np.mean((target - X @ coef) ** 2))), 1e-8)
+        self.coef, self.sigma = coef, sigma
+        return self
+
+    # --- TAHMİN ---
+    def predict(self, dates) -> pd.DataFrame:
+        """Verilen tarihler için ds, yhat, yhat_lower, yhat_upper (Prophet çıktı sütunları)."""
+        if self.coef is None:
+            raise Exception("Model eğitilmeden tahmin yapılamaz.")
+        dates = pd.DatetimeIndex(dates)
+        yhat = self._design(dates) @ self.coef
+
+        # Gelecekteki trend belirsizliği: Birim t başına S kırılma, ölçek b = ortalama |δ|.
+        # h kadar ilerideki noktada Var = S·2b²·h³/3 (Poisson sayıda Laplace eğim değişimi)
+        deltas = self.coef[2:2 + len(self.changepoints_t)]
+        rate, scale = len(deltas), float(np.mean(np.abs(deltas))) if len(deltas) else 0.0
+        h = np.maximum(self._t(dates) - 1.0, 0.0)
+        sd = np.sqrt(self.sigma ** 2 + rate * 2 * scale ** 2 * h ** 3 / 3)
+        z = norm.ppf(0.5 + self.interval_width / 2)
+        return pd.DataFrame({
+            "ds": dates,
+            "yhat": yhat * self.y_scale,
+            "yhat_lower": (yhat - z * sd) * self.y_scale,
+            "yhat_upper": (yhat + z * sd) * self.y_scale,
+        })
+
+    def future_dates(self, steps: int, freq: str = "B") -> pd.DatetimeIndex:
+        """Son eğitim tarihinden sonraki 'steps' tarih."""
+        offset = pd.tseries.frequencies.to_offset(freq)
+        return pd.date_range(self.last_date + offset, periods=steps, freq=offset)
+
+    # --- SERİLEŞTİRME ---
+    def to_dict(self) -> dict:
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "PiecewiseTrend":
+        obj = cls.__new__(cls)
+        obj.__dict__.update(state)
+        return obj
@@ -0,0 +1,267 @@
+# src/ai_core/volatility.py
+# GARCH(1,1) / EGARCH(1,1) volatilite motoru: Sıcak başlangıçlı (warm-start) yeniden eğitim,
+# bar başına O(1) varyans güncellemesi ve tüm evren için vektörel NumPy filtresi.
+#
+# Formüller 'arch' kütüphanesiyle aynıdır (sabit ortalama, normal dağılım):
+#   GARCH : s2[t] = omega + alpha * e[t-1]^2 + beta * s2[t-1]
+#   EGARCH: ln s2[t] = omega + alpha * (|z[t-1]| - sqrt(2/pi)) + gamma * z[t-1] + beta * ln s2[t-1],  z = e / s
+# Başlangıç (backcast): Ortalamadan arındırılmış ilk 75 getirinin karesinin 0.94 ağırlıklı ortalaması
+# (EGARCH'ta logaritması). arch bunu tahmin edilen mu ile değil örneklem ortalamasıyla hesaplar.
+# arch'ın varyans sınır (var_bounds) düzeltmesi uygulanmaz; normal verilerde devreye girmez.
+
+import math
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+SQRT2_OV_PI = math.sqrt(2.0 / math.pi)
+BACKCAST_WINDOW = 75
+BACKCAST_DECAY = 0.94
+
+# Desteklenen modeller ve arch parametre adları
+VOL_PARAMETERS = {
+    "GARCH": ["omega", "alpha[1]", "beta[1]"],
+    "EGARCH": ["omega", "alpha[1]", "gamma[1]", "beta[1]"],
+}
+
+
+def variance_backcast(resids: np.ndarray) -> np.ndarray:
+    """
+    arch GARCH.backcast: İlk 75 değerin karesinin üstel ağırlıklı ortalaması (0. eksen boyunca).
+    resids örneklem ortalamasından arındırılmış olmalıdır (bkz. _demeaned_backcast).
+    """
+    tau = min(BACKCAST_WINDOW, len(resids))
+    w = BACKCAST_DECAY ** np.arange(tau)
+    w = w / w.sum()
+    return np.tensordot(w, resids[:tau] ** 2, axes=(0, 0))
+
+
+def _demeaned_backcast(resids: np.ndarray) -> float:
+    """Tek serinin (NaN'siz) arch ile aynı başlangıç varyansı: e - mean(e) = getiri - örneklem ortalaması."""
+    return float(variance_backcast(resids - resids.mean()))
+
+
+def _garch_1d(resids: np.ndarray, omega: float, alpha: float, beta: float, backcast: float) -> np.ndarray:
+    # s2[t] = x[t] + beta * s2[t-1];  x[0] = omega + alpha * bc,  x[t] = omega + alpha * e[t-1]^2
+    x = np.empty(len(resids))
+    x[0] = omega + alpha * backcast
+    x[1:] = omega + alpha * resids[:-1] ** 2
+    sigma2, _ = lfilter([1.0], [1.0, -beta], x, zi=[beta * backcast])
+    return sigma2
+
+
+def garch_filter(resids: np.ndarray, omega, alpha, beta, backcast=None) -> np.ndarray:
+    """
+    GARCH(1,1) koşullu varyans serisi. resids (n,) veya (n, k) (tarih x hisse);
+    parametreler skaler veya hisse başına (k,) dizi. NaN satırlar (işlem yok) atlanır, sonuç NaN olur.
+    Özyineleme C seviyesinde (lfilter) çalışır: Hisse başına tek çağrı.
+    """
+    resids = np.asarray(resids, dtype=np.float64)
+    if resids.ndim == 1:
+        out = np.full(resids.shape, np.nan)
+        valid = ~np.isnan(resids)
+        if valid.any():
+            e = resids[valid]
+            bc = _demeaned_backcast(e) if backcast is None else backcast
+            out[valid] = _garch_1d(e, float(omega), float(alpha), float(beta), float(bc))
+        return out
+
+    k = resids.shape[1]
+    omega, alpha, beta = (np.broadcast_to(np.asarray(v, dtype=np.float64), (k,)) for v in (omega, alpha, beta))
+    backcast = None if backcast is None else np.broadcast_to(np.asarray(backcast, dtype=np.float64), (k,))
+    out = np.full(resids.shape, np.nan)
+    for j in range(k):
+        out[:, j] = garch_filter(resids[:, j], omega[j], alpha[j], beta[j],
+                                 None if backcast is None else backcast[j])
+    return out
+
+
+def egarch_filter(resids: np.ndarray, omega, alpha, gamma, beta, backcast=None) -> np.ndarray:
+    """
+    EGARCH(1,1) koşullu varyans serisi (doğrusal olmayan özyineleme). Zaman ekseninde tek döngü,
+    her adımda tüm hisseler birlikte (vektörel) güncellenir. NaN satırlar atlanır.
+    """
+    resids = np.asarray(resids, dtype=np.float64)
+    squeeze = resids.ndim == 1
+    e = resids.reshape(len(resids), -1)
+    n, k = e.shape
+    omega, alpha, gamma, beta = (np.broadcast_to(np.asarray(v, dtype=np.float64), (k,))
+                                 for v in (omega, alpha, gamma, beta))
+
+    valid = ~np.isnan(e)
+    if backcast is None:
+        # Hisse başına kendi geçerli satırlarından
+        backcast = np.full(k, np.nan)
+        for j in range(k):
+            if valid[:, j].any():
+                backcast[j] = math.log(_demeaned_backcast(e[valid[:, j], j]))
+    backcast = np.broadcast_to(np.asarray(backcast, dtype=np.float64), (k,))
+
+    out = np.full((n, k), np.nan)
+    ln_prev = np.full(k, np.nan)
+    z_prev = np.zeros(k)
+    started = np.zeros(k, dtype=bool)
+    for t in range(n):
+        row_valid = valid[t]
+        if not row_valid.any():
+            continue
+        ln = np.where(started,
+                      omega + alpha * (np.abs(z_prev) - SQRT2_OV_PI) + gamma * z_prev + beta * ln_prev,
+                      omega + beta * backcast)
+        sigma2 = np.exp(ln)
+        out[t, row_valid] = sigma2[row_valid]
+        ln_prev = np.where(row_valid, ln, ln_prev)
+        z_prev = np.where(row_valid, np.nan_to_num(e[t]) / np.sqrt(sigma2), z_prev)
+        started |= row_valid
+    return out[:, 0] if squeeze else out
+
+
+def universe_volatility(returns: pd.DataFrame, params: pd.DataFrame, vol: str = "GARCH") -> pd.Series:
+    """
+    Evrenin bir sonraki gün volatilitesi (yüzde getiri std'si) tek dizide.
+    returns: (tarih x hisse) yüzde getiriler (100 * pct_change). params: index hisse, sütunlar
+    mu, omega, alpha[1], beta[1] (EGARCH için gamma[1]), Ör. GarchModel.parameters satırları.
+    """
+    vol = vol.upper()
+    params = params.reindex(returns.columns)
+    resids = returns.to_numpy(dtype=np.float64) - params["mu"].to_numpy()
+    if vol == "GARCH":
+        omega, alpha, beta = (params[c].to_numpy() for c in VOL_PARAMETERS["GARCH"])
+        sigma2 = garch_filter(resids, omega, alpha, beta)
+    elif vol == "EGARCH":
+        omega, alpha, gamma, beta = (params[c].to_numpy() for c in VOL_PARAMETERS["EGARCH"])
+        sigma2 = egarch_filter(resids, omega, alpha, gamma, beta)
+    else:
+        raise ValueError(f"Bilinmeyen volatilite modeli: {vol}. Seçenekler: {list(VOL_PARAMETERS)}")
+
+    # Son gözlemden bir adım sonrası: Her hissenin son geçerli satırından devam edilir
+    valid = ~np.isnan(sigma2)
+    last = len(sigma2) - 1 - np.argmax(valid[::-1], axis=0)
+    cols = np.arange(sigma2.shape[1])
+    s2, e = sigma2[last, cols], resids[last, cols]
+    if vol == "EGARCH":
+        z = e / np.sqrt(s2)
+        next_sigma2 = np.exp(omega + alpha * (np.abs(z) - SQRT2_OV_PI) + gamma * z + beta * np.log(s2))
+    else:
+        next_sigma2 = omega + alpha * e ** 2 + beta * s2
+    next_sigma2[~valid.any(axis=0)] = np.nan
+    return pd.Series(np.sqrt(next_sigma2), index=returns.columns, name="predicted_volatility")
+
+
+class GarchState:
+    """
+    Eğitilmiş GARCH/EGARCH modelinin özyineleme durumu: parametreler, son koşullu varyans ve son kalıntı.
+    update(ret) yeni getiriyi O(1) işler; forecast(steps) arch.forecast ile aynı analitik tahmini verir
+    (EGARCH'ta 2+ adım için beklenen değer yaklaşımı: E|z| = sqrt(2/pi), E[z] = 0).
+    """
+    def __init__(self, vol: str = "GARCH"):
+        self.vol = vol.upper()
+        self.mu = 0.0
+        self.omega = 0.0
+        self.alpha = 0.0
+        self.gamma = 0.0
+        self.beta = 0.0
+        self.sigma2 = math.nan      # Son gözlemlenen barın koşullu varyansı
+        self.resid = math.nan       # Son gözlemlenen barın kalıntısı (getiri - mu)
+        self.last_close = None
+        self.last_date = None
+
+    def set_params(self, params: Dict[str, float]) -> None:
+        self.mu = float(params.get("mu", 0.0))
+        self.omega = float(params["omega"])
+        self.alpha = float(params["alpha[1]"])
+        self.gamma = float(params.get("gamma[1]", 0.0))
+        self.beta = float(params["beta[1]"])
+
+    @classmethod
+    def from_result(cls, res, vol: str = "GARCH", last_close: float = None, last_date=None) -> "GarchState":
+        """
+        arch fit sonucundan (ARCHModelResult) durumu kurar. Durum tek gecikmeli özyinelemedir:
+        (1,1) dışındaki dereceler (Ör. alpha[2], beta[2]) O(1) izlenemez, ValueError fırlatılır.
+        """
+        lags = [name for name in res.params.index if name.endswith("]") and not name.endswith("[1]")]
+        if lags:
+            raise ValueError(f"GarchState sadece (1,1) derecesini destekler (Fazla gecikmeler: {', '.join(lags)}).")
+        state = cls(vol)
+        state.set_params(res.params.to_dict())
+        state.sigma2 = float(np.asarray(res.conditional_volatility)[-1] ** 2)
+        state.resid = float(np.asarray(res.resid)[-1])
+        state.last_close = last_close
+        state.last_date = last_date
+        return state
+
+    def next_variance(self) -> float:
+        """Bir sonraki barın koşullu varyansı (henüz gözlenmemiş)."""
+        if self.vol == "EGARCH":
+            z = self.resid / math.sqrt(self.sigma2)
+            ln = (self.omega + self.alpha * (abs(z) - SQRT2_OV_PI) + self.gamma * z
+                  + self.beta * math.log(self.sigma2))
+            return math.exp(ln)
+        return self.omega + self.alpha * self.resid ** 2 + self.beta * self.sigma2
+
+    def update(self, ret: float, close: float = None, date=None) -> float:
+        """Yeni yüzde getiriyi işler (O(1)); bu barın koşullu varyansını döndürür."""
+        self.sigma2 = self.next_variance()
+        self.resid = float(ret) - self.mu
+        if close is not None:
+            self.last_close = float(close)
+        if date is not None:
+            self.last_date = date
+        return self.sigma2
+
+    def update_close(self, close: float, date=None) -> float:
+        """Yeni kapanış fiyatını işler (getiri = 100 * (kapanış / önceki kapanış - 1))."""
+        if self.last_close is None:
+            raise ValueError("Önceki kapanış bilinmiyor; update(ret) kullanılmalı.")
+        return self.update(100.0 * (float(close) / self.last_close - 1.0), close=close, date=date)
+
+    def forecast(self, steps: int = 1) -> np.ndarray:
+        """1..steps adım sonrası varyans tahminleri."""
+        out = np.empty(steps)
+        out[0] = self.next_variance()
+        for h in range(1, steps):
+            if self.vol == "EGARCH":
+                out[h] = math.exp(self.omega + self.beta * math.log(out[h - 1]))
+            else:
+                out[h] = self.omega + (self.alpha + self.beta) * out[h - 1]
+        return out
+
+    def copy(self) -> "GarchState":
+        clone = GarchState(self.vol)
+        clone.__dict__.update(self.__dict__)
+        return clone
+
+    def to_dict(self) -> dict:
+        data = dict(self.__dict__)
+        data["last_date"] = None if self.last_date is None else str(pd.Timestamp(self.last_date).date())
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "GarchState":
+        state = cls(data["vol"])
+        state.__dict__.update(data)
+        if state.last_date is not None:
+            state.last_date = pd.Timestamp(state.last_date)
+        return state
+
+
+def fit_garch(returns: pd.Series, vol: str = "GARCH", starting_values: Optional[Dict[str, float]] = None,
+              p: int = 1, q: int = 1):
+    """
+    arch ile GARCH(p,q)/EGARCH(p,q) eğitir (varsayılan (1,1)). starting_values (önceki eğitimin parametreleri,
+    Ör. GarchModel.parameters) verilirse optimizasyon oradan başlar (sıcak başlangıç): Geçmiş
+    birkaç gün uzadığında optimum çok az kayar, iterasyon sayısı belirgin şekilde düşer.
+    """
+    from arch import arch_model
+
+    vol = vol.upper()
+    o = 1 if vol == "EGARCH" else 0
+    model = arch_model(returns, vol="EGARCH" if vol == "EGARCH" else "Garch", p=p, o=o, q=q, dist="Normal")
+    names = ["mu"] + model.volatility.parameter_names()
+    start = None
+    if starting_values and all(n in starting_values for n in names):
+        start = np.array([starting_values[n] for n in names], dtype=np.float64)
+        if not np.all(np.isfinite(start)):
+            start = None
+    return model, model.fit(disp="off", starting_values=start, show_warning=False)
@@ -0,0 +1,77 @@
+# src/data/migrations.py
+# Var olan veritabanlarını modellerdeki yeni şemaya (index vb.) getiren adımlar.
+# create_all() mevcut tablolara index eklemediği için bu adımlar ayrıca çalıştırılır.
+
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session
+from src.data.models import PriceHistory, LatestPrice
+
+
+def dedupe_price_history(connection) -> int:
+    """
+    Aynı (security_id, date) için birden fazla kayıt varsa en yeni (en büyük id) olanı bırakır.
+    UNIQUE index bu temizlik yapılmadan oluşturulamaz. Geriye silinen satır sayısını döner.
+    """
+    if connection.dialect.name == "mysql":
+        # MySQL aynı tabloyu DELETE içindeki alt sorguda okuyamaz, JOIN ile siliyoruz
+        sql = text(
+            "DELETE p1 FROM price_history p1 "
+            "JOIN price_history p2 ON p1.security_id = p2.security_id "
+            "AND p1.date = p2.date AND p1.id < p2.id"
+        )
+    else:
+        sql = text(
+            "DELETE FROM price_history WHERE id NOT IN "
+            "(SELECT MAX(id) FROM price_history GROUP BY security_id, date)"
+        )
+    return connection.execute(sql).rowcount or 0
+
+
+def migrate_price_history_indexes(engine) -> dict:
+    """
+    price_history tablosuna modelde tanımlı index'leri (UNIQUE (security_id, date) ve
+    kapanış fiyatı için kapsayan index) ekler. Tekrar çalıştırmak güvenlidir (idempotent).
+
+    Returns: {"created": [index adları], "existing": [...], "deduplicated": int}
+    """
+    report = {"created": [], "existing": [], "deduplicated": 0}
+    table = PriceHistory.__table__
+
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        if not inspector.has_table(table.name):
+            table.create(bind=connection)
+            report["created"] = sorted(idx.name for idx in table.indexes)
+            return report
+
+        current = {idx["name"] for idx in inspector.get_indexes(table.name)}
+        # Index'ler sırayla eklenir: önce UNIQUE (mükerrer kayıt temizliği gerekebilir)
+        for index in sorted(table.indexes, key=lambda i: not i.unique):
+            if index.name in current:
+                report["existing"].append(index.name)
+                continue
+            if index.unique:
+                report["deduplicated"] += dedupe_price_history(connection)
+            print(f"[BİLGİ] Index oluşturuluyor: {index.name} (Büyük tablolarda birkaç dakika sürebilir)")
+            index.create(bind=connection)
+            report["created"].append(index.name)
+
+    print(f"✅ price_history index taşıma: {len(report['created'])} oluşturuldu, "
+          f"{len(report['existing'])} zaten vardı, {report['deduplicated']} mükerrer kayıt silindi.")
+    return report
+
+
+def backfill_latest_prices(engine) -> int:
+    """
+    latest_prices tablosunu (yoksa oluşturup) price_history'deki son kapanışlarla doldurur.
+    Sonrasında tablo MarketDataService tarafından her fiyat yazımında güncel tutulur.
+    Geriye yazılan satır sayısını döner.
+    """
+    from src.services.latest_prices import LatestPriceService
+
+    LatestPrice.__table__.create(bind=engine, checkfirst=True)
+    with Session(engine) as session:
+        written = LatestPriceService(session).refresh()
+        session.commit()
+    print(f"✅ latest_prices dolduruldu: {written} hisse güncellendi.")
+    return written
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Date, DateTime, ForeignKey, Enum, DECIMAL, Text, Float, Integer
+from sqlalchemy import Column, String, Date, DateTime, ForeignKey, Enum, DECIMAL, Text, Float, Integer, Index
 from sqlalchemy.dialects.mysql import INTEGER, BIGINT
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -45,8 +45,15 @@ class Security(Base):
 # --- 3. FİYAT GEÇMİŞİ ---
 class PriceHistory(Base):
     __tablename__ = 'price_history'
-    
-    id = Column(BIGINT(unsigned=True), primary_key=True)
+    __table_args__ = (
+        # Bir hissenin bir günde tek kaydı olur (upsert'ler bu anahtara göre yapılır)
+        Index('uq_price_security_date', 'security_id', 'date', unique=True),
+        # Kapanış sorguları (son fiyat, tarih aralığı) tabloya hiç gitmeden sadece index'ten okunur
+        Index('ix_price_security_date_close', 'security_id', 'date', 'close_price'),
+    )
+    
+    # SQLite'ta otomatik artan PK sadece INTEGER ile çalışır (toplu insert testleri için)
+    id = Column(BIGINT(unsigned=True).with_variant(Integer, "sqlite"), primary_key=True)
     security_id = Column(INTEGER(unsigned=True), ForeignKey('securities.id'), nullable=False)
     date = Column(Date, nullable=False)
     open_price = Column(DECIMAL(10, 4))
@@ -57,6 +64,21 @@ class PriceHistory(Base):
 
     security = relationship("Security", back_populates="prices")
 
+# --- 3b. SON FİYATLAR (price_history'nin özeti) ---
+class LatestPrice(Base):
+    """
+    Her hissenin en son kapanışı. Fiyat yazan servisler (MarketDataService) aynı transaction
+    içinde günceller; okuyan servisler price_history'de sıralı tarama yapmaz.
+    """
+    __tablename__ = 'latest_prices'
+
+    security_id = Column(INTEGER(unsigned=True), ForeignKey('securities.id'), primary_key=True)
+    date = Column(Date, nullable=False)
+    close_price = Column(DECIMAL(10, 4), nullable=False)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+    security = relationship("Security")
+
 # --- 4. GERÇEK İŞLEMLER (LOG KAYDI) ---
 class Transaction(Base):
     __tablename__ = 'transactions'
@@ -18,13 +18,8 @@ class AnalysisService:
             print(f"🚀 Analiz Başlatılıyor: {symbol}...")
             
             # 1. AI Motorunu Çalıştır (Dosya sisteminden okur, DB'den bağımsızdır)
-            # Eğer CSV yoksa burada hata fırlatır ve catch bloğuna düşer.
-            try:
-                # Önce tahmin etmeyi dene, model yoksa eğitir
-                result = self.engine.predict_next_day(symbol)
-            except:
-                self.engine.train_full_pipeline(symbol)
-                result = self.engine.predict_next_day(symbol)
+            # Kayıtlı model güncelse diskten yüklenir; sadece model yoksa veya bayatsa eğitilir.
+            result = self.engine.predict_next_day(symbol)
             
             # 2. RİSK PROFİLİ KONTROLÜ
             # (Risk yöneticisi sadece hesaplama yapar, DB yazmaz)
@@ -0,0 +1,233 @@
+import os
+import json
+import time
+import random
+import threading
+import itertools
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from src.services.market_providers import MarketDataProvider, get_default_provider
+
+# Sağlayıcı sembol için boş/eksik sonuç döndürdüğünde manifest'e yazılan hata
+NO_DATA = "Veri bulunamadı"
+
+
+class TokenBucket:
+    """
+    Token Bucket hız sınırlayıcı (Rate Limiter).
+    Saniyede 'rate' kadar jeton dolar, en fazla 'capacity' kadar birikir.
+    Her istek bir jeton harcar; jeton yoksa bekler. Thread-safe'tir.
+    """
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class BulkDownloader:
+    """
+    Tüm BIST evreni için paralel, hız sınırlı ve kaldığı yerden devam edebilen veri indirici.
+
+    - Semboller 'batch_size'lık gruplar halinde TEK istekte çekilir (multi-ticker download).
+    - Gruplar 'max_workers' sınırlı bir thread havuzunda paralel işlenir.
+    - Her istek Token Bucket'tan jeton alır (Yahoo'yu boğmamak için).
+    - Hata alan grup üstel bekleme (exponential backoff) ile tekrar denenir.
+    - Her grup bitince durum manifest (checkpoint) dosyasına yazılır; çökme sonrası
+      aynı manifest ile başlatılırsa tamamlanan semboller atlanır.
+
+    provider: MarketDataProvider (veya bulk_history(symbols, start, end, period) metodu olan
+    herhangi bir nesne). ReplayProvider ya da sahte (fake) bir sağlayıcı ile ağsız test edilebilir.
+    """
+    def __init__(self, provider: MarketDataProvider = None, max_workers: int = 4, batch_size: int = 20,
+                 rate_per_sec: float = 2.0, burst: int = 2, max_retries: int = 3,
+                 backoff_base: float = 1.0, checkpoint_path: Optional[str] = None):
+        self.provider = provider or get_default_provider()
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.bucket = TokenBucket(rate_per_sec, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.checkpoint_path = checkpoint_path
+        self._lock = threading.Lock()
+        self._timed_out = set()          # Vazgeçilen, hâlâ çalışan grupların anahtarları: (çağrı no, grup no)
+        self._call_seq = itertools.count()
+        self.manifest = self._load_manifest()
+
+    # --- CHECKPOINT (MANIFEST) ---
+    def _load_manifest(self) -> dict:
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {"completed": {}, "failed": {}}
+
+    def _save_manifest(self) -> None:
+        if not self.checkpoint_path:
+            return
+        folder = os.path.dirname(self.checkpoint_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def reset_checkpoint(self) -> None:
+        """Manifest'i sıfırlar (Bir sonraki çalıştırma tüm sembolleri baştan çeker)."""
+        self.manifest = {"completed": {}, "failed": {}}
+        self._save_manifest()
+
+    # --- İNDİRME ---
+    def _fetch_with_retry(self, batch: List[str], start, end, period) -> Dict[str, pd.DataFrame]:
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                return self.provider.bulk_history(batch, start=start, end=end, period=period)
+            except Exception as e:
+                last_error = e
+                if attempt < self.max_retries:
+                    # Üstel bekleme + küçük rastgelelik (Tüm işçiler aynı anda tekrar denemesin)
+                    time.sleep(self.backoff_base * (2 ** attempt) + random.uniform(0, self.backoff_base))
+        raise last_error
+
+    def _process_batch(self, batch, start, end, period, on_result, key=None, started=None) -> Dict[str, pd.DataFrame]:
+        if started is not None:
+            started[key] = time.monotonic()
+        try:
+            frames = self._fetch_with_retry(batch, start, end, period)
+        except Exception as e:
+            with self._lock:
+                if key in self._timed_out:
+                    self._timed_out.discard(key)
+                    return {}
+                for symbol in batch:
+                    self.manifest["failed"][symbol] = str(e)
+                self._save_manifest()
+            return {}
+
+        # Geri çağrı ve manifest yazımı kilit altında, her sembolden önce zaman aşımı kontrolüyle:
+        # Vazgeçilen grubun geç gelen sonucu işlenmez ve hiçbir sembol hem "zaman aşımı" hem "tamamlandı" olmaz.
+        collected = {}
+        for symbol in batch:
+            with self._lock:
+                if key in self._timed_out:
+                    self._timed_out.discard(key)
+                    self._save_manifest()
+                    return {}
+                frame = frames.get(symbol)
+                if frame is None or frame.empty:
+                    self.manifest["failed"][symbol] = NO_DATA
+                    continue
+                try:
+                    if on_result:
+                        on_result(symbol, frame)
+                    else:
+                        collected[symbol] = frame
+                    self.manifest["completed"][symbol] = {
+                        "rows": int(len(frame)),
+                        "last_date": str(pd.Timestamp(frame.index[-1]).date()),
+                    }
+                    self.manifest["failed"].pop(symbol, None)
+                except Exception as e:
+                    self.manifest["failed"][symbol] = str(e)
+
+        with self._lock:
+            # Son sembolden sonra zaman aşımına uğradıysa anahtar burada bırakılır
+            self._timed_out.discard(key)
+            self._save_manifest()
+        return collected
+
+    def download(self, symbols: List[str], start=None, end=None, period: str = None,
+                 on_result: Optional[Callable[[str, pd.DataFrame], None]] = None,
+                 resume: bool = True, timeout: Optional[float] = None, verbose: bool = True,
+                 symbol_timeout: Optional[float] = None) -> dict:
+        """
+        Sembol listesini indirir.
+
+        Args:
+            start/end veya period: yf.download ile aynı anlamda tarih aralığı.
+            on_result: Her sembol indiğinde çağrılır (sembol, DataFrame). Verilirse veri
+                       bellekte biriktirilmez, doğrudan kaydedilebilir (Çökmeye dayanıklı).
+                       İndiricinin kilidi altında çağrılır: Zaman aşımından sonra çağrılmaz, aynı anda tek çağrı.
+            resume: True ise manifest'te tamamlanmış görünen semboller atlanır (checkpoint_path gerekir).
+            timeout: Bir grubun (TEK istek) indirilmesi için azami süre (sn); grup içindeki sembollere
+                     ayrı süre tanınmaz. Süreyi aşan grubun TÜM sembolleri "Zaman aşımı" hatasıyla
+                     raporlanır, beklenmez.
+            symbol_timeout: timeout yerine sembol başına süre (sn); grubun süresi
+                     symbol_timeout x gruptaki sembol sayısıdır, gruplar yine tek istekte çekilir.
+            verbose: False ise özet satırı yazdırılmaz (arka plan işleri için).
+
+        Returns:
+            {"data": {sembol: DataFrame}, "completed": [...], "failed": {sembol: hata},
+             "skipped": [...], "elapsed": saniye}
+        """
+        t0 = time.perf_counter()
+        if not self.checkpoint_path:
+            # Checkpoint dosyası yoksa her çağrı bağımsızdır, önceki çağrının durumu taşınmaz
+            self.manifest = {"completed": {}, "failed": {}}
+        symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+        skipped = [s for s in symbols if resume and s in self.manifest["completed"]]
+        pending = [s for s in symbols if s not in skipped]
+        batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        # Grup başına azami süre (timeout sabit, symbol_timeout grup boyutuyla ölçeklenir)
+        limits = [timeout or (symbol_timeout * len(b) if symbol_timeout else None) for b in batches]
+
+        data = {}
+        call_no = next(self._call_seq)
+        started = {}   # grup anahtarı -> işlemeye başlama anı (kuyrukta bekleme süresi sayılmaz)
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            futures = {pool.submit(self._process_batch, b, start, end, period, on_result,
+                                   (call_no, i), started): (call_no, i)
+                       for i, b in enumerate(batches)}
+            waiting = set(futures)
+            while waiting:
+                done, waiting = wait(waiting, timeout=0.1 if any(limits) else None, return_when=FIRST_COMPLETED)
+                for future in done:
+                    data.update(future.result())
+                if any(limits):
+                    now = time.monotonic()
+                    for future in [f for f in waiting if limits[futures[f][1]]
+                                   and now - started.get(futures[f], now) > limits[futures[f][1]]]:
+                        key = futures[future]
+                        waiting.discard(future)
+                        with self._lock:
+                            self._timed_out.add(key)
+                            for symbol in batches[key[1]]:
+                                # Grubun bu ana kadar işlenen sembolleri de döndürülmeyeceği için hatalı sayılır
+                                self.manifest["completed"].pop(symbol, None)
+                                self.manifest["failed"][symbol] = f"Zaman aşımı ({limits[key[1]]:g} sn)"
+                            self._save_manifest()
+        finally:
+            # Zaman aşımına uğrayan istekler arka planda biter, onları beklemiyoruz
+            pool.shutdown(wait=False)
+
+        completed = [s for s in pending if s in self.manifest["completed"]]
+        failed = {s: self.manifest["failed"][s] for s in pending if s in self.manifest["failed"]}
+        elapsed = time.perf_counter() - t0
+        if verbose:
+            print(f"[İNDİRME] {len(completed)} başarılı, {len(failed)} hatalı, "
+                  f"{len(skipped)} atlandı ({elapsed:.1f} sn).")
+        return {"data": data, "completed": completed, "failed": failed,
+                "skipped": skipped, "elapsed": elapsed}
+
+
+def default_checkpoint_path(name: str = "bulk_download") -> str:
+    """dataSets/manifests altında tarih damgalı bir manifest yolu üretir."""
+    return os.path.join("dataSets", "manifests", f"{name}_{datetime.now():%Y%m%d}.json")
@@ -0,0 +1,104 @@
+from datetime import datetime
+from typing import Dict, Iterable
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, select, insert, bindparam, func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from src.data.models import PriceHistory, LatestPrice
+
+class LatestPriceService:
+    """
+    Hisselerin son kapanış fiyatları (latest_prices tablosu).
+    - Okuma: get_latest_prices() ile tüm hisseler TEK sorguda, {security_id: fiyat} sözlüğü döner.
+    - Yazma: refresh() fiyat yazan servisin transaction'ı içinde çağrılır (commit etmez).
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_latest_prices(self, security_ids: Iterable[int]) -> Dict[int, float]:
+        """
+        Verilen hisselerin son kapanış fiyatlarını döndürür. Fiyatı olmayan hisse sözlükte yer almaz.
+        latest_prices'ta henüz kaydı olmayan hisseler (tablo doldurulmamış eski kurulum)
+        price_history'den tek sorguda tamamlanır.
+        """
+        ids = list(dict.fromkeys(int(i) for i in security_ids))
+        if not ids:
+            return {}
+
+        prices = {
+            row.security_id: float(row.close_price)
+            for row in self.db.execute(
+                select(LatestPrice.security_id, LatestPrice.close_price).where(LatestPrice.security_id.in_(ids))
+            )
+        }
+        missing = [i for i in ids if i not in prices]
+        if missing:
+            prices.update({r["security_id"]: float(r["close_price"]) for r in self._compute(missing)})
+        return prices
+
+    def _compute(self, security_ids) -> list:
+        """Son fiyatları price_history'den hesaplar (hisse başına MAX(date), index'ten okunur)."""
+        latest = select(
+            PriceHistory.security_id, func.max(PriceHistory.date).label("max_date")
+        ).where(PriceHistory.security_id.in_(security_ids)).group_by(PriceHistory.security_id).subquery()
+
+        stmt = select(PriceHistory.security_id, PriceHistory.date, PriceHistory.close_price).join(
+            latest, and_(PriceHistory.security_id == latest.c.security_id,
+                         PriceHistory.date == latest.c.max_date)
+        )
+        return [
+            {"security_id": r.security_id, "date": r.date, "close_price": r.close_price}
+            for r in self.db.execute(stmt)
+        ]
+
+    def refresh(self, security_ids: Iterable[int] = None) -> int:
+        """
+        Verilen hisselerin (None ise tüm hisselerin) latest_prices kaydını price_history'den yeniler.
+        Commit ETMEZ: fiyat yazımıyla aynı transaction'da çalışsın diye çağıran yönetir.
+        Geriye yazılan (yeni + değişen) satır sayısını döner.
+        """
+        if security_ids is None:
+            security_ids = [r[0] for r in self.db.execute(select(PriceHistory.security_id).distinct())]
+        ids = list(dict.fromkeys(int(i) for i in security_ids))
+        if not ids:
+            return 0
+
+        computed = self._compute(ids)
+        table = LatestPrice.__table__
+        existing = {
+            r.security_id: r for r in self.db.execute(
+                select(table.c.security_id, table.c.date, table.c.close_price).where(table.c.security_id.in_(ids))
+            )
+        }
+
+        now = datetime.now()
+        new_rows, changed_rows = [], []
+        for row in computed:
+            row["updated_at"] = now
+            old = existing.get(row["security_id"])
+            if old is None:
+                new_rows.append(row)
+            elif old.date != row["date"] or round(float(old.close_price), 4) != round(float(row["close_price"]), 4):
+                changed_rows.append(row)
+
+        if self.db.bind.dialect.name == "mysql":
+            if new_rows or changed_rows:
+                stmt = mysql_insert(table)
+                stmt = stmt.on_duplicate_key_update(
+                    date=stmt.inserted.date, close_price=stmt.inserted.close_price,
+                    updated_at=stmt.inserted.updated_at
+                )
+                self.db.execute(stmt, new_rows + changed_rows)
+        else:
+            if new_rows:
+                self.db.execute(insert(table), new_rows)
+            if changed_rows:
+                stmt = table.update().where(table.c.security_id == bindparam("b_security_id")).values(
+                    date=bindparam("date"), close_price=bindparam("close_price"), updated_at=bindparam("updated_at")
+                )
+                self.db.execute(stmt, [
+                    {"b_security_id": r["security_id"], "date": r["date"],
+                     "close_price": r["close_price"], "updated_at": r["updated_at"]}
+                    for r in changed_rows
+                ])
+
+        return len(new_rows) + len(changed_rows)
@@ -1,44 +1,38 @@
-import yfinance as yf
-from datetime import date, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+import time
+import threading
+import pandas as pd
+from datetime import date, datetime, timedelta
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import and_, select, insert, bindparam, func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from src.data.models import Security, PriceHistory
+from src.services.bulk_downloader import BulkDownloader
+from src.services.latest_prices import LatestPriceService
+from src.services.market_providers import MarketDataProvider, get_default_provider
+
+# PriceHistory'de güncellenebilen değer sütunları (anahtar: security_id + date)
+PRICE_VALUE_COLUMNS = ("open_price", "high_price", "low_price", "close_price", "volume")
 
 class MarketDataService:
     """
-    Piyasa verilerini (yfinance) çeker ve veritabanını günceller.
+    Piyasa verilerini sağlayıcıdan (varsayılan: yfinance) çeker ve veritabanını günceller.
     Otomatik eksik veri tamamlama özelliğine sahiptir.
     """
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, provider: MarketDataProvider = None, downloader: BulkDownloader = None):
         self.db = db
+        self.provider = provider or get_default_provider()
+        self.downloader = downloader or BulkDownloader(provider=self.provider)
+        self.latest_prices = LatestPriceService(db)
 
     def get_ticker_info(self, symbol: str):
         """
-        Tek bir hissenin anlık/günlük verisini yfinance'dan çeker.
+        Tek bir hissenin anlık/günlük verisini sağlayıcıdan çeker.
         Hata durumunda karmaşık loglar yerine None döner.
         """
-        yf_symbol = symbol if ".IS" in symbol or symbol == "USDTRY" else f"{symbol}.IS"
-        
         try:
             # yfinance bazı hataları stdout'a basar, bunu engellemek zor olabilir ama
             # temel mantıkta boş veri gelirse None dönmeliyiz.
-            ticker = yf.Ticker(yf_symbol)
-            
-            # period="1d" son günü getirir
-            hist = ticker.history(period="1d")
-            
-            if hist.empty:
-                return None
-            
-            latest = hist.iloc[-1]
-            return {
-                "date": latest.name.date(),
-                "open": float(latest["Open"]),
-                "high": float(latest["High"]),
-                "low": float(latest["Low"]),
-                "close": float(latest["Close"]),
-                "volume": int(latest["Volume"])
-            }
+            return self.provider.latest(symbol)
         except Exception:
             # Hata detayını kullanıcıya göstermeye gerek yok, None dönmesi yeterli
             return None
@@ -49,107 +43,244 @@ class MarketDataService:
         Eğer hisse yeniyse veya verisi azsa geçmiş 2 yılı çeker.
         """
         # 1. Hisseni DB'den bul veya Yarat
+        security = self._get_or_create_security(symbol)
+
+        # 2. Mevcut Veri Sayısını Kontrol Et (Akıllı Güncelleme)
+        fetch_period = self._fetch_period(security)
+        
+        print(f"[BİLGİ] {symbol} için veri çekiliyor (Periyot: {fetch_period})...")
+
+        # 3. Sağlayıcıdan Veri Çek
+        try:
+            hist = self.provider.history(symbol, period=fetch_period)
+            
+            if hist.empty:
+                print(f"[UYARI] {symbol} için sağlayıcı verisi boş döndü.")
+                return None
+            
+            return self._save_history(security, hist, fetch_period)["last_price"]
+
+        except Exception as e:
+            self.db.rollback()
+            print(f"[HATA] {symbol} verisi güncellenirken hata: {e}")
+            return None
+
+    def _get_or_create_security(self, symbol: str):
         security = self.db.query(Security).filter(Security.symbol == symbol).first()
         if not security:
             security = Security(symbol=symbol, name=symbol)
             self.db.add(security)
             self.db.commit()
             print(f"[BİLGİ] Yeni hisse tanımlandı: {symbol}")
+        return security
 
-        # 2. Mevcut Veri Sayısını Kontrol Et (Akıllı Güncelleme)
+    def _fetch_period(self, security) -> str:
         existing_count = self.db.query(PriceHistory).filter(
             PriceHistory.security_id == security.id
         ).count()
 
         # Eğer veri azsa (yeni hisse) 2 yıllık, çoksa sadece son 5 günü çek
-        fetch_period = "2y" if existing_count < 200 else "5d"
-        
-        print(f"[BİLGİ] {symbol} için veri çekiliyor (Periyot: {fetch_period})...")
+        return "2y" if existing_count < 200 else "5d"
+
+    def _save_history(self, security, hist, fetch_period: str):
+        """
+        İndirilen fiyat geçmişini (index=Tarih) PriceHistory tablosuna toplu (set-based) yazar.
+        Geriye {"inserted", "updated", "last_price"} döner.
+        """
+        symbol = security.symbol
 
-        # 3. yfinance'dan Veri Çek
-        yf_symbol = symbol if ".IS" in symbol or symbol == "USDTRY" else f"{symbol}.IS"
+        # 4. Veritabanına Yaz (Bulk Insert/Update)
+        rows = self._frame_to_rows(security.id, hist)
+        stats = self._upsert_price_rows(rows, update_all=(fetch_period == "5d"))
+        self.db.commit()
         
-        try:
-            ticker = yf.Ticker(yf_symbol)
-            hist = ticker.history(period=fetch_period)
-            
-            if hist.empty:
-                print(f"[UYARI] {symbol} için yfinance verisi boş döndü.")
-                return None
-            
-            # 4. Veritabanına Yaz (Bulk Insert/Update Mantığı)
-            added_count = 0
-            updated_count = 0
-
-            for index, row in hist.iterrows():
-                date_val = index.date()
-                
-                # O tarihli kayıt var mı?
-                existing_record = self.db.query(PriceHistory).filter(
-                    and_(
-                        PriceHistory.security_id == security.id,
-                        PriceHistory.date == date_val
-                    )
-                ).first()
-
-                if existing_record:
-                    # Canlı veri geliyorsa gün içindeki değişimi güncelle
-                    # Sadece son günün verisini güncellemek performans için iyidir
-                    if date_val == date.today() or fetch_period == "5d":
-                        existing_record.close_price = float(row["Close"])
-                        existing_record.high_price = float(row["High"])
-                        existing_record.low_price = float(row["Low"])
-                        existing_record.open_price = float(row["Open"])
-                        existing_record.volume = int(row["Volume"])
-                        updated_count += 1
-                else:
-                    # Kayıt yoksa ekle
-                    new_price = PriceHistory(
-                        security_id=security.id,
-                        date=date_val,
-                        open_price=float(row["Open"]),
-                        high_price=float(row["High"]),
-                        low_price=float(row["Low"]),
-                        close_price=float(row["Close"]),
-                        volume=int(row["Volume"])
-                    )
-                    self.db.add(new_price)
-                    added_count += 1
+        stats["last_price"] = 0.0
+        if not hist.empty:
+            stats["last_price"] = hist["Close"].iloc[-1]
+            print(f"[TAMAMLANDI] {symbol}: {stats['inserted']} yeni kayıt, {stats['updated']} güncelleme. Son Fiyat: {stats['last_price']:.2f}")
+        return stats
 
-            self.db.commit()
-            
-            if not hist.empty:
-                last_price = hist["Close"].iloc[-1]
-                print(f"[TAMAMLANDI] {symbol}: {added_count} yeni kayıt, {updated_count} güncelleme. Son Fiyat: {last_price:.2f}")
-                return last_price
-            return 0.0
+    @staticmethod
+    def _frame_to_rows(security_id, hist) -> list:
+        """yfinance formatındaki DataFrame'i PriceHistory satır sözlüklerine çevirir (iterrows'suz)."""
+        dates = pd.DatetimeIndex(hist.index).date
+        cols = [hist[c].to_numpy(dtype=float) for c in ("Open", "High", "Low", "Close", "Volume")]
+        return [
+            {
+                "security_id": security_id,
+                "date": d,
+                "open_price": float(o),
+                "high_price": float(h),
+                "low_price": float(l),
+                "close_price": float(c),
+                "volume": int(v) if v == v else None  # NaN kontrolü
+            }
+            for d, o, h, l, c, v in zip(dates, *cols)
+        ]
 
-        except Exception as e:
-            self.db.rollback()
-            print(f"[HATA] {symbol} verisi güncellenirken hata: {e}")
-            return None
+    def _upsert_price_rows(self, rows: list, update_all: bool = False) -> dict:
+        """
+        Fiyat satırlarını küme bazlı (set-based) yazar. Commit ETMEZ, çağıran yönetir.
+
+        1. Gelen tarih aralığındaki mevcut kayıtlar TEK sorguda çekilir (satır başı SELECT yok).
+        2. Mevcut tarihler sadece değer değiştiyse ve (bugünse veya update_all ise) yazılır.
+        3. MySQL: yeni + değişen satırlar tek INSERT ... ON DUPLICATE KEY UPDATE ile,
+           diğerleri: yeni satırlar toplu INSERT, değişenler toplu UPDATE (executemany).
+        4. Etkilenen hisselerin latest_prices kaydı yenilenir.
+
+        Returns: {"inserted": int, "updated": int}
+        """
+        if not rows:
+            return {"inserted": 0, "updated": 0}
+
+        table = PriceHistory.__table__
+        security_ids = {r["security_id"] for r in rows}
+        min_date = min(r["date"] for r in rows)
+
+        existing_rows = self.db.execute(
+            select(
+                table.c.security_id, table.c.date, table.c.open_price, table.c.high_price,
+                table.c.low_price, table.c.close_price, table.c.volume
+            ).where(and_(table.c.security_id.in_(security_ids), table.c.date >= min_date))
+        ).all()
+        existing = {(r.security_id, r.date): r for r in existing_rows}
+
+        today = date.today()
+        new_rows, changed_rows = [], []
+        for row in rows:
+            old = existing.get((row["security_id"], row["date"]))
+            if old is None:
+                new_rows.append(row)
+            elif (update_all or row["date"] == today) and self._row_changed(old, row):
+                changed_rows.append(row)
 
-    def update_all_tickers(self):
+        if self.db.bind.dialect.name == "mysql":
+            # (security_id, date) UNIQUE index'i sayesinde yeni + değişen satırlar TEK ifadede yazılır
+            if new_rows or changed_rows:
+                stmt = mysql_insert(table)
+                stmt = stmt.on_duplicate_key_update(
+                    {c: stmt.inserted[c] for c in PRICE_VALUE_COLUMNS}
+                )
+                self.db.execute(stmt, new_rows + changed_rows)
+        else:
+            if new_rows:
+                self.db.execute(insert(table), new_rows)
+            if changed_rows:
+                stmt = table.update().where(and_(
+                    table.c.security_id == bindparam("b_security_id"),
+                    table.c.date == bindparam("b_date")
+                )).values({c: bindparam(c) for c in PRICE_VALUE_COLUMNS})
+                self.db.execute(stmt, [
+                    {**{c: r[c] for c in PRICE_VALUE_COLUMNS},
+                     "b_security_id": r["security_id"], "b_date": r["date"]}
+                    for r in changed_rows
+                ])
+
+        # Son fiyat tablosu aynı transaction'da güncellenir (fiyat ile özeti hiç ayrışmaz)
+        touched = {r["security_id"] for r in new_rows + changed_rows}
+        if touched:
+            self.latest_prices.refresh(touched)
+
+        return {"inserted": len(new_rows), "updated": len(changed_rows)}
+
+    @staticmethod
+    def _row_changed(old, new: dict) -> bool:
+        for col in PRICE_VALUE_COLUMNS:
+            old_val = getattr(old, col)
+            if old_val is None or new[col] is None:
+                if old_val is not new[col]:
+                    return True
+            # DECIMAL(10,4) hassasiyetinde karşılaştır
+            elif round(float(old_val), 4) != round(float(new[col]), 4):
+                return True
+        return False
+
+    def _fetch_periods(self, securities) -> dict:
+        """Tüm hisselerin indirme periyodunu TEK (GROUP BY) sorguyla belirler: {security_id: periyot}."""
+        counts = dict(self.db.query(PriceHistory.security_id, func.count(PriceHistory.id)).filter(
+            PriceHistory.security_id.in_([sec.id for sec in securities])
+        ).group_by(PriceHistory.security_id).all())
+        return {sec.id: ("2y" if counts.get(sec.id, 0) < 200 else "5d") for sec in securities}
+
+    def update_all_tickers(self, symbol_timeout: float = None, verbose: bool = True):
         """
-        Sistemdeki tüm hisseleri toplu günceller.
+        Sistemdeki tüm hisseleri eşzamanlı (concurrent) günceller.
+
+        1. Aynı periyodu isteyen hisseler BulkDownloader ile gruplar halinde, paralel indirilir.
+        2. symbol_timeout (sn) sembol başına süredir: Bir grubun süresi symbol_timeout x gruptaki
+           sembol sayısıdır. Süreyi aşan grup beklenmez, sembolleri hata özetine yazılır.
+        3. İnen tüm satırlar TEK bir transaction'da toplu (bulk) yazılır.
+        verbose=False ise konsola yazdırmaz (arka plan güncellemesi menüyü bozmasın).
+
+        Geriye {"inserted", "updated", "failed": {sembol: hata}, "elapsed"} özetini döner.
         """
+        t0 = time.perf_counter()
+        summary = {"inserted": 0, "updated": 0, "failed": {}}
         securities = self.db.query(Security).all()
-        print(f"\n--- Piyasa Verileri Güncelleniyor ({len(securities)} Hisse) ---")
-        
+        if verbose:
+            print(f"\n--- Piyasa Verileri Güncelleniyor ({len(securities)} Hisse) ---")
+
+        # Aynı periyodu isteyen hisseleri aynı toplu indirmeye koy
+        periods = self._fetch_periods(securities) if securities else {}
+        groups = {}
         for sec in securities:
-            self.update_price_history(sec.symbol)
-            
-        print("--- Güncelleme Tamamlandı ---\n")
+            groups.setdefault(periods[sec.id], []).append(sec)
+
+        rows_by_period = {}
+        for fetch_period, secs in groups.items():
+            # İndirici sembolleri normalize eder (strip + upper); sonuçlar aynı anahtarla eşlenir
+            by_symbol = {sec.symbol.strip().upper(): sec for sec in secs}
+            result = self.downloader.download(list(by_symbol), period=fetch_period,
+                                             symbol_timeout=symbol_timeout, verbose=verbose)
+            rows = rows_by_period.setdefault(fetch_period, [])
+            for symbol, hist in result["data"].items():
+                rows.extend(self._frame_to_rows(by_symbol[symbol].id, hist))
+            summary["failed"].update(result["failed"])
+
+        # Tek yazım: tüm gruplar aynı transaction'da, tek commit
+        try:
+            for fetch_period, rows in rows_by_period.items():
+                stats = self._upsert_price_rows(rows, update_all=(fetch_period == "5d"))
+                summary["inserted"] += stats["inserted"]
+                summary["updated"] += stats["updated"]
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            summary["inserted"] = summary["updated"] = 0
+            if verbose:
+                print(f"[HATA] Toplu veritabanı yazımı başarısız, değişiklikler geri alındı: {e}")
+            for secs in groups.values():
+                for sec in secs:
+                    summary["failed"].setdefault(sec.symbol.strip().upper(), str(e))
+
+        summary["elapsed"] = time.perf_counter() - t0
+        if not verbose:
+            return summary
+        for symbol, err in sorted(summary["failed"].items()):
+            print(f"[UYARI] {symbol} güncellenemedi: {err}")
+        print(f"--- Güncelleme Tamamlandı: {summary['inserted']} yeni, {summary['updated']} güncelleme, "
+              f"{len(summary['failed'])} hatalı ({summary['elapsed']:.1f} sn) ---\n")
+        return summary
+
+    def refresh_in_background(self, symbol_timeout: float = None, session_factory=None) -> "BackgroundRefresh":
+        """
+        update_all_tickers'ı ayrı bir thread'de ve AYRI bir DB oturumunda çalıştırır
+        (session_factory verilmezse bu oturumun bağlantısından yeni oturum açılır).
+        Arayüz beklemeden devam eder; durum/sonuç dönen nesneden takip edilir.
+        """
+        session_factory = session_factory or sessionmaker(bind=self.db.get_bind(), autocommit=False, autoflush=False)
+        task = BackgroundRefresh(self.provider, session_factory, symbol_timeout)
+        task.start()
+        return task
 
     def get_first_trade_date(self, symbol: str):
         """
         Hissenin borsada işlem görmeye başladığı (veya verinin olduğu) ilk tarihi bulur.
         """
         try:
-            # yfinance'dan 'max' geçmişi isteyip ilk indexi alıyoruz
-            ticker = yf.Ticker(f"{symbol}.IS")
+            # Sağlayıcıdan 'max' geçmişi isteyip ilk indexi alıyoruz
             # Sadece metadata değil, history'den bakmak en garantisi
-            hist = ticker.history(period="max")
+            hist = self.provider.history(symbol, period="max")
             
             if hist.empty:
                 return None
@@ -169,8 +300,7 @@ class MarketDataService:
             start_date = target_date
             end_date = target_date + timedelta(days=5)
             
-            ticker = yf.Ticker(f"{symbol}.IS")
-            hist = ticker.history(start=start_date, end=end_date)
+            hist = self.provider.history(symbol, start=start_date, end=end_date)
             
             # Eğer o aralıkta hiç veri yoksa, o tarihte hisse yok demektir.
             if hist.empty:
@@ -184,4 +314,43 @@ class MarketDataService:
             return True, "OK"
             
         except Exception as e:
-            return False, f"Tarih kontrolü yapılamadı: {str(e)}"
\ No newline at end of file
+            return False, f"Tarih kontrolü yapılamadı: {str(e)}"
+
+
+class BackgroundRefresh:
+    """
+    Arka planda çalışan piyasa verisi güncellemesi.
+    Kendi oturumunu (session) açar ve kapatır; arayüzün oturumu ile paylaşmaz (thread-safe değildir).
+    """
+    def __init__(self, provider: MarketDataProvider, session_factory, symbol_timeout: float = None):
+        self.provider = provider
+        self.session_factory = session_factory
+        self.symbol_timeout = symbol_timeout
+        self.summary = None
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self._thread = threading.Thread(target=self._run, name="market-refresh", daemon=True)
+
+    def start(self):
+        self.started_at = datetime.now()
+        self._thread.start()
+
+    def _run(self):
+        db = self.session_factory()
+        try:
+            service = MarketDataService(db, provider=self.provider)
+            self.summary = service.update_all_tickers(symbol_timeout=self.symbol_timeout, verbose=False)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            db.close()
+            self.finished_at = datetime.now()
+
+    def is_running(self) -> bool:
+        return self._thread.is_alive()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Bitmesini en fazla timeout saniye bekler. Bittiyse True döner."""
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
@@ -0,0 +1,234 @@
+import os
+import time
+import threading
+import zlib
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from src.ai_core.storage import get_price_store
+
+def to_yahoo_symbol(symbol: str) -> str:
+    """BIST sembolünü Yahoo formatına çevirir (ASELS -> ASELS.IS)."""
+    return symbol if ".IS" in symbol or symbol == "USDTRY" else f"{symbol}.IS"
+
+
+def period_to_start(period: str, end: datetime) -> Optional[datetime]:
+    """yfinance periyot kodunu ('5d', '1mo', '2y', 'max') başlangıç tarihine çevirir."""
+    if period in (None, "max"):
+        return None
+    if period == "ytd":
+        return datetime(end.year, 1, 1)
+    units = {"d": 1, "wk": 7, "mo": 31, "y": 366}
+    for unit, days in units.items():
+        if period.endswith(unit) and period[:-len(unit)].isdigit():
+            return end - timedelta(days=int(period[:-len(unit)]) * days)
+    raise ValueError(f"Tanınmayan periyot: {period}")
+
+
+class MarketDataProvider(ABC):
+    """
+    Piyasa verisi sağlayıcıları için ortak arayüz.
+    Tüm metotlar index'i 'Date' (tz'siz) olan, Open/High/Low/Close/Volume sütunlu DataFrame döner.
+    Servisler yfinance'a değil bu arayüze bağımlıdır; böylece çevrimdışı (replay) test yapılabilir.
+    """
+
+    @abstractmethod
+    def history(self, symbol: str, start=None, end=None, period: str = None) -> pd.DataFrame:
+        """Tek sembolün günlük OHLCV geçmişi. start/end veya period verilir."""
+        pass
+
+    def latest(self, symbol: str) -> Optional[dict]:
+        """Son işlem gününün özet bilgisi. Veri yoksa None."""
+        return self._summarize_last(self.history(symbol, period="5d"))
+
+    @staticmethod
+    def _summarize_last(hist: pd.DataFrame) -> Optional[dict]:
+        if hist is None or hist.empty:
+            return None
+        latest = hist.iloc[-1]
+        return {
+            "date": latest.name.date(),
+            "open": float(latest["Open"]),
+            "high": float(latest["High"]),
+            "low": float(latest["Low"]),
+            "close": float(latest["Close"]),
+            "volume": int(latest["Volume"])
+        }
+
+    def bulk_history(self, symbols: List[str], start=None, end=None, period: str = None) -> Dict[str, pd.DataFrame]:
+        """Çoklu sembol geçmişi: {sembol: DataFrame}. Verisi olmayan semboller sözlükte yer almaz."""
+        results = {}
+        for symbol in symbols:
+            hist = self.history(symbol, start=start, end=end, period=period)
+            if hist is not None and not hist.empty:
+                results[symbol] = hist
+        return results
+
+    @staticmethod
+    def _clean(frame: pd.DataFrame) -> pd.DataFrame:
+        frame = frame.dropna(how="all")
+        if isinstance(frame.index, pd.DatetimeIndex) and frame.index.tz is not None:
+            frame = frame.tz_localize(None)
+        frame.index.name = "Date"
+        return frame
+
+
+class YFinanceProvider(MarketDataProvider):
+    """
+    Yahoo Finance (yfinance) sağlayıcısı.
+    auto_adjust=True, Ticker.history ile aynı (temettü/bölünme düzeltilmiş) fiyatları verir.
+    """
+    def __init__(self, auto_adjust: bool = True):
+        self.auto_adjust = auto_adjust
+
+    def history(self, symbol, start=None, end=None, period=None):
+        ticker = yf.Ticker(to_yahoo_symbol(symbol))
+        if period:
+            hist = ticker.history(period=period, auto_adjust=self.auto_adjust)
+        else:
+            hist = ticker.history(start=start, end=end, auto_adjust=self.auto_adjust)
+        return self._clean(hist) if not hist.empty else hist
+
+    def latest(self, symbol):
+        # period="1d" son günü getirir (5 günlük çekmeye gerek yok)
+        return self._summarize_last(self.history(symbol, period="1d"))
+
+    def bulk_history(self, symbols, start=None, end=None, period=None):
+        """Tüm sembolleri TEK bir yf.download çağrısıyla çeker."""
+        yf_map = {to_yahoo_symbol(s): s for s in symbols}
+        kwargs = {"period": period} if period else {"start": start, "end": end}
+        data = yf.download(
+            list(yf_map.keys()),
+            group_by="ticker",
+            auto_adjust=self.auto_adjust,
+            threads=False,   # Paralellik BulkDownloader'da, yfinance kendi thread'lerini açmasın
+            progress=False,
+            **kwargs
+        )
+        if data is None or data.empty:
+            return {}
+
+        results = {}
+        for yf_symbol, symbol in yf_map.items():
+            if isinstance(data.columns, pd.MultiIndex):
+                if yf_symbol not in data.columns.get_level_values(0):
+                    continue
+                frame = data[yf_symbol]
+            else:
+                frame = data
+            frame = self._clean(frame)
+            if not frame.empty:
+                results[symbol] = frame
+        return results
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Ağ gerektirmeyen, deterministik (tekrarlanabilir) veri sağlayıcı.
+
+    - Kayıtlı veri: 'store' (PriceStore) veya 'data_dir' (Parquet deposu klasörü) verilirse
+      sembol oradan okunur.
+    - Sentetik veri: Kayıt yoksa sembol adından türetilen tohumla (seed) geometrik Brown
+      hareketi (GBM) OHLCV üretilir. Aynı sembol + tarih her zaman aynı fiyatı verir.
+    - latency: Her çağrıya eklenen yapay gecikme (saniye); jitter ile rastgele sapma eklenir.
+      Ingestion/eğitim/backtest yük testlerini Yahoo'dan bağımsız yapmak içindir.
+    """
+    ANCHOR_DATE = pd.Timestamp("2010-01-01")
+
+    def __init__(self, data_dir: str = None, store=None, latency: float = 0.0, jitter: float = 0.0,
+                 seed: int = 42, end_date=None, synthetic: bool = True):
+        if store is None and data_dir:
+            store = get_price_store("parquet", data_dir)
+        self.store = store
+        self.latency = latency
+        self.jitter = jitter
+        self.seed = seed
+        self.end_date = pd.Timestamp(end_date).normalize() if end_date else None
+        self.synthetic = synthetic
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self._cache = {}
+
+    def _sleep(self) -> None:
+        with self._lock:
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _full_history(self, symbol: str) -> pd.DataFrame:
+        if symbol in self._cache:
+            return self._cache[symbol]
+
+        frame = pd.DataFrame()
+        if self.store is not None and self.store.exists(symbol):
+            recorded = self.store.read(symbol)
+            frame = recorded.set_index('Date')[[c for c in recorded.columns if c != 'Date']]
+        elif self.synthetic:
+            frame = self._synthetic(symbol)
+        self._cache[symbol] = frame
+        return frame
+
+    def _synthetic(self, symbol: str) -> pd.DataFrame:
+        end = self.end_date or pd.Timestamp(datetime.now().date())
+        dates = pd.bdate_range(self.ANCHOR_DATE, end, name="Date")
+        # Tohum sadece sembolden türetilir: fiyatlar istenen aralıktan bağımsızdır
+        rng = np.random.default_rng([self.seed, zlib.crc32(symbol.encode("utf-8"))])
+        n = len(dates)
+
+        start_price = rng.uniform(5, 500)
+        drift, vol = rng.uniform(0.0, 0.0008), rng.uniform(0.01, 0.035)
+        log_ret = drift - 0.5 * vol ** 2 + vol * rng.standard_normal(n)
+        close = start_price * np.exp(np.cumsum(log_ret))
+        open_ = np.concatenate(([start_price], close[:-1])) * (1 + 0.003 * rng.standard_normal(n))
+        spread = np.abs(rng.standard_normal(n)) * vol * close
+        high = np.maximum(open_, close) + spread
+        low = np.maximum(np.minimum(open_, close) - spread, 0.01)
+        volume = np.round(rng.lognormal(mean=14, sigma=0.6, size=n))
+
+        return pd.DataFrame({'Open': open_, 'High': high, 'Low': low,
+                             'Close': close, 'Volume': volume}, index=dates)
+
+    def history(self, symbol, start=None, end=None, period=None):
+        self._sleep()
+        frame = self._full_history(symbol)
+        if frame.empty:
+            return frame
+
+        end_ts = pd.Timestamp(end) if end is not None else frame.index[-1]
+        if period:
+            start_dt = period_to_start(period, end_ts.to_pydatetime())
+            start_ts = pd.Timestamp(start_dt) if start_dt else None
+        else:
+            start_ts = pd.Timestamp(start) if start is not None else None
+
+        mask = frame.index <= end_ts if end is None else frame.index < end_ts
+        if start_ts is not None:
+            mask &= frame.index >= start_ts
+        return frame.loc[mask]
+
+
+PROVIDERS = {
+    "yfinance": YFinanceProvider,
+    "replay": ReplayProvider,
+}
+
+
+def get_default_provider() -> MarketDataProvider:
+    """
+    Ortam değişkenlerine göre sağlayıcı seçer (.env üzerinden de verilebilir):
+        MARKET_DATA_PROVIDER = yfinance (varsayılan) | replay
+        MARKET_REPLAY_DIR     = Kayıtlı Parquet deposu klasörü (replay için, opsiyonel)
+        MARKET_REPLAY_LATENCY = Çağrı başına yapay gecikme, saniye (replay için)
+    """
+    name = os.getenv("MARKET_DATA_PROVIDER", "yfinance").lower()
+    if name not in PROVIDERS:
+        raise ValueError(f"Bilinmeyen veri sağlayıcı: {name}. Seçenekler: {list(PROVIDERS)}")
+    if name == "replay":
+        return ReplayProvider(
+            data_dir=os.getenv("MARKET_REPLAY_DIR") or None,
+            latency=float(os.getenv("MARKET_REPLAY_LATENCY", "0"))
+        )
+    return YFinanceProvider()
@@ -2,15 +2,21 @@ import numpy as np
 import pandas as pd
 from scipy.optimize import minimize
 from sqlalchemy.orm import Session
+from sqlalchemy import func, select
 from src.data.models import PortfolioHolding, PriceHistory, Security
+from src.services.latest_prices import LatestPriceService
+from src.ai_core.price_cube import PriceCube
 
 class PortfolioOptimizer:
     """
     Markowitz Modern Portföy Teorisi (MPT) kullanarak
     Sharpe Oranını maksimize eden ağırlıkları hesaplar.
     """
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, cube: PriceCube = None):
         self.db = db
+        # Verilirse geçmiş fiyatlar hisse başına sorgu yerine bellek eşlemli küpten okunur
+        self.cube = cube
+        self.latest_prices = LatestPriceService(db)
         self.risk_free_rate = 0.30  # Türkiye için temsili risksiz faiz oranı (%30)
 
     def optimize_portfolio(self, user_id):
@@ -117,6 +123,12 @@ class PortfolioOptimizer:
 
     def _get_historical_data(self, symbols, days):
         """Veritabanından toplu fiyat verisi çeker ve DataFrame yapar."""
+        if self.cube is not None and 'Close' in self.cube.fields and all(sym in self.cube for sym in symbols):
+            # Tek dilim: Hisselerin son 'days' işlem günü (küpte tarihler zaten hizalı)
+            closes = self.cube.frame('Close', symbols=symbols).dropna(how='all')
+            if self._cube_is_fresh(closes):
+                return closes.tail(days).dropna()
+
         data = {}
         for sym in symbols:
             sec = self.db.query(Security).filter(Security.symbol == sym).first()
@@ -135,17 +147,31 @@ class PortfolioOptimizer:
         df.sort_index(inplace=True)
         return df.dropna()
 
+    def _cube_is_fresh(self, closes: pd.DataFrame) -> bool:
+        """
+        Küp, veritabanındaki son fiyat tarihlerinin gerisinde mi? (TEK GROUP BY sorgusu)
+        Küp toplu eğitim/tarama öncesi kurulur; sonradan gelen fiyatlar için veritabanına dönülür.
+        """
+        latest = dict(self.db.execute(
+            select(Security.symbol, func.max(PriceHistory.date))
+            .join(PriceHistory, PriceHistory.security_id == Security.id)
+            .where(Security.symbol.in_(list(closes.columns)))
+            .group_by(Security.symbol)
+        ).all())
+        for sym in closes.columns:
+            cube_last = closes[sym].last_valid_index()
+            db_last = latest.get(sym)
+            if db_last is not None and (cube_last is None or cube_last.date() < pd.Timestamp(db_last).date()):
+                print(f"[BİLGİ] Fiyat küpü güncel değil ({sym}: küp {cube_last.date() if cube_last is not None else '-'}, "
+                      f"veritabanı {db_last}); veritabanı kullanılıyor.")
+                return False
+        return True
+
     def _calculate_current_weights(self, holdings):
         """Mevcut portföyün ağırlıklarını hesaplar."""
-        vals = []
-        # En son fiyatları çekmek lazım ama hız için maliyetten değil, 
-        # en son kaydedilen fiyattan hesaplayalım.
-        for h in holdings:
-            last_price = self.db.query(PriceHistory).filter(
-                PriceHistory.security_id == h.security_id
-            ).order_by(PriceHistory.date.desc()).first()
-            p = float(last_price.close_price) if last_price else float(h.avg_cost)
-            vals.append(float(h.quantity) * p)
+        # En son kaydedilen fiyattan hesaplıyoruz (tüm hisseler tek sorguda)
+        prices = self.latest_prices.get_latest_prices(h.security_id for h in holdings)
+        vals = [float(h.quantity) * prices.get(h.security_id, float(h.avg_cost)) for h in holdings]
             
         total = sum(vals)
         if total == 0: return np.zeros(len(holdings))
@@ -1,8 +1,14 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, and_
+from sqlalchemy import func, desc, and_, select
 from datetime import datetime, timedelta
 import pandas as pd
-from src.data.models import PortfolioHolding, Transaction, PriceHistory, Security
+from src.data.models import PortfolioHolding, Transaction, PriceHistory, Security, LatestPrice
+from src.services.latest_prices import LatestPriceService
+
+# Dönemsel getiri ufukları: {etiket: gün sayısı veya "ytd" (yılbaşından beri)}
+PERIOD_RETURN_HORIZONS = {"daily": 1, "weekly": 7, "monthly": 30, "ytd": "ytd", "yearly": 365}
+# As-of fiyat ararken hedef tarihten en fazla kaç gün geriye bakılacağı (tatil/işlem durması)
+ASOF_LOOKBACK_DAYS = 30
 
 class PortfolioAnalyticsService:
     """
@@ -11,57 +17,33 @@ class PortfolioAnalyticsService:
     """
     def __init__(self, db: Session):
         self.db = db
+        self.latest_prices = LatestPriceService(db)
 
     def generate_dashboard(self, user_id):
-        # 1. Portföy verilerini çek
-        holdings = self.db.query(PortfolioHolding).filter(PortfolioHolding.user_id == user_id).all()
-        if not holdings:
+        # 1. Portföy + güncel fiyatlar TEK sorguda (hisse başına ayrı sorgu yok)
+        frame = self._holdings_frame(user_id)
+        if frame.empty:
             return {"error": "Portföy boş."}
 
-        total_current_value = 0.0
-        total_cost_basis = 0.0
-        positions = []
-
-        # 2. Her hisse için hesaplama yap
-        for h in holdings:
-            # Güncel fiyatı al (MarketDataService üzerinden güncellenmiş olmalı)
-            # En son fiyatı bulmak için PriceHistory'e bakıyoruz
-            last_price_row = self.db.query(PriceHistory).filter(
-                PriceHistory.security_id == h.security_id
-            ).order_by(PriceHistory.date.desc()).first()
-            
-            current_price = float(last_price_row.close_price) if last_price_row else float(h.avg_cost)
-            
-            qty = float(h.quantity)
-            avg_cost = float(h.avg_cost)
-            
-            market_val = qty * current_price
-            cost_basis = qty * avg_cost
-            
-            # --- YENİ EKLENEN KISIM: NOMİNAL (TL) KAR/ZARAR ---
-            nominal_pl = market_val - cost_basis 
-            # --------------------------------------------------
+        # 2. Tüm pozisyonlar için vektörel hesaplama
+        frame["market_value"] = frame["quantity"] * frame["current_price"]
+        cost_basis = frame["quantity"] * frame["avg_cost"]
+        # Nominal (TL) kar/zarar
+        frame["nominal_pl"] = frame["market_value"] - cost_basis
+        frame["pct_pl"] = ((frame["current_price"] - frame["avg_cost"]) / frame["avg_cost"] * 100).where(
+            frame["avg_cost"] > 0, 0.0
+        )
 
-            pct_pl = ((current_price - avg_cost) / avg_cost) * 100 if avg_cost > 0 else 0.0
-            
-            total_current_value += market_val
-            total_cost_basis += cost_basis
-            
-            positions.append({
-                "symbol": h.security.symbol,
-                "quantity": qty,
-                "avg_cost": avg_cost,
-                "current_price": current_price,
-                "market_value": market_val,
-                "pct_pl": pct_pl,
-                "nominal_pl": nominal_pl # <-- Listeye ekledik
-            })
+        positions = frame[[
+            "symbol", "quantity", "avg_cost", "current_price", "market_value", "pct_pl", "nominal_pl"
+        ]].to_dict("records")
 
         # 3. Genel Toplamlar
+        total_current_value = float(frame["market_value"].sum())
+        total_cost_basis = float(cost_basis.sum())
         total_nominal_pl = total_current_value - total_cost_basis
         total_pct_pl = (total_nominal_pl / total_cost_basis * 100) if total_cost_basis > 0 else 0.0
 
-        # ... (Ekstremler hesaplama kısmı aynı kalabilir) ...
         extremes = self._calculate_extremes(positions)
 
         return {
@@ -75,89 +57,121 @@ class PortfolioAnalyticsService:
             "extremes": extremes
         }
 
+    def _holdings_frame(self, user_id) -> pd.DataFrame:
+        """
+        Kullanıcının pozisyonlarını sembol ve SON kapanış fiyatıyla birlikte TEK sorguda çeker
+        (portfolio_holdings + securities + latest_prices birleşimi, hisse başına sorgu yok).
+        latest_prices'ta kaydı olmayan hisseler LatestPriceService ile tamamlanır;
+        fiyatı hiç olmayan hissede güncel fiyat olarak maliyet kullanılır.
+
+        Returns: security_id, symbol, quantity, avg_cost, current_price sütunlu DataFrame
+        """
+        stmt = (
+            select(
+                PortfolioHolding.security_id, Security.symbol, PortfolioHolding.quantity,
+                PortfolioHolding.avg_cost, LatestPrice.close_price
+            )
+            .join(Security, Security.id == PortfolioHolding.security_id)
+            .outerjoin(LatestPrice, LatestPrice.security_id == PortfolioHolding.security_id)
+            .where(PortfolioHolding.user_id == user_id)
+            .order_by(PortfolioHolding.security_id)
+        )
+        frame = pd.DataFrame(
+            self.db.execute(stmt).all(),
+            columns=["security_id", "symbol", "quantity", "avg_cost", "close_price"]
+        )
+        # DECIMAL -> float
+        for col in ("quantity", "avg_cost", "close_price"):
+            frame[col] = pd.to_numeric(frame[col], errors="coerce").astype("float64")
+
+        missing = frame.loc[frame["close_price"].isna(), "security_id"]
+        if not missing.empty:
+            fallback = self.latest_prices.get_latest_prices(missing.tolist())
+            frame["close_price"] = frame["close_price"].fillna(frame["security_id"].map(fallback))
+
+        frame["current_price"] = frame.pop("close_price").fillna(frame["avg_cost"])
+        return frame
+
     def _get_active_holdings(self, user_id):
         """Aktif portföyü ve güncel fiyatları çeker."""
-        holdings = self.db.query(PortfolioHolding).filter(PortfolioHolding.user_id == user_id).all()
-        data = []
-        for h in holdings:
-            # En güncel fiyatı al
-            last_price_row = self.db.query(PriceHistory).filter(
-                PriceHistory.security_id == h.security_id
-            ).order_by(PriceHistory.date.desc()).first()
-            
-            current_price = float(last_price_row.close_price) if last_price_row else float(h.avg_cost)
-            
-            data.append({
-                "security_id": h.security_id,
-                "symbol": h.security.symbol,
-                "quantity": float(h.quantity),
-                "avg_cost": float(h.avg_cost),
-                "current_price": current_price,
-                "market_value": float(h.quantity) * current_price
-            })
-        return data
+        frame = self._holdings_frame(user_id)
+        frame["market_value"] = frame["quantity"] * frame["current_price"]
+        return frame.to_dict("records")
 
-    def _get_historical_price(self, security_id, days_ago):
-        """Belirtilen gün kadar önceki kapanış fiyatını (veya en yakın tarihi) bulur."""
-        target_date = datetime.now().date() - timedelta(days=days_ago)
-        
-        # Tam o gün yoksa, o günden önceki en yakın tarihi al (Pazar ise Cuma)
-        price_row = self.db.query(PriceHistory).filter(
-            and_(
-                PriceHistory.security_id == security_id,
-                PriceHistory.date <= target_date
-            )
-        ).order_by(PriceHistory.date.desc()).first()
-        
-        return float(price_row.close_price) if price_row else None
+    def _load_price_window(self, security_ids, start_date) -> pd.DataFrame:
+        """Verilen hisselerin start_date'ten bugüne kapanışlarını TEK sorguda çeker (uzun format)."""
+        stmt = select(PriceHistory.security_id, PriceHistory.date, PriceHistory.close_price).where(
+            PriceHistory.security_id.in_(security_ids), PriceHistory.date >= start_date
+        )
+        prices = pd.DataFrame(self.db.execute(stmt).all(), columns=["security_id", "date", "close"])
+        prices["date"] = pd.to_datetime(prices["date"])
+        prices["close"] = pd.to_numeric(prices["close"], errors="coerce").astype("float64")
+        return prices
 
-    def _calculate_period_returns(self, holdings):
-        """Günlük, Haftalık, Aylık, Yıllık değişim oranları."""
-        asset_details = []
-        total_value_now = sum(h["market_value"] for h in holdings)
-        
-        # Ağırlıklı getiri hesaplamak için değişkenler
-        weighted_daily_sum = 0
-        weighted_weekly_sum = 0
-        weighted_monthly_sum = 0
-        
-        for h in holdings:
-            p_now = h["current_price"]
-            
-            # Geçmiş fiyatlar
-            p_day = self._get_historical_price(h["security_id"], 1) or p_now
-            p_week = self._get_historical_price(h["security_id"], 7) or p_now
-            p_month = self._get_historical_price(h["security_id"], 30) or p_now
-            p_year = self._get_historical_price(h["security_id"], 365) or p_now
-            
-            # Yüzdesel Değişimler
-            d_chg = ((p_now - p_day) / p_day) * 100
-            w_chg = ((p_now - p_week) / p_week) * 100
-            m_chg = ((p_now - p_month) / p_month) * 100
-            y_chg = ((p_now - p_year) / p_year) * 100
-            
-            # Portföy katkısı (Ağırlık * Değişim)
-            weight = h["market_value"] / total_value_now
-            weighted_daily_sum += d_chg * weight
-            weighted_weekly_sum += w_chg * weight
-            weighted_monthly_sum += m_chg * weight
+    @staticmethod
+    def _horizon_targets(horizons: dict, today) -> dict:
+        """Ufuk tanımlarını hedef tarihe çevirir: gün sayısı -> bugün - gün, 'ytd' -> geçen yılın son günü."""
+        targets = {}
+        for label, horizon in horizons.items():
+            if horizon == "ytd":
+                targets[label] = pd.Timestamp(today.year - 1, 12, 31)
+            else:
+                targets[label] = pd.Timestamp(today - timedelta(days=int(horizon)))
+        return targets
 
-            asset_details.append({
-                "symbol": h["symbol"],
-                "daily_chg": d_chg,
-                "weekly_chg": w_chg,
-                "monthly_chg": m_chg,
-                "yearly_chg": y_chg
-            })
-            
+    def _calculate_period_returns(self, holdings, horizons: dict = None, today=None):
+        """
+        Dönemsel değişim oranları (varsayılan: günlük, haftalık, aylık, yılbaşından beri, yıllık).
+
+        Tüm pozisyonların fiyatları TEK sorguda çekilir; her ufkun "o tarihteki (veya öncesindeki
+        en yakın) fiyatı" merge_asof ile hepsi için birlikte bulunur. Ufuk eklemek sorgu eklemez.
+
+        Args:
+            holdings: _get_active_holdings() çıktısı
+            horizons: {etiket: gün sayısı veya "ytd"}. Çıktı anahtarları '{etiket}_chg' / '{etiket}_return'.
+            today: Hesap tarihi (test için), varsayılan bugün.
+        """
+        horizons = horizons or PERIOD_RETURN_HORIZONS
+        today = today or datetime.now().date()
+        frame = pd.DataFrame(holdings)
+        if frame.empty:
+            return {"portfolio_summary": {"total_value": 0.0}, "asset_details": []}
+
+        targets = self._horizon_targets(horizons, today)
+        # Hafta sonu / tatil için en eski hedef tarihten biraz önce başla
+        window_start = (min(targets.values()) - timedelta(days=ASOF_LOOKBACK_DAYS)).date()
+        prices = self._load_price_window(frame["security_id"].tolist(), window_start)
+
+        # (hisse x ufuk) hedef tablosu -> her satıra hedef tarihteki as-of fiyat
+        target_rows = pd.DataFrame(
+            [(sec_id, label, target) for sec_id in frame["security_id"] for label, target in targets.items()],
+            columns=["security_id", "horizon", "date"]
+        ).sort_values("date")
+        asof = pd.merge_asof(
+            target_rows, prices.dropna().sort_values("date"),
+            on="date", by="security_id", direction="backward"
+        )
+        past = asof.pivot(index="security_id", columns="horizon", values="close").reindex(
+            index=frame["security_id"], columns=list(horizons)
+        )
+
+        # Fiyatı bulunamayan ufukta değişim 0 kabul edilir (eski davranış: p_geçmiş = p_şimdi)
+        p_now = frame.set_index("security_id")["current_price"]
+        past = past.apply(lambda col: col.fillna(p_now)).where(lambda df: df > 0, p_now, axis=0)
+        changes = past.rsub(p_now, axis=0).div(past, axis=0) * 100
+
+        total_value_now = float(frame["market_value"].sum())
+        weights = frame.set_index("security_id")["market_value"] / total_value_now if total_value_now else 0.0
+        weighted = changes.mul(weights, axis=0).sum()
+
+        details = changes.add_suffix("_chg")
+        details.insert(0, "symbol", frame.set_index("security_id")["symbol"])
+
+        summary = {"total_value": total_value_now}
+        summary.update({f"{label}_return": float(weighted[label]) for label in horizons})
         return {
-            "portfolio_summary": {
-                "total_value": total_value_now,
-                "daily_return": weighted_daily_sum,
-                "weekly_return": weighted_weekly_sum,
-                "monthly_return": weighted_monthly_sum
-            },
-            "asset_details": asset_details
+            "portfolio_summary": summary,
+            "asset_details": details.reset_index(drop=True).to_dict("records")
         }
 
     def _analyze_lots(self, user_id, holdings):
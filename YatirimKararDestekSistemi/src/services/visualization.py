@@ -2,8 +2,9 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
 import os
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from src.data.models import PortfolioHolding, PriceHistory, Security
+from src.services.latest_prices import LatestPriceService
 
 class PortfolioVisualizationService:
     """
@@ -12,6 +13,7 @@ class PortfolioVisualizationService:
     """
     def __init__(self, db: Session):
         self.db = db
+        self.latest_prices = LatestPriceService(db)
         # Profesyonel görünüm ayarları
         plt.style.use('seaborn-v0_8-darkgrid')
         self.save_dir = "reports/graphs"
@@ -19,15 +21,14 @@ class PortfolioVisualizationService:
 
     def _get_portfolio_data(self, user_id):
         """Portföydeki hisseleri ve ağırlıklarını çeker."""
-        holdings = self.db.query(PortfolioHolding).filter(PortfolioHolding.user_id == user_id).all()
+        holdings = self.db.query(PortfolioHolding).options(
+            joinedload(PortfolioHolding.security)
+        ).filter(PortfolioHolding.user_id == user_id).all()
+        # Güncel fiyatlar (tüm hisseler tek sorguda)
+        prices = self.latest_prices.get_latest_prices(h.security_id for h in holdings)
         data = []
         for h in holdings:
-            # Güncel fiyat
-            last_price = self.db.query(PriceHistory).filter(
-                PriceHistory.security_id == h.security_id
-            ).order_by(PriceHistory.date.desc()).first()
-            
-            price = float(last_price.close_price) if last_price else float(h.avg_cost)
+            price = prices.get(h.security_id, float(h.avg_cost))
             market_val = float(h.quantity) * price
             cost_val = float(h.quantity) * float(h.avg_cost)
             
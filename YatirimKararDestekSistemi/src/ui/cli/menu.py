@@ -51,6 +51,9 @@ class ConsoleMenu:
         self.budget_manager = BudgetManager(self.db)
         self.goal_tracker = GoalTracker(self.db)
 
+        # Arka plan piyasa verisi güncellemesi (BackgroundRefresh)
+        self.refresh_task = None
+
     def clear_screen(self):
         os.system('cls' if os.name == 'nt' else 'clear')
 
@@ -61,6 +64,45 @@ class ConsoleMenu:
         print("="*70 + Colors.ENDC)
 
     # --- YARDIMCI METOTLAR ---
+
+    # Ekran açılırken güncellemenin bitmesi için beklenecek azami süre (sn) ve sembol başına indirme
+    # süresi (toplu istekte grubun süresi bu değer x gruptaki sembol sayısıdır, bkz. update_all_tickers)
+    REFRESH_WAIT_SECONDS = 5
+    PER_SYMBOL_TIMEOUT_SECONDS = 5
+
+    def start_background_refresh(self):
+        """Çalışan bir güncelleme yoksa arka planda yenisini başlatır."""
+        if self.refresh_task is None or not self.refresh_task.is_running():
+            self.refresh_task = self.market_service.refresh_in_background(
+                symbol_timeout=self.PER_SYMBOL_TIMEOUT_SECONDS
+            )
+        return self.refresh_task
+
+    def refresh_market_data(self, wait_seconds=None):
+        """
+        Piyasa verilerini arka planda günceller ve en fazla wait_seconds kadar bekler.
+        Süre dolarsa ekran mevcut (son kaydedilmiş) fiyatlarla açılır, güncelleme arkada sürer.
+        """
+        task = self.start_background_refresh()
+        wait_seconds = self.REFRESH_WAIT_SECONDS if wait_seconds is None else wait_seconds
+        if not task.wait(wait_seconds):
+            print(Colors.WARNING + "[BİLGİ] Güncelleme arka planda sürüyor, son kayıtlı fiyatlar gösteriliyor." + Colors.ENDC)
+        # Arka plan oturumunun commit ettiği fiyatları görmek için mevcut okuma transaction'ını kapat
+        self.db.commit()
+        self.db.expire_all()
+
+    def refresh_status_text(self):
+        """Ana menüde gösterilecek güncelleme durumu satırı."""
+        task = self.refresh_task
+        if task is None:
+            return None
+        if task.is_running():
+            return f"⏳ Piyasa verisi güncelleniyor (Başlangıç: {task.started_at:%H:%M:%S})"
+        if task.error:
+            return f"❌ Son güncelleme başarısız: {task.error}"
+        summ = task.summary
+        return (f"✅ Son güncelleme {task.finished_at:%H:%M:%S}: {summ['inserted']} yeni, "
+                f"{summ['updated']} güncelleme, {len(summ['failed'])} hatalı")
     
     def get_input(self, prompt_text):
         """Temel input alma, 'q' kontrolü yapar."""
@@ -230,7 +272,7 @@ class ConsoleMenu:
         print(Colors.BLUE + ">> DETAYLI PORTFÖY ANALİZİ" + Colors.ENDC)
         print("Piyasa verileri güncelleniyor ve analiz yapılıyor...\n")
         
-        self.market_service.update_all_tickers() 
+        self.refresh_market_data()
         dashboard = self.analytics_service.generate_dashboard(self.user_id)
         
         if "error" in dashboard:
@@ -517,7 +559,7 @@ class ConsoleMenu:
         
         # Önce verileri güncelle
         print("Piyasa verileri kontrol ediliyor...", end="\r")
-        self.market_service.update_all_tickers()
+        self.refresh_market_data()
         
         result = self.optimizer.optimize_portfolio(self.user_id)
         
@@ -774,6 +816,9 @@ class ConsoleMenu:
             print(Colors.GREEN + "8. Finansal Planlama (Bütçe & Hedefler)" + Colors.ENDC)
             print(Colors.WARNING + "9. Risk Profil Analizi (ANKET)" + Colors.ENDC) # Yeni
             print("0. Çıkış")
+            status = self.refresh_status_text()
+            if status:
+                print("\n" + status)
             choice = input("\nSeçiminiz: ").strip()
             
             if choice == '1': self.show_portfolio()
@@ -781,9 +826,13 @@ class ConsoleMenu:
             elif choice == '3': self.trade_flow(side="SELL")
             elif choice == '4': self.ai_analysis_menu()
             elif choice == '5':
-                 print("Güncelleniyor...")
-                 self.market_service.update_all_tickers()
-                 input("Bitti.")
+                 if self.get_input("Arka planda güncellensin mi? (E/H): ") in ("E", "e"):
+                     self.start_background_refresh()
+                     input("Güncelleme arka planda başlatıldı. Devam...")
+                 else:
+                     print("Güncelleniyor...")
+                     self.market_service.update_all_tickers(symbol_timeout=self.PER_SYMBOL_TIMEOUT_SECONDS)
+                     input("Bitti.")
             elif choice == '6': self.visualization_menu()
             elif choice == '7': self.optimization_menu() 
             elif choice == '8': self.planning_menu() 
@@ -13,6 +13,7 @@ from src.data.database import get_db
 from src.data.models import Security, PriceHistory
 from src.ai_core.ai_models.machine_learning import XGBoostModel
 from src.ai_core.feature_engineering import FeatureEngineer
+from src.ai_core.feature_store import FeatureStore
 
 # Görselleştirme Ayarları
 sns.set_style("whitegrid")
@@ -24,6 +25,8 @@ class ValidationModule:
         self.symbol = symbol.upper()
         self.db = db
         self.fe = FeatureEngineer(use_lags=True)
+        # Veritabanından gelen (tarih index'li) tablolar fiyat deposundakilerden ayrı klasörde tutulur
+        self.feature_store = FeatureStore("dataSets/features_db", engineer=self.fe)
         self.model = XGBoostModel() # Validasyon için XGBoost kullanacağız (Hibrit simülasyonu aşağıda)
         self.output_dir = f"reports/validation_{self.symbol}"
         os.makedirs(self.output_dir, exist_ok=True)
@@ -58,8 +61,8 @@ class ValidationModule:
 
     def prepare_data(self, df):
         """Öznitelik mühendisliği ve Train/Test ayrımı (Bölüm 6.1)."""
-        # Feature Engineering uygula
-        df_features = self.fe.create_features(df.copy())
+        # Feature Engineering uygula (özellik deposundan; sadece yeni günler hesaplanır)
+        df_features = self.feature_store.get(self.symbol, df)
         
         # Hedef değişkeni oluştur (Yarınki fiyat)
         # Tezinizde belirtilen yapı: Y_t = P_{t+1}
@@ -226,19 +229,30 @@ class ValidationModule:
         except Exception as e:
             print(f"❌ HATA ({self.symbol}): {str(e)}")
 
-# --- MAIN BLOCK ---
-if __name__ == "__main__":
-    # Veritabanı oturumu
+def validate_symbol(symbol: str) -> str:
+    """Tek hisseyi kendi DB oturumuyla doğrular (süreç havuzunda çalıştırılabilsin diye modül seviyesinde)."""
+    plt.switch_backend("Agg")  # İşçi süreçlerde pencere açılmaz, sadece dosyaya çizilir
     db_gen = get_db()
     db = next(db_gen)
-    
+    try:
+        ValidationModule(symbol, db).run_full_validation()
+    finally:
+        db_gen.close()
+    return symbol
+
+# --- MAIN BLOCK ---
+if __name__ == "__main__":
+    from concurrent.futures import ProcessPoolExecutor
+
     # Tezinizde geçen ve veritabanınızda olan hisseleri buraya yazın
     # Örn: ASELS, THYAO, GARAN (Veritabanında kayıtlı olması şarttır)
     TARGET_SYMBOLS = ["ASELS", "THYAO", "EREGL","ADESE","ENKAI","BIMAS","ALKA","ASTOR","MIATK"] 
+    MAX_WORKERS = min(len(TARGET_SYMBOLS), os.cpu_count() or 1)
     
     print("🚀 Validasyon ve Görselleştirme Modülü Başlatılıyor...\n")
     
-    for symbol in TARGET_SYMBOLS:
-        validator = ValidationModule(symbol, db)
-        validator.run_full_validation()
-        print("-" * 50)
\ No newline at end of file
+    # Hisseler birbirinden bağımsızdır; her biri ayrı süreçte (ayrı DB oturumuyla) doğrulanır
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        for symbol in pool.map(validate_symbol, TARGET_SYMBOLS):
+            print(f"[{symbol}] bitti.")
+            print("-" * 50)